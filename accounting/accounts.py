@@ -0,0 +1,56 @@
+from typing import Dict, List, Optional
+
+from accounting.ledger import PortfolioLedger
+
+
+def parse_account_weights(spec: str) -> Dict[str, float]:
+    """
+    Parse "U1:0.6,U2:0.4" into normalized budget weights. Accounts listed without a
+    weight ("U1,U2") share the budget equally.
+    """
+    weights = {}
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        account_id, _, weight = item.partition(":")
+        weights[account_id.strip()] = float(weight) if weight else 1.0
+
+    total = sum(weights.values())
+    if total <= 0:
+        return {}
+    return {account_id: weight / total for account_id, weight in weights.items()}
+
+
+class AccountAllocator:
+    """
+    Splits the daily nextInvestment budget across trading accounts by weight and
+    chooses the account for each buy: the one with the most budget left, so exposure
+    spreads across accounts instead of filling the first one.
+    Without accounts every method falls back to a single unnamed account (None).
+    """
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None):
+        self.weights: Dict[str, float] = dict(weights or {})
+
+    @property
+    def accounts(self) -> List[str]:
+        return list(self.weights)
+
+    def is_multi_account(self) -> bool:
+        return len(self.weights) > 0
+
+    def manages(self, account_id: Optional[str]) -> bool:
+        return not self.weights or account_id in self.weights
+
+    def budget_for(self, account_id: Optional[str], total_budget: float) -> float:
+        if account_id is None or not self.weights:
+            return total_budget
+        return total_budget * self.weights.get(account_id, 0.0)
+
+    def select_account(self, total_budget: float, ledger: PortfolioLedger) -> Optional[str]:
+        if not self.weights:
+            return None
+        if total_budget <= 0:
+            return min(self.weights, key=ledger.exposure_for)
+        return max(self.weights, key=lambda account_id: ledger.remaining_budget(self.budget_for(account_id, total_budget), account_id))
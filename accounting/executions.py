@@ -0,0 +1,204 @@
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+EXECUTION_SIDE_BUY = "B"
+EXECUTION_SIDE_SELL = "S"
+EXIT_REASON_MARKET = "market"
+EXIT_REASON_STOP = "stop"
+EXIT_REASON_TARGET = "target"
+STOP_LEG_SUFFIX = "-stop"
+TARGET_LEG_SUFFIX = "-target"
+
+
+@dataclass
+class Execution:
+    conid: int
+    side: str
+    quantity: float
+    price: float
+    commission: float
+    executed_at: Optional[str]
+    order_ref: Optional[str] = None
+    execution_id: Optional[str] = None
+
+
+@dataclass
+class FillSummary:
+    """Executions of one order (or one side of one position) rolled up to a VWAP."""
+    quantity: float = 0.0
+    notional: float = 0.0
+    commission: float = 0.0
+    first_at: Optional[str] = None
+    last_at: Optional[str] = None
+    order_refs: List[str] = field(default_factory=list)
+
+    @property
+    def average_price(self) -> float:
+        return self.notional / self.quantity if self.quantity else 0.0
+
+    def add(self, execution: Execution) -> None:
+        self.quantity += execution.quantity
+        self.notional += execution.price * execution.quantity
+        self.commission += execution.commission
+        if execution.executed_at is not None:
+            self.first_at = min(self.first_at or execution.executed_at, execution.executed_at)
+            self.last_at = max(self.last_at or execution.executed_at, execution.executed_at)
+        if execution.order_ref and execution.order_ref not in self.order_refs:
+            self.order_refs.append(execution.order_ref)
+
+
+def parse_float(value: Any) -> float:
+    try:
+        return float(str(value).replace(",", ""))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def format_execution_time(trade: Dict[str, Any]) -> Optional[str]:
+    """ISO UTC time of an execution; trade_time_r is epoch milliseconds, trade_time is "YYYYMMDD-HH:MM:SS" UTC."""
+    if trade.get("trade_time_r") is not None:
+        return datetime.fromtimestamp(int(trade["trade_time_r"]) / 1000, tz=timezone.utc).isoformat()
+    if trade.get("trade_time"):
+        try:
+            return datetime.strptime(trade["trade_time"], "%Y%m%d-%H:%M:%S").replace(tzinfo=timezone.utc).isoformat()
+        except ValueError:
+            return None
+    return None
+
+
+def parse_execution(trade: Dict[str, Any]) -> Optional[Execution]:
+    """One row of iserver/account/trades; None for rows without a conid, side or size."""
+    side = str(trade.get("side", "")).upper()[:1]
+    quantity = parse_float(trade.get("size"))
+    if trade.get("conid") is None or side not in (EXECUTION_SIDE_BUY, EXECUTION_SIDE_SELL) or quantity <= 0:
+        return None
+
+    return Execution(
+        conid=int(trade["conid"]),
+        side=side,
+        quantity=quantity,
+        price=parse_float(trade.get("price")),
+        commission=abs(parse_float(trade.get("commission"))),
+        executed_at=format_execution_time(trade),
+        order_ref=trade.get("order_ref") or None,
+        execution_id=trade.get("execution_id")
+    )
+
+
+def parse_executions(trades: Iterable[Dict[str, Any]]) -> List[Execution]:
+    executions = [execution for execution in map(parse_execution, trades) if execution is not None]
+    return sorted(executions, key=lambda execution: execution.executed_at or "")
+
+
+def build_entry_order_refs(position: Dict[str, Any]) -> List[str]:
+    return [position["client_order_id"]] if position.get("client_order_id") else []
+
+
+def build_exit_order_refs(position: Dict[str, Any]) -> List[str]:
+    """The sell order plus the bracket children the gateway may have triggered on its own."""
+    refs = []
+    if position.get("sell_client_order_id"):
+        refs.append(position["sell_client_order_id"])
+    if position.get("client_order_id"):
+        refs += [position["client_order_id"] + STOP_LEG_SUFFIX, position["client_order_id"] + TARGET_LEG_SUFFIX]
+    return refs
+
+
+def classify_exit_reason(exit_fills: FillSummary, entry_client_order_id: Optional[str]) -> str:
+    if entry_client_order_id:
+        if entry_client_order_id + STOP_LEG_SUFFIX in exit_fills.order_refs:
+            return EXIT_REASON_STOP
+        if entry_client_order_id + TARGET_LEG_SUFFIX in exit_fills.order_refs:
+            return EXIT_REASON_TARGET
+    return EXIT_REASON_MARKET
+
+
+class ExecutionMatcher:
+    """
+    Hands out the day's executions to closed positions, each execution at most once.
+    Executions are claimed by order reference (cOID) first; positions without a cOID
+    match on conid, taking the earliest unclaimed buys and sells for the quantity.
+    """
+
+    def __init__(self, executions: List[Execution]):
+        self._unclaimed = list(executions)
+
+    def claim_by_refs(self, refs: List[str], side: str) -> FillSummary:
+        summary = FillSummary()
+        if not refs:
+            return summary
+        for execution in [execution for execution in self._unclaimed if execution.side == side and execution.order_ref in refs]:
+            self._unclaimed.remove(execution)
+            summary.add(execution)
+        return summary
+
+    def claim_by_conid(self, conid: int, side: str, quantity: float) -> FillSummary:
+        summary = FillSummary()
+        for execution in [execution for execution in self._unclaimed if execution.conid == conid and execution.side == side]:
+            if summary.quantity >= quantity:
+                break
+            self._unclaimed.remove(execution)
+            summary.add(execution)
+        return summary
+
+
+def apply_fills(position: Dict[str, Any], entry: FillSummary, exit_fills: FillSummary) -> Tuple[Dict[str, Any], bool]:
+    """
+    The closed position rewritten from its executions: VWAP prices, the executed
+    quantity, commissions and fill times, with profit net of commissions. Positions
+    whose entry or exit was not found are returned unchanged.
+    """
+    if entry.quantity == 0 or exit_fills.quantity == 0:
+        return position, False
+
+    matched_quantity = min(entry.quantity, exit_fills.quantity)
+    buy_price = entry.average_price
+    sell_price = exit_fills.average_price
+    commission = entry.commission + exit_fills.commission
+    profit = (sell_price - buy_price) * matched_quantity - commission
+
+    reconciled = dict(position)
+    reconciled.update({
+        "buy_price": round(buy_price, 4),
+        "sell_price": round(sell_price, 4),
+        "quantity": int(matched_quantity) if float(matched_quantity).is_integer() else matched_quantity,
+        "profit": round(profit, 2),
+        "return_pct": round(profit / (buy_price * matched_quantity) * 100, 2) if buy_price else 0.0,
+        "commission": round(commission, 4),
+        "buy_time": entry.first_at,
+        "sell_time": exit_fills.last_at,
+        "exit_reason": classify_exit_reason(exit_fills, position.get("client_order_id")),
+        "estimated_buy_price": position.get("estimated_buy_price", position.get("buy_price")),
+        "estimated_sell_price": position.get("estimated_sell_price", position.get("sell_price")),
+        "reconciled": True
+    })
+    return reconciled, True
+
+
+def reconcile_closed_positions(closed_positions: List[Dict[str, Any]],
+                               trades: Iterable[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Rewrite every closed position from the day's executions; returns the positions and
+    how many matched. All cOID claims are made before any conid fallback, so a
+    position without a cOID cannot take another position's fills.
+    """
+    matcher = ExecutionMatcher(parse_executions(trades))
+    claims = [(matcher.claim_by_refs(build_entry_order_refs(position), EXECUTION_SIDE_BUY),
+               matcher.claim_by_refs(build_exit_order_refs(position), EXECUTION_SIDE_SELL))
+              for position in closed_positions]
+
+    reconciled_positions = []
+    matched = 0
+    for position, (entry, exit_fills) in zip(closed_positions, claims):
+        conid = position.get("conid")
+        if conid is not None:
+            if entry.quantity == 0:
+                entry = matcher.claim_by_conid(int(conid), EXECUTION_SIDE_BUY, position.get("quantity", 1))
+            if exit_fills.quantity == 0:
+                exit_fills = matcher.claim_by_conid(int(conid), EXECUTION_SIDE_SELL, entry.quantity or position.get("quantity", 1))
+
+        reconciled, ok = apply_fills(position, entry, exit_fills)
+        reconciled_positions.append(reconciled)
+        matched += ok
+    return reconciled_positions, matched
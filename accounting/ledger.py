@@ -0,0 +1,159 @@
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class LedgerPosition:
+    quantity: int
+    average_price: float
+    mark: Optional[float] = None
+    account_id: Optional[str] = None
+
+    @property
+    def cost_basis(self) -> float:
+        return self.quantity * self.average_price
+
+    @property
+    def market_value(self) -> float:
+        return self.quantity * (self.mark if self.mark is not None else self.average_price)
+
+
+def format_ledger_line(ticker: str, position: LedgerPosition) -> str:
+    if position.mark is None:
+        return f"{ticker} [Buy: ${position.average_price:.2f} | Now: N/A]"
+
+    price_change = position.mark - position.average_price
+    price_change_pct = (price_change / position.average_price) * 100
+    return f"{ticker} [Buy: ${position.average_price:.2f} | Now: ${position.mark:.2f} | P/L: {price_change:+.2f} ({price_change_pct:+.2f}%)]"
+
+
+class PortfolioLedger:
+    """
+    Running portfolio aggregates. Fills and marks adjust exposure, market value and
+    realized P&L by their delta, so reads are O(1); the summary reuses per-position
+    lines that are only re-rendered after that position changes.
+    """
+
+    def __init__(self):
+        self.positions: Dict[str, LedgerPosition] = {}
+        self.exposure = 0.0
+        self.market_value = 0.0
+        self.realized_pnl = 0.0
+        self.closed_count = 0
+        self.exposure_by_account: Dict[Optional[str], float] = {}
+        self.realized_by_account: Dict[Optional[str], float] = {}
+        self._tickers: List[str] = []
+        self._lines: Dict[str, str] = {}
+
+    @property
+    def unrealized_pnl(self) -> float:
+        return self.market_value - self.exposure
+
+    def exposure_for(self, account_id: Optional[str]) -> float:
+        return self.exposure_by_account.get(account_id, 0.0)
+
+    def open_position(self, ticker: str, quantity: int, price: float, mark: Optional[float] = None,
+                      account_id: Optional[str] = None) -> None:
+        if ticker in self.positions:
+            self._remove_contribution(ticker, self.positions[ticker])
+        else:
+            insort(self._tickers, ticker)
+
+        position = LedgerPosition(quantity=quantity, average_price=price, mark=mark, account_id=account_id)
+        self.positions[ticker] = position
+        self.exposure += position.cost_basis
+        self.market_value += position.market_value
+        self.exposure_by_account[account_id] = self.exposure_for(account_id) + position.cost_basis
+
+    def update_position(self, ticker: str, quantity: int, average_price: float, account_id: Optional[str] = None) -> None:
+        previous = self.positions.get(ticker)
+        if account_id is None and previous is not None:
+            account_id = previous.account_id
+        if (previous is not None and previous.quantity == quantity and previous.average_price == average_price
+                and previous.account_id == account_id):
+            return
+        self.open_position(ticker, quantity, average_price, previous.mark if previous else None, account_id)
+
+    def mark(self, ticker: str, price: float) -> None:
+        position = self.positions.get(ticker)
+        if position is None or position.mark == price:
+            return
+
+        self.market_value += position.quantity * price - position.market_value
+        position.mark = price
+        self._lines.pop(ticker, None)
+
+    def close_position(self, ticker: str, price: float) -> Optional[float]:
+        position = self.remove(ticker)
+        if position is None:
+            return None
+
+        realized = (price - position.average_price) * position.quantity
+        self.record_closed(realized, position.account_id)
+        return realized
+
+    def record_closed(self, profit: float, account_id: Optional[str] = None) -> None:
+        self.realized_pnl += profit
+        self.realized_by_account[account_id] = self.realized_by_account.get(account_id, 0.0) + profit
+        self.closed_count += 1
+
+    def adjust_realized(self, delta: float, account_id: Optional[str] = None) -> None:
+        """Correct the realized P&L of an already closed position, e.g. once its executions are known."""
+        self.realized_pnl += delta
+        self.realized_by_account[account_id] = self.realized_by_account.get(account_id, 0.0) + delta
+
+    def remove(self, ticker: str) -> Optional[LedgerPosition]:
+        position = self.positions.pop(ticker, None)
+        if position is None:
+            return None
+
+        self._remove_contribution(ticker, position)
+        del self._tickers[bisect_left(self._tickers, ticker)]
+        if not self.positions:
+            self.exposure = 0.0
+            self.market_value = 0.0
+            self.exposure_by_account.clear()
+        return position
+
+    def remaining_budget(self, budget: float, account_id: Optional[str] = None) -> float:
+        exposure = self.exposure if account_id is None else self.exposure_for(account_id)
+        return budget - exposure
+
+    def reset(self) -> None:
+        self.__init__()
+
+    def format_summary(self) -> str:
+        lines = []
+        for ticker in self._tickers:
+            line = self._lines.get(ticker)
+            if line is None:
+                line = self._lines[ticker] = format_ledger_line(ticker, self.positions[ticker])
+            lines.append(line)
+        return ", ".join(lines)
+
+    def format_totals(self) -> str:
+        return (f"Exposure ${self.exposure:.2f} | Unrealized P/L ${self.unrealized_pnl:+.2f} | "
+                f"Realized P/L ${self.realized_pnl:+.2f} ({self.closed_count} closed)")
+
+    def account_summary(self) -> Dict[str, Dict[str, float]]:
+        accounts = [account for account in set(self.exposure_by_account) | set(self.realized_by_account) if account]
+        return {account: {"exposure": round(self.exposure_for(account), 2),
+                          "realized_pnl": round(self.realized_by_account.get(account, 0.0), 2)}
+                for account in sorted(accounts)}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "exposure": round(self.exposure, 2),
+            "market_value": round(self.market_value, 2),
+            "unrealized_pnl": round(self.unrealized_pnl, 2),
+            "realized_pnl": round(self.realized_pnl, 2),
+            "closed_positions": self.closed_count,
+            "open_positions": len(self.positions)
+        }
+
+    def _remove_contribution(self, ticker: str, position: LedgerPosition) -> None:
+        self.exposure -= position.cost_basis
+        self.market_value -= position.market_value
+        self.exposure_by_account[position.account_id] = self.exposure_for(position.account_id) - position.cost_basis
+        self._lines.pop(ticker, None)
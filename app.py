@@ -1,39 +1,147 @@
-from datetime import datetime, timezone, timedelta, time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, time
+from functools import lru_cache
 from json import dumps, loads
 from logging import INFO, Logger
-from os import makedirs, path
-from typing import Dict, List, Optional
+from os import environ, makedirs, path
+from typing import Dict, List, Optional, Set
 
-from boto3 import client
-from requests import post, get
+import numpy as np
+from boto3 import Session, client
+from botocore.credentials import RefreshableCredentials
+from botocore.session import get_session
 from urllib3 import disable_warnings
 from urllib3.exceptions import InsecureRequestWarning
 
+from accounting.accounts import AccountAllocator, parse_account_weights
+from accounting.executions import reconcile_closed_positions
+from accounting.ledger import PortfolioLedger
+from config.settings_store import SettingsStore, TradingSettings
+from ibkr.alerts import create_price_alert, delete_alert, find_alert_ids, get_alerts, get_triggered_alert_ids
+from ibkr.broker import BROKER_MODE_LIVE, create_broker
 from ibkr.contract_details import contract_search
-from ibkr.historical_data import get_market_snapshot
-from ibkr.market_data_parser import format_market_data_log, parse_market_data
-from ibkr.order_request import place_market_sell_order, place_market_buy_order_with_stop_and_profit
-from ibkr.portfolio import format_position_summary, get_all_positions, parse_position
-from logs.setup import setup_logging
+from ibkr.historical_data import (get_market_snapshot, get_market_snapshots, get_previous_closes, prime_market_data_subscriptions,
+                                  split_batches)
+from ibkr.circuit_breaker import CIRCUIT_CLOSED
+from ibkr.http_client import ENDPOINT_CLASS_MARKET_DATA, circuit_breakers, get_circuit_breaker, post
+from ibkr.market_data_parser import extract_last_price, format_market_data_log, parse_market_data
+from ibkr.order_manager import IN_DOUBT_KEY, ManagedOrder, OrderManager
+from ibkr.order_request import ensure_account_id, extract_child_order_ids, find_orders_by_client_order_id, prepare_order_templates
+from ibkr.portfolio import format_position_summary, parse_position
+from logs.setup import LazyFormat, setup_logging
+from metrics.instrumentation import (format_cycle_summary, increment, set_gauge, start_metrics_server, timed,
+                                     write_prometheus_file)
+from metrics.order_trace import OrderTrace, format_trace_summary, summarize_traces, tracing
+from runtime.clock import get_clock
+from runtime.day_rollover import DailyInputs, DayRolloverPrefetcher, first_trading_day_from, next_weekday
+from runtime.startup import StartupOrchestrator, StartupReport
+from simulation.paper_broker import PaperBrokerConfig
+from state.journal import (CLOSED_POSITIONS_RECONCILED, ORDER_REJECTED, ORDER_SUBMITTED, POSITION_CLOSED, POSITION_DROPPED, POSITION_OPENED,
+                           POSITION_UPDATED, StateJournal)
+from strategy.alert_book import PriceAlertBook, choose_alert_bound
+from strategy.change_detector import SnapshotChangeDetector
+from strategy.poll_scheduler import PollScheduler, distance_to_buy_band
+from strategy.signals import (ACTION_BELOW_CLOSE, ACTION_BUY, ACTION_TOO_HIGH, BUY_RANGE_LOWER_RATIO, BUY_RANGE_UPPER_RATIO,
+                              classify_price_change, evaluate_watchlist, format_buy_range_label)
 
 disable_warnings(InsecureRequestWarning)
 
 MARKET_CLOSE_TIME = time(16, 0)
+MARKET_OPEN_TIME = time(9, 30)
 MINUTES_BEFORE_CLOSE_TO_SELL = 10
 S3_BUCKET = 'dev-trading-data-storage'
-SETTINGS_FILE_PATH = 'files/settings.json'
+SETTINGS_S3_KEY = 'settings.json'
+SETTINGS_REFRESH_INTERVAL = 30
+SNAPSHOT_HEARTBEAT_SECONDS = 60
+METRICS_FILE_PATH = './files/metrics.prom'
+METRICS_HTTP_PORT = 9108
+METRICS_SUMMARY_INTERVAL = 60
+TICKS_FILE_NAME = 'ticks.csv'
+BROKER_MODE = environ.get('BROKER_MODE', BROKER_MODE_LIVE)
+PAPER_SLIPPAGE_BPS = float(environ.get('PAPER_SLIPPAGE_BPS', '5'))
+PAPER_LATENCY_SECONDS = float(environ.get('PAPER_LATENCY_SECONDS', '0'))
+CONID_WARMUP_WORKERS = 8
+PREFETCH_RETRY_INTERVAL = 300
+BROKER_FLAT_SYNCS_BEFORE_CLOSE = 2
+PRE_OPEN_WARMUP_LEAD_MINUTES = 5
+OPENING_BURST_WINDOW_MINUTES = 5
+OPENING_BURST_BUDGET_SECONDS = 5.0
+OPENING_BURST_WORKERS = 4
+POLL_REQUESTS_PER_SECOND = float(environ.get('POLL_REQUESTS_PER_SECOND', '10'))
+MAX_IDLE_POLL_WAIT_SECONDS = 1.0
+TRADING_ACCOUNTS = environ.get('TRADING_ACCOUNTS', '')
+ALERT_OFFLOAD_ENABLED = environ.get('ALERT_OFFLOAD', 'false').lower() == 'true'
+ALERT_FALLBACK_POLL_SECONDS = 300.0
+ALERT_CHECK_INTERVAL_SECONDS = 2.0
+ALERT_REARM_DISTANCE_PCT = 0.2
+ALERT_REGISTRATIONS_PER_CYCLE = 10
+ALERT_NAME_PREFIX = 'buyband-'
+ORDER_SUBMISSION_WORKERS = int(environ.get('ORDER_SUBMISSION_WORKERS', '1'))
+EXECUTIONS_RETRY_SECONDS = 30.0
+POSITION_SYNC_INTERVAL_SECONDS = float(environ.get('POSITION_SYNC_INTERVAL_SECONDS', '5'))
+JSON_LOGS_ENABLED = environ.get('JSON_LOGS', 'false').lower() == 'true'
 UPDATE_INTERVAL = 0
 IAM_ROLE_NAME = 'dev-trading-admin'
 IBKR_BASE_URL = "https://localhost:5001/v1/api/"
 
 bought_shares_today: Dict[str, Dict[str, any]] = {}
 closed_positions_today: List[Dict[str, any]] = []
+broker_flat_syncs: Dict[str, int] = {}
+split_position_tickers: Set[str] = set()
+portfolio_ledger = PortfolioLedger()
+account_allocator = AccountAllocator(parse_account_weights(TRADING_ACCOUNTS))
+poll_scheduler = PollScheduler(POLL_REQUESTS_PER_SECOND)
+price_alert_book = PriceAlertBook()
+last_alert_check_time: Optional[float] = None
+order_traces_today: List[Dict[str, any]] = []
+tick_buffer: List[str] = []
 daily_files_downloaded: bool = False
 cached_settings: Optional[Dict] = None
 cached_companies: Optional[List[str]] = None
+settings_store = SettingsStore(S3_BUCKET, SETTINGS_S3_KEY)
+snapshot_change_detector = SnapshotChangeDetector(heartbeat_seconds=SNAPSHOT_HEARTBEAT_SECONDS)
+last_parsed_data_by_ticker: Dict[str, Dict] = {}
+last_metrics_emit_time: float = get_clock().monotonic()
+storage_client = None
+state_journal: Optional[StateJournal] = None
+order_authority = None
+state_directory_name: Optional[str] = None
+conid_cache: Dict[str, int] = {}
+closing_prices_by_ticker: Dict[str, str] = {}
+pre_open_warmup_day: Optional[date] = None
+opening_burst_day: Optional[date] = None
+startup_report: Optional[StartupReport] = None
+active_trading_day: Optional[date] = None
+closed_positions_finalized_day: Optional[date] = None
+closed_positions_finalized_count = 0
+last_executions_attempt_time: Optional[float] = None
+last_position_sync_time: Optional[float] = None
+day_prefetcher: Optional[DayRolloverPrefetcher] = None
+market_data_circuit = get_circuit_breaker(ENDPOINT_CLASS_MARKET_DATA)
+broker = create_broker(BROKER_MODE, PaperBrokerConfig(slippage_bps=PAPER_SLIPPAGE_BPS, latency_seconds=PAPER_LATENCY_SECONDS))
+order_manager = OrderManager(lambda: broker.get_live_orders(), ORDER_SUBMISSION_WORKERS)
+
+
+def fetch_role_credentials(sts_client, role_arn: str) -> Dict[str, str]:
+    credentials = sts_client.assume_role(
+        RoleArn=role_arn,
+        RoleSessionName='trading-app-session'
+    )['Credentials']
+
+    return {
+        "access_key": credentials['AccessKeyId'],
+        "secret_key": credentials['SecretAccessKey'],
+        "token": credentials['SessionToken'],
+        "expiry_time": credentials['Expiration'].isoformat()
+    }
 
 
 def assume_iam_role(role_name: str, logger: Logger):
+    """
+    S3 client on the assumed role. The role's session credentials expire (1h by
+    default), so botocore re-assumes the role before they do; the process outlives
+    many sessions (day rollover, background settings refresh).
+    """
     try:
         sts_client = client('sts')
         caller_identity = sts_client.get_caller_identity()
@@ -42,19 +150,14 @@ def assume_iam_role(role_name: str, logger: Logger):
 
         logger.info(f"Assuming IAM role: {role_arn}")
 
-        response = sts_client.assume_role(
-            RoleArn=role_arn,
-            RoleSessionName='trading-app-session'
-        )
-
-        credentials = response['Credentials']
-
-        s3_client = client(
-            's3',
-            aws_access_key_id=credentials['AccessKeyId'],
-            aws_secret_access_key=credentials['SecretAccessKey'],
-            aws_session_token=credentials['SessionToken']
+        credentials = RefreshableCredentials.create_from_metadata(
+            metadata=fetch_role_credentials(sts_client, role_arn),
+            refresh_using=lambda: fetch_role_credentials(sts_client, role_arn),
+            method='sts-assume-role'
         )
+        botocore_session = get_session()
+        botocore_session._credentials = credentials
+        s3_client = Session(botocore_session=botocore_session).client('s3')
 
         logger.info(f"Successfully assumed role: {role_name}")
         return s3_client
@@ -66,26 +169,17 @@ def assume_iam_role(role_name: str, logger: Logger):
 
 
 def calculate_budget_per_trade() -> float:
-    try:
-        settings = load_settings()
-        next_investment = settings.get('nextInvestment', 0)
-        ops_per_day = settings.get('opsPerDay', 1)
+    return settings_store.get().budget_per_trade
 
-        if next_investment > 0 and ops_per_day > 0:
-            return next_investment / ops_per_day
 
-        return 0
-    except Exception:
-        return 0
-
-
-def calculate_quantity_from_budget(current_price: float) -> int:
+def calculate_quantity_from_budget(current_price: float, budget: Optional[float] = None) -> int:
     """
     Calculate the number of shares to buy based on the budget per trade.
     Buys as many shares as possible without exceeding the budget.
     Returns at least 1 share if budget allows, otherwise 0.
     """
-    budget = calculate_budget_per_trade()
+    if budget is None:
+        budget = calculate_budget_per_trade()
 
     if budget <= 0 or current_price <= 0:
         return 1
@@ -96,13 +190,11 @@ def calculate_quantity_from_budget(current_price: float) -> int:
 
 
 def calculate_stop_loss_price(buy_price: float) -> float:
-    stop_loss_percentage = settings.get('stopLoss', 2.0)
-    return round(buy_price * (1 - stop_loss_percentage / 100), 2)
+    return round(buy_price * settings_store.get().stop_loss_ratio, 2)
 
 
 def calculate_take_profit_price(buy_price: float) -> float:
-    take_profit_percentage = settings.get('takeProfit', 5.0)
-    return round(buy_price * (1 + take_profit_percentage / 100), 2)
+    return round(buy_price * settings_store.get().take_profit_ratio, 2)
 
 
 def initialize_ibkr_brokerage_session(logger: Logger) -> bool:
@@ -128,17 +220,21 @@ def initialize_ibkr_brokerage_session(logger: Logger) -> bool:
         return False
 
 
-def load_settings() -> Dict:
-    """Load settings from local settings.json file."""
-    try:
-        with open(SETTINGS_FILE_PATH, 'r') as f:
-            return loads(f.read())
-    except Exception:
-        return {}
+def update_cached_settings(current: TradingSettings) -> None:
+    global cached_settings
+    cached_settings = current.to_dict()
+
+
+def create_settings_change_listener(logger: Logger):
+    def on_settings_changed(previous: TradingSettings, current: TradingSettings) -> None:
+        update_cached_settings(current)
+        logger.info(f"Settings updated (version {current.version}): {previous.to_dict()} -> {current.to_dict()}")
+
+    return on_settings_changed
 
 
 def create_company_data(ticker: str, parsed_data: Dict, closing_price: Optional[str], year: int, month: int, day: int) -> Dict:
-    now = datetime.now(timezone.utc)
+    now = get_clock().now_utc()
 
     price_change_from_close_pct = calculate_price_change_from_close(parsed_data.get('last_price'), closing_price)
     price_difference_from_close = calculate_price_difference_from_close(parsed_data.get('last_price'), closing_price)
@@ -172,8 +268,9 @@ def create_directories(year: int, month: int, day: int) -> str:
 
 
 def calculate_minutes_until_close(current_time: time) -> int:
-    close_datetime = datetime.combine(datetime.today(), MARKET_CLOSE_TIME)
-    current_datetime = datetime.combine(datetime.today(), current_time)
+    today = get_clock().now_utc().date()
+    close_datetime = datetime.combine(today, MARKET_CLOSE_TIME)
+    current_datetime = datetime.combine(today, current_time)
     time_diff = close_datetime - current_datetime
     return int(time_diff.total_seconds() / 60)
 
@@ -207,34 +304,41 @@ def calculate_price_change_percentage(current_price: float, closing_price: float
 
 
 def calculate_buy_range_prices(closing_price: float) -> tuple[float, float]:
-    lower_threshold = closing_price * 1.008
-    upper_threshold = closing_price * 1.0095
+    lower_threshold = closing_price * BUY_RANGE_LOWER_RATIO
+    upper_threshold = closing_price * BUY_RANGE_UPPER_RATIO
     return lower_threshold, upper_threshold
 
 
+@lru_cache(maxsize=4096)
 def format_buy_range(closing_price: float) -> str:
     lower, upper = calculate_buy_range_prices(closing_price)
-    return f"[Buy Range: ${lower:.2f} - ${upper:.2f}]"
+    return format_buy_range_label(lower, upper)
 
 
 def determine_closing_price(parsed_data: Dict, existing_closing_price: Optional[str], logger: Logger, ticker: str) -> Optional[str]:
     if should_preserve_existing_closing_price(existing_closing_price):
-        logger.info(f"{ticker} - Preserving existing closing price: ${existing_closing_price}")
+        logger.info("%s - Preserving existing closing price: $%s", ticker, existing_closing_price)
         return existing_closing_price
 
     if is_official_closing_price(parsed_data):
         closing_price = parsed_data.get('last_price')
-        logger.info(f"{ticker} - Setting closing price: ${closing_price}")
+        logger.info("%s - Setting closing price: $%s", ticker, closing_price)
         return closing_price
 
     if has_previous_close(parsed_data):
         closing_price = parsed_data.get('previous_close')
-        logger.info(f"{ticker} - Setting closing price from previous_close: ${closing_price}")
+        logger.info("%s - Setting closing price from previous_close: $%s", ticker, closing_price)
         return closing_price
 
     return None
 
 
+def fetch_companies_list(s3_client, bucket: str, year: int, month: int, day: int) -> List[str]:
+    s3_key = f'{year}/{month}/{day}/selected_companies.txt'
+    response = s3_client.get_object(Bucket=bucket, Key=s3_key)
+    return response['Body'].read().decode('utf-8').splitlines()
+
+
 def download_companies_list(s3_client, bucket: str, year: int, month: int, day: int, logger: Logger) -> Optional[List[str]]:
     global cached_companies, daily_files_downloaded
 
@@ -244,14 +348,7 @@ def download_companies_list(s3_client, bucket: str, year: int, month: int, day:
         return cached_companies
 
     try:
-        file_path = f'./files/{year}/{month}/{day}/selected_companies.txt'
-
-        makedirs(path.dirname(file_path), exist_ok=True)
-
-        s3_key = f'{year}/{month}/{day}/selected_companies.txt'
-        s3_client.download_file(bucket, s3_key, file_path)
-        with open(file_path, 'r') as f:
-            cached_companies = f.read().splitlines()
+        cached_companies = fetch_companies_list(s3_client, bucket, year, month, day)
         logger.info(f"Downloaded companies list from S3: {len(cached_companies)} companies")
         return cached_companies
     except Exception as e:
@@ -269,17 +366,13 @@ def download_settings_file(s3_client, bucket: str, logger: Logger) -> Optional[D
         return cached_settings
 
     try:
-        # Create directory if it doesn't exist
-        makedirs('./files', exist_ok=True)
-
-        s3_client.download_file(bucket, 'settings.json', './files/settings.json')
-        with open('./files/settings.json', 'r') as f:
-            cached_settings = loads(f.read())
-        logger.info("Downloaded settings.json from S3")
+        settings_store.refresh(s3_client)
+        cached_settings = settings_store.get().to_dict()
+        logger.info(f"Loaded settings.json from S3 (version {settings_store.get().version})")
         return cached_settings
     except Exception as e:
         logger.error(f"Failed to download settings.json: {str(e)}")
-        logger.error(f"Expected S3 location: s3://{bucket}/settings.json")
+        logger.error(f"Expected S3 location: s3://{bucket}/{settings_store.key}")
         return None
 
 
@@ -307,36 +400,78 @@ def download_daily_files(s3_client, bucket: str, year: int, month: int, day: int
     return settings, companies
 
 
-def fetch_and_parse_market_data(ticker: str, logger: Logger) -> Optional[Dict]:
+def resolve_conid(ticker: str, logger: Logger) -> int:
+    conid = conid_cache.get(ticker)
+    if conid is not None:
+        return conid
+
+    with timed("contract_search"):
+        conid = int(contract_search(ticker))
+    logger.info("Contract ID for %s: %s", ticker, conid)
+    conid_cache[ticker] = conid
+    return conid
+
+
+def warm_market_data(companies: List[str], logger: Logger) -> int:
+    """Resolve every conid concurrently and open their snapshot subscriptions before the first cycle."""
+    def resolve_quietly(ticker: str) -> Optional[int]:
+        try:
+            return resolve_conid(ticker, logger)
+        except Exception as e:
+            logger.warning(f"{ticker} - Could not resolve contract ID during warmup: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=CONID_WARMUP_WORKERS, thread_name_prefix="conid") as executor:
+        conids = [conid for conid in executor.map(resolve_quietly, companies) if conid is not None]
+
+    with timed("subscription_prime"):
+        primed = prime_market_data_subscriptions(conids)
+    if BROKER_MODE == BROKER_MODE_LIVE:
+        prepare_order_templates(conids)
+    logger.info(f"Pre-warmed {len(conids)}/{len(companies)} contract ID(s), primed {primed} market data subscription(s)")
+    return primed
+
+
+def fetch_market_snapshot(ticker: str, logger: Logger) -> Optional[Dict]:
     try:
-        conid = contract_search(ticker)
-        logger.info(f"Contract ID for {ticker}: {conid}")
+        conid = resolve_conid(ticker, logger)
 
-        snapshot = get_market_snapshot(int(conid))
+        with timed("snapshot"):
+            snapshot = get_market_snapshot(conid)
 
         if not is_valid_snapshot(snapshot):
-            logger.warning(f"{ticker} - Empty or invalid snapshot response")
+            logger.warning("%s - Empty or invalid snapshot response", ticker)
             return None
 
-        market_data = snapshot[0]
-        parsed_data = parse_market_data(market_data)
-        logger.info(format_market_data_log(ticker, parsed_data))
-
-        return parsed_data
+        return snapshot[0]
 
     except Exception as e:
         logger.error(f"{ticker} - Error fetching market data: {e}")
         return None
 
 
+def parse_and_log_market_data(ticker: str, market_data: Dict, logger: Logger) -> Dict:
+    received_at = get_clock().monotonic()
+    with timed("parse"):
+        parsed_data = parse_market_data(market_data)
+    parsed_data['received_at'] = received_at
+    logger.info("%s", LazyFormat(format_market_data_log, ticker, parsed_data))
+    return parsed_data
+
+
 def get_current_eastern_time() -> time:
     eastern_offset = timedelta(hours=-5)
-    eastern_time = datetime.now(timezone.utc) + eastern_offset
+    eastern_time = get_clock().now_utc() + eastern_offset
     return eastern_time.time()
 
 
+def get_current_eastern_date() -> date:
+    eastern_offset = timedelta(hours=-5)
+    return (get_clock().now_utc() + eastern_offset).date()
+
+
 def get_current_date() -> tuple[int, int, int]:
-    now = datetime.now(timezone.utc)
+    now = get_clock().now_utc()
     return now.year, now.month, now.day
 
 
@@ -358,23 +493,102 @@ def get_existing_closing_price(file_path: str, logger: Logger) -> Optional[str]:
         return None
 
 
+def start_order_trace(ticker: str, side: str) -> OrderTrace:
+    parsed_data = last_parsed_data_by_ticker.get(ticker, {})
+    tick_timestamp = parsed_data.get('timestamp')
+    tick_epoch = tick_timestamp.timestamp() if tick_timestamp else None
+    return OrderTrace(ticker, side, tick_epoch, parsed_data.get('received_at'))
+
+
+def record_order_trace(trace: OrderTrace, logger: Logger) -> Dict[str, any]:
+    trace_data = trace.to_dict()
+    order_traces_today.append(trace_data)
+
+    try:
+        year, month, day = get_current_date()
+        file_path = build_order_traces_file_path(year, month, day)
+        makedirs(path.dirname(file_path), exist_ok=True)
+        with open(file_path, 'a') as f:
+            f.write(dumps(trace_data) + "\n")
+    except Exception as e:
+        logger.warning("%s - Failed to persist order trace: %s", trace.ticker, e)
+
+    logger.info("%s TRACE - %s: tick->signal %sms | snapshot->ack %sms", trace.side, trace.ticker,
+                trace_data['tick_to_signal_ms'], trace_data['total_ms'])
+    return trace_data
+
+
 def handle_buy_action(ticker: str, conid: int, current_price: float, logger: Logger) -> None:
-    if ticker in bought_shares_today:
+    if ticker in bought_shares_today or order_manager.is_pending(ticker, "BUY"):
+        return
+    if is_close_to_market_close():
+        logger.info("BUY SKIPPED - %s: end-of-day liquidation window", ticker)
         return
 
-    quantity = calculate_quantity_from_budget(current_price)
-    estimated_cost = quantity * current_price
-    stop_loss_price = calculate_stop_loss_price(current_price)
-    take_profit_price = calculate_take_profit_price(current_price)
+    trace = start_order_trace(ticker, "BUY")
 
-    order_result = place_market_buy_order_with_stop_and_profit(
-        conid=conid,
-        quantity=quantity,
-        stop_loss_price=stop_loss_price,
-        take_profit_price=take_profit_price
-    )
+    with timed("order_prepare"):
+        account_id = account_allocator.select_account(settings_store.get().next_investment, portfolio_ledger)
+        quantity = calculate_quantity_from_budget(current_price, account_allocator.budget_for(account_id, calculate_budget_per_trade()))
+        estimated_cost = quantity * current_price
+        stop_loss_price = calculate_stop_loss_price(current_price)
+        take_profit_price = calculate_take_profit_price(current_price)
+
+    if not is_within_exposure_budget(estimated_cost, account_id):
+        logger.info("BUY SKIPPED - %s: $%.2f would exceed the exposure budget (%s)", ticker, estimated_cost, portfolio_ledger.format_totals())
+        return
+
+    if not reserve_buy(ticker, estimated_cost, logger):
+        return
+
+    client_order_id = order_manager.next_client_order_id(get_current_day(), ticker, "BUY")
+    journal_transition(ORDER_SUBMITTED, ticker, create_order_journal_entry("BUY", conid, quantity, client_order_id))
+
+    def send(order_id: str) -> Dict[str, any]:
+        with timed("order_buy"), tracing(trace):
+            return broker.place_market_buy_order_with_stop_and_profit(
+                conid=conid,
+                quantity=quantity,
+                stop_loss_price=stop_loss_price,
+                take_profit_price=take_profit_price,
+                account_id=account_id,
+                client_order_id=order_id
+            )
+
+    order_manager.submit(ticker, "BUY", client_order_id, send, {
+        "conid": conid,
+        "quantity": quantity,
+        "price": current_price,
+        "estimated_cost": estimated_cost,
+        "stop_loss_price": stop_loss_price,
+        "take_profit_price": take_profit_price,
+        "account_id": account_id,
+        "trace": trace
+    })
+    apply_completed_orders(logger)
+
+
+def complete_buy(order: ManagedOrder, logger: Logger) -> None:
+    ticker = order.ticker
+    context = order.context
+    order_result = order.result
+    trace = context.pop("trace", None)
+    if trace is not None:
+        context["trace_data"] = record_order_trace(trace, logger)
+
+    if order_result.get(IN_DOUBT_KEY):
+        logger.warning("BUY IN DOUBT - %s: %s", ticker, order_result.get('error'))
+        return
 
     if order_result.get("success"):
+        conid = context["conid"]
+        quantity = context["quantity"]
+        current_price = context["price"]
+        account_id = context["account_id"]
+        stop_loss_price = context["stop_loss_price"]
+        take_profit_price = context["take_profit_price"]
+        trace_data = context.get("trace_data")
+
         buy_date = get_current_date_string()
         bought_shares_today[ticker] = {
             "buy_price": current_price,
@@ -382,9 +596,21 @@ def handle_buy_action(ticker: str, conid: int, current_price: float, logger: Log
             "conid": conid,
             "quantity": quantity,
             "stop_loss_price": stop_loss_price,
-            "take_profit_price": take_profit_price
+            "take_profit_price": take_profit_price,
+            "client_order_id": order.client_order_id,
+            "latency_trace": trace_data
         }
-        logger.info(f"BUY SUCCESS - {ticker}: {quantity} share(s) at MARKET (Est: ${estimated_cost:.2f}) | Stop Loss: ${stop_loss_price:.2f} | Take Profit: ${take_profit_price:.2f}")
+        if account_id is not None:
+            bought_shares_today[ticker]["account_id"] = account_id
+        if order_result.get("orders"):
+            bought_shares_today[ticker]["protective_order_ids"] = extract_child_order_ids(order_result["orders"])
+        portfolio_ledger.open_position(ticker, quantity, current_price, current_price, account_id)
+        journal_transition(POSITION_OPENED, ticker, bought_shares_today[ticker])
+        if order_authority is not None:
+            order_authority.confirm_buy(ticker, bought_shares_today[ticker])
+        reconciled = f" (reconciled by cOID {order.client_order_id})" if order.reconciled else ""
+        logger.info("BUY SUCCESS - %s: %s share(s) at MARKET%s (Est: $%.2f) | Stop Loss: $%.2f | Take Profit: $%.2f%s",
+                    ticker, quantity, format_account_suffix(account_id), context['estimated_cost'], stop_loss_price, take_profit_price, reconciled)
 
         year, month, day = get_current_date()
         position_data = {
@@ -395,17 +621,320 @@ def handle_buy_action(ticker: str, conid: int, current_price: float, logger: Log
             "market_price": current_price,
             "market_value": current_price * quantity,
             "unrealized_pnl": 0.0,
-            "currency": "USD"
+            "currency": "USD",
+            "latency_trace": trace_data
         }
-        s3_client = client('s3')
-        save_position_to_file(ticker, position_data, year, month, day, s3_client)
-        logger.info(f"{ticker} - Position saved to open_positions.json")
+        with timed("position_persist"):
+            save_position_to_file(ticker, position_data, year, month, day, storage_client)
+        logger.info("%s - Position saved to open_positions.json", ticker)
     else:
         error_msg = order_result.get('error', 'Order request failed with no error message')
+        journal_transition(ORDER_REJECTED, ticker, {"side": "BUY", "error": error_msg})
+        if order_authority is not None:
+            order_authority.release_buy(ticker)
         logger.error(f"BUY FAILED - {ticker}: {error_msg}")
 
 
+def apply_completed_orders(logger: Logger) -> None:
+    """Apply finished submissions on the calling thread; all position state changes happen here."""
+    order_manager.retry_in_doubt()
+    for order in order_manager.drain_completed():
+        if order.side == "BUY":
+            complete_buy(order, logger)
+        else:
+            complete_sell(order, logger)
+
+
+def calculate_in_flight_buy_cost(account_id: Optional[str] = None) -> float:
+    """Estimated cost of buys that may still fill, including in-doubt ones the gateway has not confirmed either way."""
+    return sum(order.context.get("estimated_cost", 0.0) for order in order_manager.pending_orders()
+               if order.side == "BUY" and (account_id is None or order.context.get("account_id") == account_id))
+
+
+def is_within_exposure_budget(estimated_cost: float, account_id: Optional[str] = None) -> bool:
+    budget = account_allocator.budget_for(account_id, settings_store.get().next_investment)
+    if budget <= 0:
+        return True
+    return estimated_cost + calculate_in_flight_buy_cost(account_id) <= portfolio_ledger.remaining_budget(budget, account_id)
+
+
+def format_account_suffix(account_id: Optional[str]) -> str:
+    return f" in {account_id}" if account_id else ""
+
+
+def rebuild_portfolio_ledger() -> None:
+    """Full rebuild after bulk state changes (restore, shard adoption); fills and ticks update incrementally."""
+    portfolio_ledger.reset()
+    for ticker, position in bought_shares_today.items():
+        portfolio_ledger.open_position(ticker, position.get("quantity", 0), position.get("buy_price", 0.0),
+                                       account_id=position.get("account_id"))
+    for closed_position in closed_positions_today:
+        portfolio_ledger.record_closed(closed_position.get("profit", 0.0), closed_position.get("account_id"))
+
+
+def reserve_buy(ticker: str, estimated_cost: float, logger: Logger) -> bool:
+    if order_authority is None:
+        return True
+
+    approved, reason = order_authority.reserve_buy(ticker, estimated_cost)
+    if not approved:
+        logger.info("BUY SKIPPED - %s: %s", ticker, reason)
+    return approved
+
+
+def create_order_journal_entry(side: str, conid: int, quantity: int, client_order_id: str) -> Dict[str, any]:
+    return {
+        "side": side,
+        "conid": conid,
+        "quantity": quantity,
+        "client_order_id": client_order_id,
+        "submitted_at": get_clock().now_utc().isoformat()
+    }
+
+
+def journal_transition(entry_type: str, ticker: str, data: Dict[str, any]) -> None:
+    if state_journal is None:
+        return
+
+    with timed("journal_write"):
+        state_journal.append(entry_type, ticker, data)
+
+
+def restore_state_from_journal(year: int, month: int, day: int, logger: Logger) -> Dict[str, Dict[str, any]]:
+    global state_journal
+
+    start = get_clock().monotonic()
+    state_journal = StateJournal(build_journal_directory(year, month, day))
+
+    try:
+        state = state_journal.recover()
+    except Exception as e:
+        logger.error(f"Failed to recover state journal, starting with empty state: {e}")
+        return {}
+
+    bought_shares_today.clear()
+    bought_shares_today.update(state.positions)
+    closed_positions_today[:] = state.closed_positions
+    rebuild_portfolio_ledger()
+    for key, client_order_id in state.client_order_ids.items():
+        ticker, side = key.rsplit(":", 1)
+        order_manager.seed(ticker, side, client_order_id)
+
+    elapsed_ms = (get_clock().monotonic() - start) * 1000
+    logger.info(f"WARM RESTART - Restored {len(bought_shares_today)} open and {len(closed_positions_today)} closed position(s), "
+                f"{len(state.pending_orders)} in-doubt order(s) from journal (sequence {state.sequence}) in {elapsed_ms:.1f}ms")
+    return state.pending_orders
+
+
+def reconcile_restored_positions(pending_orders: Dict[str, Dict[str, any]], logger: Logger) -> None:
+    """
+    Compare the journal's view with the gateway once after a restart: positions that
+    closed while the app was down are dropped and in-doubt orders are resolved.
+    Positions the gateway still holds are left to the regular sync.
+    """
+    if len(bought_shares_today) == 0 and len(pending_orders) == 0:
+        return
+
+    with timed("positions_fetch"):
+        result = broker.get_all_positions(account_allocator.accounts)
+
+    if not result.get("success"):
+        logger.warning(f"Skipping journal reconciliation, failed to fetch positions: {result.get('error', 'Unknown error')}")
+        return
+
+    gateway_tickers = {extract_position_data(position_data)[0] for position_data in result.get("positions", [])}
+
+    for ticker in [ticker for ticker in bought_shares_today if ticker not in gateway_tickers]:
+        logger.warning(f"{ticker} - Restored position no longer held at the gateway, dropping it")
+        bought_shares_today.pop(ticker, None)
+        portfolio_ledger.remove(ticker)
+        journal_transition(POSITION_DROPPED, ticker, {})
+
+    live_orders = broker.get_live_orders() if pending_orders else {}
+    for key, order in pending_orders.items():
+        ticker = key.rsplit(":", 1)[0]
+        held = "position held at the gateway" if ticker in gateway_tickers else "no position at the gateway"
+        logger.warning(f"{ticker} - In-doubt {order.get('side')} order submitted at {order.get('submitted_at')}, {held}, "
+                       f"{describe_live_order(live_orders, order.get('client_order_id'))}")
+        journal_transition(ORDER_REJECTED, ticker, {"side": order.get("side"), "error": "In doubt after restart"})
+
+    logger.info(f"Journal reconciliation complete - {len(bought_shares_today)} position(s) confirmed at the gateway")
+
+
+def describe_live_order(live_orders: Dict[str, any], client_order_id: Optional[str]) -> str:
+    if not client_order_id:
+        return "no cOID recorded"
+    if not live_orders.get("success"):
+        return f"cOID {client_order_id} not checked: {live_orders.get('error', 'live orders unavailable')}"
+    legs = find_orders_by_client_order_id(live_orders.get("orders", []), client_order_id)
+    if not legs:
+        return f"cOID {client_order_id} not at the gateway"
+    return f"cOID {client_order_id} at the gateway as {legs[0].get('order_status')}"
+
+
+def initialize_session_at_startup(logger: Logger) -> bool:
+    logger.info("Initializing IBKR Client Portal connection...")
+    session_initialized = initialize_ibkr_brokerage_session(logger)
+
+    if session_initialized:
+        logger.info("IBKR session ready - Real-time market data should now be available")
+    else:
+        logger.warning("IBKR session initialization had issues - You may receive delayed data (DPB)")
+        logger.warning("The application will continue, but verify market data in logs")
+    return session_initialized
+
+
+def sync_positions_at_startup(pending_orders: Dict[str, Dict[str, any]], s3_client, logger: Logger) -> bool:
+    reconcile_restored_positions(pending_orders, logger)
+    fetch_and_sync_positions(logger, s3_client)
+    return True
+
+
+def run_startup_sequence(report: StartupReport, logger: Logger) -> Dict[str, any]:
+    """
+    Cold start with independent steps in parallel: the S3 role and the gateway session
+    come up together, the daily files download into memory once S3 is ready, and
+    contract IDs and subscriptions are warmed as soon as the watchlist and session exist.
+    """
+    global daily_files_downloaded
+
+    year, month, day = get_current_date()
+    startup = StartupOrchestrator(report)
+    results = startup.results
+
+    startup.add_step("s3_client", lambda: assume_iam_role(IAM_ROLE_NAME, logger))
+    startup.add_step("gateway_session", lambda: initialize_session_at_startup(logger))
+    startup.add_step("journal_restore", lambda: restore_state_from_journal(year, month, day, logger))
+    startup.add_step("settings_download", lambda: download_settings_file(results["s3_client"], S3_BUCKET, logger),
+                     depends_on=["s3_client"])
+    startup.add_step("companies_download", lambda: download_companies_list(results["s3_client"], S3_BUCKET, year, month, day, logger),
+                     depends_on=["s3_client"])
+    startup.add_step("positions_sync", lambda: sync_positions_at_startup(results["journal_restore"], results["s3_client"], logger),
+                     depends_on=["s3_client", "gateway_session", "journal_restore"])
+    startup.add_step("market_data_warmup", lambda: warm_market_data(results["companies_download"] or [], logger),
+                     depends_on=["gateway_session", "companies_download"])
+    startup.add_step("closing_price_bootstrap", lambda: bootstrap_closing_prices(results["companies_download"] or [], logger),
+                     depends_on=["market_data_warmup"])
+
+    startup.run()
+    daily_files_downloaded = bool(results["settings_download"] and results["companies_download"])
+    return results
+
+
+def log_startup_report(report: StartupReport, logger: Logger) -> None:
+    report.mark_once("first_cycle_complete")
+    logger.info(report.format_report())
+    if "first_evaluation" in report.milestones:
+        set_gauge("startup_time_to_first_evaluation_seconds", round(report.milestones["first_evaluation"], 3))
+
+
+def get_current_day() -> date:
+    return date(*get_current_date())
+
+
+def is_after_market_close() -> bool:
+    return get_current_eastern_time() > MARKET_CLOSE_TIME
+
+
+def has_session_closed(day: date) -> bool:
+    """True once the close of this trading day has passed, not just any evening on the Eastern clock."""
+    return get_current_eastern_date() == day and is_after_market_close()
+
+
+def fetch_daily_inputs(day: date, s3_client, logger: Logger) -> Optional[DailyInputs]:
+    """Download a day's watchlist and settings into memory and resolve its contract IDs."""
+    try:
+        companies = fetch_companies_list(s3_client, S3_BUCKET, day.year, day.month, day.day)
+    except Exception as e:
+        logger.info(f"Companies for {day.isoformat()} not available yet: {e}")
+        return None
+
+    settings_store.refresh(s3_client)
+
+    for ticker in companies:
+        try:
+            resolve_conid(ticker, logger)
+        except Exception as e:
+            logger.warning(f"{ticker} - Could not resolve contract ID during prefetch: {e}")
+
+    return DailyInputs(day=day, settings=settings_store.get().to_dict(), companies=companies)
+
+
+def reset_daily_state(day: date, logger: Logger) -> None:
+    global cached_settings, cached_companies, daily_files_downloaded
+
+    if state_journal is not None:
+        state_journal.checkpoint()
+        state_journal.close()
+
+    if bought_shares_today:
+        logger.warning(f"Clearing {len(bought_shares_today)} position(s) still tracked at the day boundary; the next sync will re-add open ones")
+
+    bought_shares_today.clear()
+    closed_positions_today.clear()
+    closing_prices_by_ticker.clear()
+    broker_flat_syncs.clear()
+    split_position_tickers.clear()
+    portfolio_ledger.reset()
+    poll_scheduler.reset()
+    order_manager.reset()
+    clear_price_alerts(logger)
+    order_traces_today.clear()
+    last_parsed_data_by_ticker.clear()
+    snapshot_change_detector.reset()
+    cached_settings = None
+    cached_companies = None
+    daily_files_downloaded = False
+
+    restore_state_from_journal(day.year, day.month, day.day, logger)
+
+
+def apply_daily_inputs(inputs: DailyInputs, logger: Logger) -> None:
+    global cached_settings, cached_companies, daily_files_downloaded
+
+    cached_settings = inputs.settings
+    cached_companies = inputs.companies
+    daily_files_downloaded = True
+
+    conids = [conid_cache[ticker] for ticker in inputs.companies if ticker in conid_cache]
+    try:
+        primed = prime_market_data_subscriptions(conids)
+    except Exception as e:
+        primed = 0
+        logger.warning(f"Failed to prime market data subscriptions: {e}")
+    logger.info(f"Switched to {inputs.day.isoformat()}: {len(inputs.companies)} companies, {primed} subscription(s) primed")
+
+
+def handle_day_rollover(s3_client, logger: Logger) -> None:
+    """
+    Prefetch the next trading day's inputs once the market has closed, and swap all
+    per-day state in one step when the date changes. Days without prefetched inputs
+    (weekends, holidays, late uploads) keep retrying until the files are published.
+    """
+    global active_trading_day, day_prefetcher
+
+    today = get_current_day()
+    if day_prefetcher is None:
+        day_prefetcher = DayRolloverPrefetcher(lambda day: fetch_daily_inputs(day, s3_client, logger), logger,
+                                               PREFETCH_RETRY_INTERVAL)
+    if active_trading_day is None:
+        active_trading_day = today
+
+    if today != active_trading_day:
+        logger.info(f"DAY ROLLOVER - {active_trading_day.isoformat()} -> {today.isoformat()}")
+        reset_daily_state(today, logger)
+        active_trading_day = today
+
+        day_prefetcher.schedule(first_trading_day_from(today))
+
+    if not daily_files_downloaded and day_prefetcher.is_ready(today):
+        apply_daily_inputs(day_prefetcher.take(today), logger)
+    elif daily_files_downloaded and has_session_closed(today):
+        day_prefetcher.schedule(next_weekday(today))
+
+
 def handle_end_of_day_sales(logger: Logger) -> None:
+    apply_completed_orders(logger)
     if not is_close_to_market_close():
         return
 
@@ -418,6 +947,68 @@ def handle_end_of_day_sales(logger: Logger) -> None:
         sell_at_market_price(ticker, logger)
 
 
+def reconcile_closed_positions_with_executions(logger: Logger) -> bool:
+    """
+    Replace the estimated prices of today's closed positions with their executions:
+    the gateway returns every conid's fills in one request, including stop and target
+    legs it triggered itself. False when the executions could not be read.
+    """
+    with timed("executions_fetch"):
+        result = broker.get_executions()
+    if not result.get("success"):
+        logger.warning(f"EOD RECONCILIATION - Executions unavailable: {result.get('error')}")
+        return False
+
+    reconciled, matched = reconcile_closed_positions(closed_positions_today, result.get("executions", []))
+    for previous, position in zip(closed_positions_today, reconciled):
+        portfolio_ledger.adjust_realized(position["profit"] - previous["profit"], position.get("account_id"))
+    closed_positions_today[:] = reconciled
+    journal_transition(CLOSED_POSITIONS_RECONCILED, "", {"positions": reconciled})
+    increment("closed_positions_reconciled", amount=matched)
+    unmatched = [position["symbol"] for position in reconciled if not position.get("reconciled")]
+    logger.info(f"EOD RECONCILIATION - {matched}/{len(reconciled)} closed position(s) matched to "
+                f"{len(result.get('executions', []))} execution(s)" + (f", estimates kept for {', '.join(unmatched)}" if unmatched else ""))
+    return True
+
+
+def finalize_closed_positions(s3_client, logger: Logger) -> None:
+    """
+    In the end-of-day window, once every position is closed and no order is in
+    flight (or the session is over), rewrite the closed positions from the
+    executions and upload them. Runs again only if more positions close afterwards.
+    Unreadable executions are retried until the close; after that the estimates
+    are saved.
+    """
+    global closed_positions_finalized_day, closed_positions_finalized_count, last_executions_attempt_time
+
+    today = get_current_day()
+    session_closed = has_session_closed(today)
+    if closed_positions_finalized_day == today and len(closed_positions_today) == closed_positions_finalized_count:
+        return
+    if not (is_close_to_market_close() or session_closed):
+        return
+    if not session_closed and (bought_shares_today or order_manager.in_flight_orders()):
+        return
+
+    if closed_positions_today:
+        now = get_clock().monotonic()
+        if last_executions_attempt_time is not None and now - last_executions_attempt_time < EXECUTIONS_RETRY_SECONDS:
+            return
+        last_executions_attempt_time = now
+        if not reconcile_closed_positions_with_executions(logger) and not session_closed:
+            return
+
+    closed_positions_finalized_day = today
+    closed_positions_finalized_count = len(closed_positions_today)
+    last_executions_attempt_time = None
+
+    year, month, day = get_current_date()
+    save_closed_positions_to_file(year, month, day, s3_client, logger)
+    save_order_latency_summary(year, month, day, logger)
+    if state_journal is not None:
+        state_journal.checkpoint()
+
+
 def has_previous_close(parsed_data: Dict) -> bool:
     return parsed_data.get('previous_close') is not None
 
@@ -434,8 +1025,33 @@ def is_valid_snapshot(snapshot: Optional[List]) -> bool:
     return snapshot is not None and len(snapshot) > 0
 
 
+def emit_metrics_if_due(logger: Logger) -> None:
+    global last_metrics_emit_time
+
+    now = get_clock().monotonic()
+    if now - last_metrics_emit_time < METRICS_SUMMARY_INTERVAL:
+        return
+
+    last_metrics_emit_time = now
+    for name, value in portfolio_ledger.to_dict().items():
+        set_gauge(f"portfolio_{name}", value)
+    for account_id, totals in portfolio_ledger.account_summary().items():
+        for name, value in totals.items():
+            set_gauge(f"account_{name}", value, "account", account_id)
+    logger.info(format_cycle_summary())
+    for name, breaker in circuit_breakers.items():
+        if breaker.state != CIRCUIT_CLOSED:
+            logger.warning("Circuit %s is %s after %d consecutive failure(s)", name, breaker.state, breaker.consecutive_failures)
+
+    file_path = build_metrics_file_path()
+    try:
+        write_prometheus_file(file_path)
+    except Exception as e:
+        logger.warning(f"Failed to write metrics file {file_path}: {e}")
+
+
 def log_next_update_time(update_interval: int, logger: Logger) -> None:
-    next_update = datetime.now(timezone.utc) + timedelta(seconds=update_interval)
+    next_update = get_clock().now_utc() + timedelta(seconds=update_interval)
     logger.info(f"Next update at: {next_update.strftime('%Y-%m-%d %H:%M:%S UTC')}")
 
 
@@ -449,114 +1065,474 @@ def evaluate_and_log_trading_opportunity(ticker: str, parsed_data: Dict, closing
         conid = int(parsed_data.get('conid'))
         evaluate_trading_opportunity(ticker, current_price, close_price_value, conid, logger)
     except (ValueError, TypeError) as e:
-        logger.warning(f"{ticker} - Could not evaluate trading opportunity: {e}")
+        logger.warning("%s - Could not evaluate trading opportunity: %s", ticker, e)
 
 
-def extract_current_price(ticker: str, market_data_by_ticker: Dict[str, Dict]) -> Optional[float]:
-    if ticker not in market_data_by_ticker:
-        return None
+def get_marked_price(ticker: str) -> Optional[float]:
+    position = portfolio_ledger.positions.get(ticker)
+    return position.mark if position else None
 
-    parsed_data = market_data_by_ticker[ticker]
-    last_price_str = parsed_data.get('last_price')
 
-    if not last_price_str:
-        return None
+def log_positions_summary(logger: Logger) -> None:
+    if not portfolio_ledger.positions:
+        logger.info("CURRENT POSITIONS: None")
+        return
 
-    try:
-        return float(last_price_str)
-    except (ValueError, TypeError):
+    logger.info("CURRENT POSITIONS (%d): %s | %s", len(bought_shares_today),
+                portfolio_ledger.format_summary(), portfolio_ledger.format_totals())
+
+
+def process_all_companies(companies: List[str], market_data_dir: str, year: int, month: int, day: int, logger: Logger) -> Dict[str, Dict]:
+    logger.info("Updating market data for %d companies...", len(companies))
+
+    market_data_by_ticker = {}
+
+    for index, company in enumerate(companies):
+        if market_data_circuit.is_rejecting():
+            for deferred in companies[index:]:
+                poll_scheduler.expedite(deferred)
+            logger.warning("Market data circuit opened, %d ticker(s) deferred to the next cycle", len(companies) - index)
+            break
+        try:
+            with timed("process_company"):
+                parsed_data = process_company(company, market_data_dir, year, month, day, logger)
+        finally:
+            reschedule_poll(company)
+        if parsed_data:
+            market_data_by_ticker[company] = parsed_data
+
+    return market_data_by_ticker
+
+
+def process_company(ticker: str, market_data_dir: str, year: int, month: int, day: int, logger: Logger) -> Optional[Dict]:
+    market_data = fetch_market_snapshot(ticker, logger)
+    if market_data is None:
         return None
 
+    return process_market_data(ticker, market_data, market_data_dir, year, month, day, logger)
 
-def format_position_with_price(ticker: str, buy_price: float, current_price: float) -> str:
-    price_change = current_price - buy_price
-    price_change_pct = (price_change / buy_price) * 100
-    return f"{ticker} [Buy: ${buy_price:.2f} | Now: ${current_price:.2f} | P/L: {price_change:+.2f} ({price_change_pct:+.2f}%)]"
 
+def process_market_data(ticker: str, market_data: Dict, market_data_dir: str, year: int, month: int, day: int, logger: Logger) -> Optional[Dict]:
+    if not snapshot_change_detector.should_process(market_data):
+        return last_parsed_data_by_ticker.get(ticker)
 
-def format_position_without_price(ticker: str, buy_price: float) -> str:
-    return f"{ticker} [Buy: ${buy_price:.2f} | Now: N/A]"
+    parsed_data = parse_and_log_market_data(ticker, market_data, logger)
+    last_parsed_data_by_ticker[ticker] = parsed_data
+    update_broker_price(ticker, parsed_data)
+    mark_ledger_price(ticker, parsed_data)
 
+    file_path = f"{market_data_dir}/{ticker}.json"
+    existing_closing_price = get_known_closing_price(ticker, file_path, logger)
+    closing_price = determine_closing_price(parsed_data, existing_closing_price, logger, ticker)
+    if closing_price is not None:
+        closing_prices_by_ticker[ticker] = closing_price
+    record_tick(ticker, parsed_data, closing_price)
 
-def format_position_detail(ticker: str, position: Dict[str, any], market_data_by_ticker: Dict[str, Dict]) -> str:
-    buy_price = position.get("buy_price")
-    current_price = extract_current_price(ticker, market_data_by_ticker)
+    with timed("evaluate"):
+        evaluate_and_log_trading_opportunity(ticker, parsed_data, closing_price, logger)
+    if startup_report is not None:
+        startup_report.mark_once("first_evaluation")
 
-    if current_price:
-        return format_position_with_price(ticker, buy_price, current_price)
-    else:
-        return format_position_without_price(ticker, buy_price)
+    company_data = create_company_data(ticker, parsed_data, closing_price, year, month, day)
+    with timed("file_write"):
+        save_company_data(file_path, company_data, logger, ticker)
 
+    return parsed_data
 
-def has_open_positions() -> bool:
-    return len(bought_shares_today) > 0
 
+def get_known_closing_price(ticker: str, file_path: str, logger: Logger) -> Optional[str]:
+    closing_price = closing_prices_by_ticker.get(ticker)
+    if closing_price is not None:
+        return closing_price
 
-def log_positions_summary(market_data_by_ticker: Dict[str, Dict], logger: Logger) -> None:
-    if not has_open_positions():
-        logger.info("CURRENT POSITIONS: None")
-        return
+    with timed("file_read"):
+        return get_existing_closing_price(file_path, logger)
 
-    positions_details = [
-        format_position_detail(ticker, position, market_data_by_ticker)
-        for ticker, position in sorted(bought_shares_today.items())
-    ]
 
-    positions_summary = ", ".join(positions_details)
-    logger.info(f"CURRENT POSITIONS ({len(bought_shares_today)}): {positions_summary}")
+def load_closing_prices(companies: List[str], market_data_dir: str, logger: Logger) -> int:
+    for ticker in companies:
+        if ticker not in closing_prices_by_ticker:
+            closing_price = get_existing_closing_price(f"{market_data_dir}/{ticker}.json", logger)
+            if closing_price is not None:
+                closing_prices_by_ticker[ticker] = closing_price
+    return sum(1 for ticker in companies if ticker in closing_prices_by_ticker)
 
 
-def process_all_companies(companies: List[str], market_data_dir: str, year: int, month: int, day: int, logger: Logger) -> Dict[str, Dict]:
-    logger.info(f"Updating market data for {len(companies)} companies...")
+def bootstrap_closing_prices(companies: List[str], logger: Logger) -> int:
+    """Seed the previous session's official close for every ticker from daily bars, so the first tick can be evaluated."""
+    missing = [ticker for ticker in companies if ticker not in closing_prices_by_ticker and ticker in conid_cache]
+    if not missing:
+        return 0
 
-    market_data_by_ticker = {}
+    tickers_by_conid = {conid_cache[ticker]: ticker for ticker in missing}
+    with timed("closing_price_bootstrap"):
+        closes = get_previous_closes(list(tickers_by_conid), get_current_eastern_date())
 
-    for company in companies:
-        parsed_data = process_company(company, market_data_dir, year, month, day, logger)
-        if parsed_data:
-            market_data_by_ticker[company] = parsed_data
+    seeded = 0
+    for conid, close in closes.items():
+        if close is not None:
+            closing_prices_by_ticker[tickers_by_conid[conid]] = f"{close:.2f}"
+            seeded += 1
 
-    return market_data_by_ticker
+    logger.info(f"Seeded {seeded}/{len(missing)} previous close(s) from daily bars")
+    return seeded
 
 
-def process_company(ticker: str, market_data_dir: str, year: int, month: int, day: int, logger: Logger) -> Optional[Dict]:
-    parsed_data = fetch_and_parse_market_data(ticker, logger)
-    if parsed_data is None:
-        return None
+def seconds_since_market_open() -> float:
+    today = get_current_eastern_date()
+    opened_at = datetime.combine(today, MARKET_OPEN_TIME)
+    return (datetime.combine(today, get_current_eastern_time()) - opened_at).total_seconds()
 
-    file_path = f"{market_data_dir}/{ticker}.json"
-    existing_closing_price = get_existing_closing_price(file_path, logger)
-    closing_price = determine_closing_price(parsed_data, existing_closing_price, logger, ticker)
 
-    evaluate_and_log_trading_opportunity(ticker, parsed_data, closing_price, logger)
+def is_pre_open_window() -> bool:
+    seconds = seconds_since_market_open()
+    return -PRE_OPEN_WARMUP_LEAD_MINUTES * 60 <= seconds < 0
 
-    company_data = create_company_data(ticker, parsed_data, closing_price, year, month, day)
-    save_company_data(file_path, company_data, logger, ticker)
 
-    return parsed_data
+def is_opening_burst_window() -> bool:
+    return 0 <= seconds_since_market_open() < OPENING_BURST_WINDOW_MINUTES * 60
 
 
-def run_market_data_collection_cycle(s3_client, logger: Logger) -> Optional[Dict[str, Dict]]:
-    global cached_settings, cached_companies
+def run_pre_open_warmup(companies: List[str], logger: Logger) -> None:
+    """Resolve conids, open subscriptions and load known closes while nothing else is happening."""
+    year, month, day = get_current_date()
+    with timed("pre_open_warmup"):
+        warm_market_data(companies, logger)
+        load_closing_prices(companies, create_directories(year, month, day), logger)
+        bootstrap_closing_prices(companies, logger)
+        loaded = sum(1 for ticker in companies if ticker in closing_prices_by_ticker)
+    logger.info(f"PRE-OPEN WARMUP - {len(conid_cache)} contract ID(s) cached, {loaded}/{len(companies)} closing price(s) loaded")
+
+    if ALERT_OFFLOAD_ENABLED:
+        arm_opening_price_alerts(companies, logger)
+
+
+def fetch_snapshot_batches(conids: List[int], logger: Logger) -> List[Dict]:
+    def fetch_batch(batch: List[int]) -> List[Dict]:
+        try:
+            return get_market_snapshots(batch)
+        except Exception as e:
+            logger.warning(f"Opening burst batch of {len(batch)} snapshot(s) failed: {e}")
+            return []
+
+    with ThreadPoolExecutor(max_workers=OPENING_BURST_WORKERS, thread_name_prefix="burst") as executor:
+        return [item for items in executor.map(fetch_batch, split_batches(conids)) for item in items]
+
+
+def order_burst_by_signal(snapshots: List[Dict], tickers_by_conid: Dict[int, str]) -> List[Dict]:
+    """
+    Classify the whole burst in one vectorized pass and put tickers already in the
+    buy band first, so the burst budget goes to tickers that can trade.
+    """
+    closes = []
+    for market_data in snapshots:
+        closing_price = closing_prices_by_ticker.get(tickers_by_conid.get(int(market_data.get('conid', 0))))
+        closes.append(float(closing_price) if closing_price is not None else float('nan'))
+
+    actions = evaluate_watchlist([extract_last_price(market_data) for market_data in snapshots], closes)
+    order = np.argsort(actions != ACTION_BUY, kind="stable")
+    return [snapshots[index] for index in order]
 
+
+def run_opening_burst(companies: List[str], logger: Logger) -> None:
+    """
+    At the open, snapshot the whole watchlist in batched concurrent requests and
+    evaluate as many tickers as fit in OPENING_BURST_BUDGET_SECONDS. Tickers left over
+    stay with the poll scheduler. Records the open-to-first-decision latency.
+    """
     year, month, day = get_current_date()
     market_data_dir = create_directories(year, month, day)
+    tickers_by_conid = {conid_cache[ticker]: ticker for ticker in companies if ticker in conid_cache}
+    deadline = get_clock().monotonic() + OPENING_BURST_BUDGET_SECONDS
+
+    with timed("opening_burst_fetch"):
+        snapshots = fetch_snapshot_batches(list(tickers_by_conid), logger)
+    snapshots = order_burst_by_signal(snapshots, tickers_by_conid)
+
+    evaluated = 0
+    first_decision = None
+    snapshot_change_detector.start_cycle()
+    for market_data in snapshots:
+        if get_clock().monotonic() >= deadline:
+            break
+
+        ticker = tickers_by_conid.get(int(market_data.get('conid', 0)))
+        if ticker is None:
+            continue
+
+        with timed("process_company"):
+            process_market_data(ticker, market_data, market_data_dir, year, month, day, logger)
+        reschedule_poll(ticker)
+        evaluated += 1
+        if first_decision is None and ticker in closing_prices_by_ticker:
+            first_decision = seconds_since_market_open()
+
+    flush_tick_buffer(market_data_dir, logger)
+    if first_decision is not None:
+        set_gauge("open_to_first_decision_seconds", round(first_decision, 3))
+    set_gauge("opening_burst_evaluated", evaluated)
+    first_decision_text = f"{first_decision:.3f}s after the open" if first_decision is not None else "none"
+    logger.info(f"OPENING BURST - evaluated {evaluated}/{len(companies)} ticker(s) from {len(snapshots)} snapshot(s), "
+                f"first decision {first_decision_text}")
+
+
+def handle_market_open(companies: List[str], logger: Logger) -> None:
+    """Run the pre-open warmup and the opening burst once per trading day."""
+    global pre_open_warmup_day, opening_burst_day
+
+    today = get_current_eastern_date()
+    if today.weekday() >= 5 or not companies:
+        return
+
+    if pre_open_warmup_day != today and is_pre_open_window():
+        pre_open_warmup_day = today
+        run_pre_open_warmup(companies, logger)
+    elif opening_burst_day != today and is_opening_burst_window():
+        opening_burst_day = today
+        run_opening_burst(companies, logger)
+
+
+def record_tick(ticker: str, parsed_data: Dict, closing_price: Optional[str]) -> None:
+    last_price = parsed_data.get('last_price')
+    if not last_price:
+        return
+
+    timestamp = parsed_data.get('timestamp') or get_clock().now_utc()
+    epoch_ms = int(timestamp.timestamp() * 1000)
+    tick_buffer.append(f"{epoch_ms},{ticker},{last_price},{closing_price or ''}\n")
+
+
+def flush_tick_buffer(market_data_dir: str, logger: Logger) -> None:
+    if len(tick_buffer) == 0:
+        return
+
+    try:
+        with timed("file_write"), open(f"{market_data_dir}/{TICKS_FILE_NAME}", 'a') as f:
+            f.writelines(tick_buffer)
+        tick_buffer.clear()
+    except Exception as e:
+        logger.error(f"Failed to append ticks to {market_data_dir}/{TICKS_FILE_NAME}: {e}")
+
+
+def update_broker_price(ticker: str, parsed_data: Dict) -> None:
+    try:
+        broker.update_price(int(parsed_data.get('conid')), float(parsed_data.get('last_price')), ticker)
+    except (ValueError, TypeError):
+        pass
+
+
+def mark_ledger_price(ticker: str, parsed_data: Dict) -> None:
+    try:
+        portfolio_ledger.mark(ticker, float(parsed_data.get('last_price')))
+    except (ValueError, TypeError):
+        pass
+
+
+def sync_positions_if_due(logger: Logger, s3_client=None) -> None:
+    """
+    The broker position sync runs on its own interval instead of every cycle: the
+    portfolio endpoint is outside the poll token bucket and the loop cycles several
+    times a second.
+    """
+    now = get_clock().monotonic()
+    if last_position_sync_time is not None and now - last_position_sync_time < POSITION_SYNC_INTERVAL_SECONDS:
+        return
+    fetch_and_sync_positions(logger, s3_client)
 
-    # Use cached values if available, otherwise return None
+
+def run_trading_cycle(s3_client, logger: Logger) -> None:
+    """
+    One pass of the trading loop, shared by the single-process app and the cluster
+    workers: day rollover, broker position sync (closes bracket exits), market data
+    and signals, end-of-day sells, closed-position finalization and metrics.
+    """
+    handle_day_rollover(s3_client, logger)
+
+    with timed("cycle"):
+        sync_positions_if_due(logger, s3_client)
+
+        market_data_by_ticker = run_market_data_collection_cycle(s3_client, logger)
+
+    if market_data_by_ticker is not None:
+        handle_end_of_day_sales(logger)
+        finalize_closed_positions(s3_client, logger)
+
+        log_positions_summary(logger)
+
+    emit_metrics_if_due(logger)
+
+
+def run_market_data_collection_cycle(s3_client, logger: Logger) -> Optional[Dict[str, Dict]]:
+    global cached_settings, cached_companies
+
+    # Use cached values if available, otherwise idle until the day rollover loads them (weekends, holidays)
     if not daily_files_downloaded or cached_settings is None or cached_companies is None:
-        logger.warning("Daily files not yet downloaded - skipping market data collection")
+        logger.info("Daily files not yet downloaded - skipping market data collection")
+        get_clock().sleep(MAX_IDLE_POLL_WAIT_SECONDS)
         return None
 
-    market_data_by_ticker = process_all_companies(cached_companies, market_data_dir, year, month, day, logger)
+    handle_market_open(cached_companies, logger)
+    return collect_market_data(cached_companies, logger)
+
+
+def collect_market_data(companies: List[str], logger: Logger) -> Dict[str, Dict]:
+    year, month, day = get_current_date()
+    market_data_dir = create_directories(year, month, day)
+    apply_completed_orders(logger)
+
+    poll_scheduler.sync(companies)
+    check_price_alerts(logger)
+    if market_data_circuit.is_rejecting():
+        logger.warning("Market data circuit open, polling paused (%d consecutive failure(s))", market_data_circuit.consecutive_failures)
+        get_clock().sleep(MAX_IDLE_POLL_WAIT_SECONDS)
+        due_companies = []
+    else:
+        wait_for_next_poll()
+        due_companies = poll_scheduler.take_due()
+    set_gauge("poll_overdue_seconds", round(poll_scheduler.overdue_seconds(), 3))
+
+    snapshot_change_detector.start_cycle()
+    market_data_by_ticker = process_all_companies(due_companies, market_data_dir, year, month, day, logger)
+    flush_tick_buffer(market_data_dir, logger)
+    register_price_alerts(logger)
+    logger.info(snapshot_change_detector.format_cycle_summary())
+    increment("snapshots_processed_total", amount=snapshot_change_detector.processed)
+    increment("snapshots_skipped_total", amount=snapshot_change_detector.skipped)
 
     return market_data_by_ticker
 
 
+def wait_for_next_poll() -> None:
+    """Sleep until a ticker is due, capped so the loop still checks rollover and end of day."""
+    wait = poll_scheduler.seconds_until_next_due()
+    if wait is None:
+        wait = MAX_IDLE_POLL_WAIT_SECONDS
+    get_clock().sleep(min(wait, MAX_IDLE_POLL_WAIT_SECONDS))
+
+
+def reschedule_poll(ticker: str) -> None:
+    """Tickers the gateway is watching with a price alert fall back to slow background polling."""
+    held = ticker in bought_shares_today
+    fallback = ALERT_FALLBACK_POLL_SECONDS if not held and price_alert_book.is_armed(ticker) else None
+    poll_scheduler.reschedule(ticker, held, fallback)
+
+
+def queue_price_alert(ticker: str, price_change_pct: float, closing_price: float) -> None:
+    if not ALERT_OFFLOAD_ENABLED or ticker in bought_shares_today or price_alert_book.is_tracked(ticker):
+        return
+    if distance_to_buy_band(price_change_pct) < ALERT_REARM_DISTANCE_PCT:
+        return
+
+    bound = choose_alert_bound(price_change_pct, *calculate_buy_range_prices(closing_price))
+    if bound is not None:
+        price_alert_book.request(ticker, *bound)
+
+
+def arm_opening_price_alerts(companies: List[str], logger: Logger) -> None:
+    """Before the open every price sits at its close, below the buy band: watch each lower bound."""
+    clear_price_alerts(logger)
+    for ticker in companies:
+        closing_price = closing_prices_by_ticker.get(ticker)
+        if closing_price is not None:
+            queue_price_alert(ticker, 0.0, float(closing_price))
+    armed = register_price_alerts(logger, limit=None)
+    logger.info(f"PRICE ALERTS - armed {armed}/{len(companies)} ticker(s) before the open")
+
+
+def register_price_alerts(logger: Logger, limit: Optional[int] = ALERT_REGISTRATIONS_PER_CYCLE) -> int:
+    """Register queued alerts, a few per cycle so registration never crowds out polling."""
+    pending = price_alert_book.take_pending(limit)
+    if not pending:
+        return 0
+
+    account_id = ensure_account_id(None)
+    if account_id is None:
+        logger.warning("No account available for price alerts - %d ticker(s) stay on regular polling", len(pending))
+        return 0
+
+    armed = 0
+    for ticker, operator, price in pending:
+        conid = conid_cache.get(ticker)
+        if conid is None:
+            continue
+        try:
+            alert_id = create_price_alert(account_id, f"{ALERT_NAME_PREFIX}{ticker}", conid, operator, price)
+        except Exception as e:
+            logger.warning("%s - Failed to register price alert %s $%.2f: %s", ticker, operator, price, e)
+            continue
+
+        price_alert_book.mark_armed(ticker, alert_id, operator, price)
+        poll_scheduler.reschedule(ticker, False, ALERT_FALLBACK_POLL_SECONDS)
+        armed += 1
+
+    set_gauge("price_alerts_armed", price_alert_book.armed_count)
+    return armed
+
+
+def check_price_alerts(logger: Logger) -> None:
+    """Read the alert list and make every ticker whose alert fired due for a snapshot now."""
+    global last_alert_check_time
+
+    if price_alert_book.armed_count == 0:
+        return
+    now = get_clock().monotonic()
+    if last_alert_check_time is not None and now - last_alert_check_time < ALERT_CHECK_INTERVAL_SECONDS:
+        return
+    last_alert_check_time = now
+
+    account_id = ensure_account_id(None)
+    try:
+        with timed("alert_check"):
+            triggered = price_alert_book.consume_triggered(get_triggered_alert_ids(get_alerts(account_id)))
+    except Exception as e:
+        logger.warning("Failed to read price alerts, armed tickers stay on %.0fs polling: %s", ALERT_FALLBACK_POLL_SECONDS, e)
+        return
+
+    for ticker, alert_id in triggered:
+        poll_scheduler.expedite(ticker)
+        delete_price_alert(account_id, alert_id, logger)
+
+    if triggered:
+        increment("price_alerts_triggered_total", amount=len(triggered))
+        logger.info("PRICE ALERTS - %d triggered: %s", len(triggered), ', '.join(ticker for ticker, _ in triggered))
+    set_gauge("price_alerts_armed", price_alert_book.armed_count)
+
+
+def delete_price_alert(account_id: str, alert_id: int, logger: Logger) -> None:
+    try:
+        if not delete_alert(account_id, alert_id):
+            logger.warning("Gateway refused to delete price alert %s", alert_id)
+    except Exception as e:
+        logger.warning("Failed to delete price alert %s: %s", alert_id, e)
+
+
+def clear_price_alerts(logger: Logger) -> None:
+    """Delete this app's price alerts on the gateway, including any left behind by an earlier run."""
+    price_alert_book.clear()
+    set_gauge("price_alerts_armed", 0)
+    if not ALERT_OFFLOAD_ENABLED:
+        return
+
+    account_id = ensure_account_id(None)
+    if account_id is None:
+        return
+    try:
+        alert_ids = find_alert_ids(get_alerts(account_id), ALERT_NAME_PREFIX)
+    except Exception as e:
+        logger.warning(f"Failed to list price alerts for cleanup: {e}")
+        return
+
+    for alert_id in alert_ids:
+        delete_price_alert(account_id, alert_id, logger)
+    if alert_ids:
+        logger.info(f"Removed {len(alert_ids)} price alert(s)")
+
+
 def save_company_data(file_path: str, company_data: Dict, logger: Logger, ticker: str) -> bool:
     try:
         with open(file_path, 'w') as f:
             f.write(dumps(company_data, indent=2))
-        logger.info(f"{ticker} - Market data saved to: {file_path}")
+        logger.info("%s - Market data saved to: %s", ticker, file_path)
         return True
     except Exception as e:
         logger.error(f"{ticker} - Failed to save market data: {e}")
@@ -566,36 +1542,130 @@ def save_company_data(file_path: str, company_data: Dict, logger: Logger, ticker
 def sell_at_market_price(ticker: str, logger: Logger, current_price: Optional[float] = None) -> None:
     position = bought_shares_today.get(ticker)
 
-    if not position:
+    if not position or order_manager.is_pending(ticker, "SELL"):
         return
 
-    buy_price = position.get("buy_price")
-    buy_date = position.get("buy_date", get_current_date_string())
     conid = position.get("conid")
     quantity = position.get("quantity", 1)
+    account_id = position.get("account_id")
+    protective_order_ids = position.get("protective_order_ids")
+    trace = start_order_trace(ticker, "SELL")
+    client_order_id = order_manager.next_client_order_id(get_current_day(), ticker, "SELL")
+    journal_transition(ORDER_SUBMITTED, ticker, create_order_journal_entry("SELL", conid, quantity, client_order_id))
+
+    def send(order_id: str) -> Dict[str, any]:
+        with timed("order_sell"), tracing(trace):
+            if protective_order_ids:
+                cancelled = cancel_protective_orders(protective_order_ids, account_id)
+                if not cancelled.get("success"):
+                    return cancelled
+            result = broker.place_market_sell_order(conid=conid, quantity=quantity, account_id=account_id, client_order_id=order_id)
+            return dict(result, protection_cancelled=bool(protective_order_ids))
+
+    order_manager.submit(ticker, "SELL", client_order_id, send, {"price": current_price, "trace": trace})
+    apply_completed_orders(logger)
+
+
+def complete_sell(order: ManagedOrder, logger: Logger) -> None:
+    ticker = order.ticker
+    order_result = order.result
+    trace = order.context.pop("trace", None)
+    if trace is not None:
+        order.context["trace_data"] = record_order_trace(trace, logger)
+
+    if order_result.get(IN_DOUBT_KEY):
+        logger.warning("SELL IN DOUBT - %s: %s", ticker, order_result.get('error'))
+        return
 
-    order_result = place_market_sell_order(
-        conid=conid,
-        quantity=quantity
-    )
-
-    if order_result.get("success"):
-        sell_price = current_price if current_price else buy_price
-
-        closed_position = create_closed_position_entry(
-            ticker=ticker,
-            buy_date=buy_date,
-            buy_price=buy_price,
-            sell_price=sell_price,
-            quantity=quantity
-        )
-        closed_positions_today.append(closed_position)
+    position = bought_shares_today.get(ticker)
+    if position is not None and order_result.get("protection_cancelled"):
+        position.pop("protective_order_ids", None)
 
-        bought_shares_today.pop(ticker, None)
-        logger.info(f"SELL SUCCESS - {ticker}: {quantity} share(s) at MARKET (bought at ${buy_price:.2f}) | P/L: ${closed_position['profit']:.2f} ({closed_position['return_pct']:.2f}%)")
-    else:
+    if not order_result.get("success"):
         error_msg = order_result.get('error', 'Sell order request failed with no error message')
+        journal_transition(ORDER_REJECTED, ticker, {"side": "SELL", "error": error_msg})
         logger.error(f"SELL FAILED - {ticker}: {error_msg}")
+        return
+
+    if position is None:
+        logger.info("SELL SUCCESS - %s: position was already closed by the broker sync", ticker)
+        return
+
+    buy_price = position.get("buy_price")
+    sell_price = order.context.get("price") or get_marked_price(ticker) or buy_price
+    closed_position = record_position_closed(ticker, position, sell_price, order.context.get("trace_data"), order.client_order_id)
+    logger.info("SELL SUCCESS - %s: %s share(s) at MARKET (bought at $%.2f) | P/L: $%.2f (%.2f%%)",
+                ticker, position.get('quantity', 1), buy_price, closed_position['profit'], closed_position['return_pct'])
+
+
+def cancel_protective_orders(order_ids: List[str], account_id: Optional[str]) -> Dict[str, any]:
+    """
+    Withdraw the bracket's stop and target before a market sell, so they cannot fire
+    afterwards and open a short. If that fails the sell is not sent: a leg may already
+    have filled, and the broker position sync will close the position instead.
+    """
+    result = broker.cancel_orders(order_ids=order_ids, account_id=account_id)
+    if not result.get("success"):
+        return {"success": False, "error": f"Sell deferred, protective orders not cancelled: {result.get('error')}"}
+    return result
+
+
+def record_position_closed(ticker: str, position: Dict[str, any], sell_price: float,
+                           sell_trace: Optional[Dict] = None, sell_client_order_id: Optional[str] = None) -> Dict[str, any]:
+    closed_position = create_closed_position_entry(
+        ticker=ticker,
+        buy_date=position.get("buy_date", get_current_date_string()),
+        buy_price=position.get("buy_price"),
+        sell_price=sell_price,
+        quantity=position.get("quantity", 1)
+    )
+    if position.get("conid") is not None:
+        closed_position["conid"] = position["conid"]
+    closed_position["buy_latency_trace"] = position.get("latency_trace")
+    closed_position["sell_latency_trace"] = sell_trace
+    if position.get("account_id") is not None:
+        closed_position["account_id"] = position["account_id"]
+    if position.get("client_order_id") is not None:
+        closed_position["client_order_id"] = position["client_order_id"]
+    if sell_client_order_id is not None:
+        closed_position["sell_client_order_id"] = sell_client_order_id
+    closed_positions_today.append(closed_position)
+
+    bought_shares_today.pop(ticker, None)
+    broker_flat_syncs.pop(ticker, None)
+    portfolio_ledger.close_position(ticker, sell_price)
+    journal_transition(POSITION_CLOSED, ticker, closed_position)
+    if order_authority is not None:
+        order_authority.record_sell(ticker)
+    return closed_position
+
+
+def close_positions_flat_at_broker(broker_positions: List[Dict], logger: Logger,
+                                   required_syncs: int = BROKER_FLAT_SYNCS_BEFORE_CLOSE) -> None:
+    """
+    Positions the broker no longer holds were closed outside the app, usually by a
+    bracket stop or target child. They are closed at the last mark once the broker has
+    reported them flat for required_syncs syncs in a row, which rides out a portfolio
+    endpoint that has not caught up with a fresh buy yet.
+    """
+    held = {extract_position_data(position_data)[0] for position_data in broker_positions}
+
+    for ticker in list(broker_flat_syncs):
+        if ticker in held or ticker not in bought_shares_today:
+            broker_flat_syncs.pop(ticker)
+
+    for ticker, position in list(bought_shares_today.items()):
+        if ticker in held:
+            continue
+
+        broker_flat_syncs[ticker] = broker_flat_syncs.get(ticker, 0) + 1
+        if broker_flat_syncs[ticker] < required_syncs:
+            continue
+
+        sell_price = get_marked_price(ticker) or position.get("buy_price")
+        closed_position = record_position_closed(ticker, position, sell_price)
+        logger.warning("%s - Closed at the broker outside the app (bracket exit), recorded at last mark $%.2f | P/L: $%.2f",
+                       ticker, sell_price, closed_position['profit'])
 
 
 def should_evaluate_trading_opportunity(parsed_data: Dict, closing_price: Optional[str]) -> bool:
@@ -608,12 +1678,15 @@ def should_preserve_existing_closing_price(existing_closing_price: Optional[str]
 
 def evaluate_trading_opportunity(ticker: str, current_price: float, closing_price: float, conid: int, logger: Logger) -> None:
     price_change_pct = calculate_price_change_percentage(current_price, closing_price)
+    poll_scheduler.observe(ticker, price_change_pct)
+    queue_price_alert(ticker, price_change_pct, closing_price)
 
-    if is_price_below_close(price_change_pct):
+    action = classify_price_change(price_change_pct)
+    if action == ACTION_BELOW_CLOSE:
         log_price_below_close(ticker, current_price, closing_price, price_change_pct, logger)
-    elif is_price_above_threshold(price_change_pct):
+    elif action == ACTION_TOO_HIGH:
         log_price_too_high(ticker, current_price, closing_price, price_change_pct, logger)
-    elif is_within_buy_range(price_change_pct):
+    elif action == ACTION_BUY:
         log_buy_opportunity(ticker, current_price, closing_price, price_change_pct, conid, logger)
     else:
         log_within_range_no_action(ticker, current_price, closing_price, price_change_pct, logger)
@@ -629,54 +1702,73 @@ def is_market_open(parsed_data: Dict) -> bool:
     return not parsed_data.get('is_market_closed', True)
 
 
-def is_price_above_threshold(price_change_pct: float) -> bool:
-    return price_change_pct >= 1.0
-
-
-def is_price_below_close(price_change_pct: float) -> bool:
-    return price_change_pct < 0
-
-
-def is_within_buy_range(price_change_pct: float) -> bool:
-    return 0.8 <= price_change_pct <= 0.95
-
-
 def log_buy_opportunity(ticker: str, current_price: float, closing_price: float, price_change_pct: float, conid: int, logger: Logger) -> None:
     buy_range = format_buy_range(closing_price)
-    logger.info(f"BUY OPPORTUNITY - {ticker}: Current ${current_price:.2f} | Close ${closing_price:.2f} {buy_range} | Change +{price_change_pct:.2f}% | Action: READY TO BUY")
+    logger.info("BUY OPPORTUNITY - %s: Current $%.2f | Close $%.2f %s | Change +%.2f%% | Action: READY TO BUY", ticker, current_price, closing_price, buy_range, price_change_pct)
     handle_buy_action(ticker, conid, current_price, logger)
 
 
 def log_price_below_close(ticker: str, current_price: float, closing_price: float, price_change_pct: float, logger: Logger) -> None:
     buy_range = format_buy_range(closing_price)
-    logger.info(f"BELOW CLOSE - {ticker}: Current ${current_price:.2f} | Close ${closing_price:.2f} {buy_range} | Change {price_change_pct:.2f}% | Action: WAIT")
+    logger.info("BELOW CLOSE - %s: Current $%.2f | Close $%.2f %s | Change %.2f%% | Action: WAIT", ticker, current_price, closing_price, buy_range, price_change_pct)
 
 
 def log_price_too_high(ticker: str, current_price: float, closing_price: float, price_change_pct: float, logger: Logger) -> None:
     buy_range = format_buy_range(closing_price)
-    logger.info(f"ABOVE THRESHOLD - {ticker}: Current ${current_price:.2f} | Close ${closing_price:.2f} {buy_range} | Change +{price_change_pct:.2f}% | Action: TOO HIGH")
+    logger.info("ABOVE THRESHOLD - %s: Current $%.2f | Close $%.2f %s | Change +%.2f%% | Action: TOO HIGH", ticker, current_price, closing_price, buy_range, price_change_pct)
 
 
 def log_within_range_no_action(ticker: str, current_price: float, closing_price: float, price_change_pct: float, logger: Logger) -> None:
     buy_range = format_buy_range(closing_price)
-    logger.info(f"NEUTRAL - {ticker}: Current ${current_price:.2f} | Close ${closing_price:.2f} {buy_range} | Change +{price_change_pct:.2f}% | Action: MONITORING")
+    logger.info("NEUTRAL - %s: Current $%.2f | Close $%.2f %s | Change +%.2f%% | Action: MONITORING", ticker, current_price, closing_price, buy_range, price_change_pct)
 
 
-def add_position_to_tracking(ticker: str, conid: int, quantity: int, avg_price: float, buy_date: str) -> None:
-    bought_shares_today[ticker] = {
+def add_position_to_tracking(ticker: str, conid: int, quantity: int, avg_price: float, buy_date: str,
+                             account_id: Optional[str] = None) -> None:
+    position = bought_shares_today.setdefault(ticker, {})
+    previous = dict(position)
+    position.update({
         "buy_price": avg_price,
-        "buy_date": buy_date,
+        "buy_date": position.get("buy_date", buy_date),
         "conid": conid,
         "quantity": quantity
-    }
+    })
+    if account_id is not None:
+        position["account_id"] = account_id
+
+    if position != previous:
+        portfolio_ledger.update_position(ticker, quantity, avg_price, position.get("account_id"))
+        journal_transition(POSITION_UPDATED, ticker, position)
+
+
+def build_state_directory(year: int, month: int, day: int) -> str:
+    """Per-day directory of positions, traces and the journal; each cluster worker writes under its own name."""
+    directory = f"./files/{year}/{month}/{day}"
+    return f"{directory}/{state_directory_name}" if state_directory_name else directory
+
+
+def build_metrics_file_path() -> str:
+    return METRICS_FILE_PATH.replace(".prom", f"_{state_directory_name}.prom") if state_directory_name else METRICS_FILE_PATH
+
+
+def build_journal_directory(year: int, month: int, day: int) -> str:
+    return f"{build_state_directory(year, month, day)}/journal"
 
 
 def build_positions_file_path(year: int, month: int, day: int) -> str:
-    return f"./files/{year}/{month}/{day}/open_positions.json"
+    return f"{build_state_directory(year, month, day)}/open_positions.json"
 
 
 def build_closed_positions_file_path(year: int, month: int, day: int) -> str:
-    return f"./files/{year}/{month}/{day}/closed_positions.json"
+    return f"{build_state_directory(year, month, day)}/closed_positions.json"
+
+
+def build_order_traces_file_path(year: int, month: int, day: int) -> str:
+    return f"{build_state_directory(year, month, day)}/order_traces.jsonl"
+
+
+def build_order_latency_summary_file_path(year: int, month: int, day: int) -> str:
+    return f"{build_state_directory(year, month, day)}/order_latency_summary.json"
 
 
 def create_closed_position_entry(ticker: str, buy_date: str, buy_price: float, sell_price: float, quantity: int) -> Dict:
@@ -729,7 +1821,36 @@ def save_closed_positions_to_file(year: int, month: int, day: int, s3_client=Non
             logger.info("No closed positions to save today")
         return True
 
-    # ...existing code...
+    try:
+        file_path = build_closed_positions_file_path(year, month, day)
+        makedirs(path.dirname(file_path), exist_ok=True)
+
+        closed_positions_data = {
+            "date": f"{year}-{month:02d}-{day:02d}",
+            "total_positions": portfolio_ledger.closed_count,
+            "total_profit": round(portfolio_ledger.realized_pnl, 2),
+            "total_commission": round(sum(position.get("commission", 0.0) for position in closed_positions_today), 2),
+            "reconciled_positions": sum(1 for position in closed_positions_today if position.get("reconciled")),
+            "positions": closed_positions_today
+        }
+
+        with open(file_path, 'w') as f:
+            f.write(dumps(closed_positions_data, indent=2))
+
+        if logger:
+            logger.info(f"Saved {len(closed_positions_today)} closed position(s) to: {file_path}")
+            logger.info(f"Total P/L for the day: ${closed_positions_data['total_profit']:.2f}")
+
+        if s3_client:
+            upload_closed_positions_to_s3(file_path, year, month, day, s3_client)
+            if logger:
+                logger.info(f"Closed positions uploaded to S3: s3://{S3_BUCKET}/{year}/{month}/{day}/closed_positions.json")
+
+        return True
+    except Exception as e:
+        if logger:
+            logger.error(f"Failed to save closed positions: {e}")
+        return False
 
 
 def save_empty_open_positions(logger: Logger, s3_client=None) -> None:
@@ -755,40 +1876,31 @@ def save_empty_open_positions(logger: Logger, s3_client=None) -> None:
     except Exception as e:
         logger.error(f"Failed to save empty open_positions.json: {str(e)}")
 
-    try:
-        file_path = build_closed_positions_file_path(year, month, day)
-
-        closed_positions_data = {
-            "date": f"{year}-{month:02d}-{day:02d}",
-            "total_positions": len(closed_positions_today),
-            "total_profit": round(sum(p["profit"] for p in closed_positions_today), 2),
-            "positions": closed_positions_today
-        }
 
-        with open(file_path, 'w') as f:
-            f.write(dumps(closed_positions_data, indent=2))
-
-        if logger:
-            logger.info(f"Saved {len(closed_positions_today)} closed position(s) to: {file_path}")
-            logger.info(f"Total P/L for the day: ${closed_positions_data['total_profit']:.2f}")
+def save_order_latency_summary(year: int, month: int, day: int, logger: Logger) -> None:
+    if len(order_traces_today) == 0:
+        return
 
-        if s3_client:
-            upload_closed_positions_to_s3(file_path, year, month, day, s3_client)
-            if logger:
-                logger.info(f"Closed positions uploaded to S3: s3://{S3_BUCKET}/{year}/{month}/{day}/closed_positions.json")
+    summary = summarize_traces(order_traces_today)
+    logger.info(format_trace_summary(summary))
 
-        return True
+    try:
+        file_path = build_order_latency_summary_file_path(year, month, day)
+        makedirs(path.dirname(file_path), exist_ok=True)
+        with open(file_path, 'w') as f:
+            f.write(dumps(summary, indent=2))
     except Exception as e:
-        if logger:
-            logger.error(f"Failed to save closed positions: {e}")
-        return False
+        logger.error(f"Failed to save order latency summary: {e}")
 
 
 def save_position_to_file(ticker: str, position_data: Dict, year: int, month: int, day: int, s3_client=None) -> bool:
     try:
         file_path = build_positions_file_path(year, month, day)
+        makedirs(path.dirname(file_path), exist_ok=True)
         positions_file = load_positions_from_file(file_path)
 
+        existing_trace = positions_file.get(ticker, {}).get("latency_trace")
+
         positions_file[ticker] = {
             "ticker": position_data.get("ticker"),
             "conid": position_data.get("conid"),
@@ -798,7 +1910,8 @@ def save_position_to_file(ticker: str, position_data: Dict, year: int, month: in
             "market_value": position_data.get("market_value"),
             "unrealized_pnl": position_data.get("unrealized_pnl"),
             "currency": position_data.get("currency"),
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "latency_trace": position_data.get("latency_trace", existing_trace),
+            "timestamp": get_clock().now_utc().isoformat(),
             "date": f"{year}-{month:02d}-{day:02d}"
         }
 
@@ -835,44 +1948,85 @@ def log_no_positions(logger: Logger) -> None:
 
 
 def log_positions_found(count: int, logger: Logger) -> None:
-    logger.info(f"Found {count} open position(s) in IBKR account:")
+    logger.info("Found %d open position(s) in IBKR account:", count)
 
 
 def log_sync_complete(count: int, logger: Logger) -> None:
-    logger.info(f"Synced {count} position(s) to local tracking")
+    logger.info("Synced %d position(s) to local tracking", count)
 
 
 def log_sync_start(logger: Logger) -> None:
     logger.info("Fetching current positions from IBKR...")
 
 
+def is_shard_ticker(ticker: str) -> bool:
+    """A cluster worker tracks only the positions of its own shard; the single process tracks every position."""
+    return order_authority is None or ticker in (cached_companies or [])
+
+
 def sync_position(position_data: Dict, logger: Logger, s3_client=None) -> bool:
     ticker, conid, quantity, avg_price = extract_position_data(position_data)
 
     if not has_complete_position_data(ticker, conid, quantity, avg_price):
         return False
 
+    if not is_shard_ticker(ticker):
+        return False
+
+    parsed = parse_position(position_data)
+    if not account_allocator.manages(parsed.get("account_id")):
+        return False
+
     buy_date = get_current_date_string()
-    add_position_to_tracking(ticker, conid, int(quantity), avg_price, buy_date)
-    logger.info(f"  - {format_position_summary(position_data)}")
+    add_position_to_tracking(ticker, conid, int(quantity), avg_price, buy_date, parsed.get("account_id"))
+    logger.info("  - %s", LazyFormat(format_position_summary, position_data))
 
     year, month, day = get_current_date()
-    parsed = parse_position(position_data)
     save_position_to_file(ticker, parsed, year, month, day, s3_client)
 
     return True
 
 
+def select_positions_to_track(positions: List[Dict], logger: Logger) -> List[Dict]:
+    """
+    Positions are tracked by ticker, so a ticker held in several trading accounts
+    keeps only the account it is already tracked in. An untracked one is left alone
+    instead of being sold through the wrong account, which could open a short.
+    """
+    accounts_by_ticker: Dict[str, List[Optional[str]]] = {}
+    for position_data in positions:
+        parsed = parse_position(position_data)
+        accounts_by_ticker.setdefault(parsed.get("ticker"), []).append(parsed.get("account_id"))
+
+    selected = []
+    for position_data in positions:
+        parsed = parse_position(position_data)
+        ticker = parsed.get("ticker")
+        accounts = accounts_by_ticker[ticker]
+        tracked_account_id = bought_shares_today.get(ticker, {}).get("account_id")
+        if len(accounts) == 1 or (tracked_account_id is not None and parsed.get("account_id") == tracked_account_id):
+            selected.append(position_data)
+        elif tracked_account_id is None and ticker not in split_position_tickers:
+            split_position_tickers.add(ticker)
+            logger.warning("%s - Held in accounts %s, not tracked; close it manually", ticker, ", ".join(map(str, accounts)))
+    return selected
+
+
 def fetch_and_sync_positions(logger: Logger, s3_client=None) -> None:
+    global last_position_sync_time
+
+    last_position_sync_time = get_clock().monotonic()
     log_sync_start(logger)
 
-    result = get_all_positions()
+    with timed("positions_fetch"):
+        result = broker.get_all_positions(account_allocator.accounts)
 
     if not result.get("success"):
         log_fetch_error(result.get('error', 'Unknown error'), logger)
         return
 
     positions = result.get("positions", [])
+    close_positions_flat_at_broker(positions, logger)
 
     if not positions:
         log_no_positions(logger)
@@ -881,48 +2035,47 @@ def fetch_and_sync_positions(logger: Logger, s3_client=None) -> None:
 
     log_positions_found(len(positions), logger)
 
-    for position_data in positions:
-        sync_position(position_data, logger, s3_client)
+    with timed("positions_sync"):
+        for position_data in select_positions_to_track(positions, logger):
+            sync_position(position_data, logger, s3_client)
 
     log_sync_complete(len(bought_shares_today), logger)
 
 
 if __name__ == "__main__":
-    current_date = datetime.now(timezone.utc).strftime('%Y-%m-%d')
+    current_date = get_clock().now_utc().strftime('%Y-%m-%d')
     log_filename = f'logs/app_{current_date}.log'
-    logger = setup_logging(log_file=log_filename, log_level=INFO)
-
-    s3_client = assume_iam_role(IAM_ROLE_NAME, logger)
+    json_log_filename = f'logs/app_{current_date}.jsonl' if JSON_LOGS_ENABLED else None
+    startup_report = StartupReport()
+    logger = setup_logging(log_file=log_filename, log_level=INFO, json_log_file=json_log_filename)
 
     logger.info("Trading application has started successfully.")
+    logger.info(f"Broker mode: {BROKER_MODE}")
     logger.info(f"Market data will update every {UPDATE_INTERVAL} seconds")
 
-    year, month, day = get_current_date()
-    settings, companies = download_daily_files(s3_client, S3_BUCKET, year, month, day, logger)
+    startup_results = run_startup_sequence(startup_report, logger)
+    s3_client = startup_results["s3_client"]
+    storage_client = s3_client
 
-    if not settings or not companies:
+    if not daily_files_downloaded:
+        logger.info(startup_report.format_report())
         logger.error("Failed to download required files. Application cannot start.")
         exit(1)
 
-    logger.info("Initializing IBKR Client Portal connection...")
-    session_initialized = initialize_ibkr_brokerage_session(logger)
-
-    if session_initialized:
-        logger.info("IBKR session ready - Real-time market data should now be available")
-    else:
-        logger.warning("IBKR session initialization had issues - You may receive delayed data (DPB)")
-        logger.warning("The application will continue, but verify market data in logs")
-
-    while True:
-        fetch_and_sync_positions(logger, s3_client)
+    settings_store.subscribe(create_settings_change_listener(logger))
+    settings_store.start_background_refresh(s3_client, logger, SETTINGS_REFRESH_INTERVAL)
 
-        market_data_by_ticker = run_market_data_collection_cycle(s3_client, logger)
+    active_trading_day = get_current_day()
 
-        if market_data_by_ticker is not None:
-            handle_end_of_day_sales(logger)
+    try:
+        start_metrics_server(METRICS_HTTP_PORT)
+        logger.info(f"Metrics available at http://127.0.0.1:{METRICS_HTTP_PORT}/metrics")
+    except OSError as e:
+        logger.warning(f"Metrics endpoint disabled, port {METRICS_HTTP_PORT} unavailable: {e}")
 
-            if is_close_to_market_close() and len(closed_positions_today) > 0:
-                year, month, day = get_current_date()
-                save_closed_positions_to_file(year, month, day, s3_client, logger)
+    while True:
+        run_trading_cycle(s3_client, logger)
 
-            log_positions_summary(market_data_by_ticker, logger)
+        if startup_report is not None:
+            log_startup_report(startup_report, logger)
+            startup_report = None
@@ -0,0 +1,460 @@
+from argparse import ArgumentParser
+from csv import reader
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from json import dumps, loads
+from os import makedirs, path
+from sys import path as sys_path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+sys_path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+from ibkr.contract_details import contract_search
+from ibkr.historical_data import get_market_data
+from strategy.signals import (ABOVE_THRESHOLD_PCT, BUY_RANGE_LOWER_PCT, BUY_RANGE_UPPER_PCT,
+                              calculate_price_change_percentages)
+
+DEFAULT_STEP_SECONDS = 60
+EASTERN_OFFSET = timedelta(hours=-5)
+FILES_ROOT = './files'
+HISTORY_CACHE_DIR = './files/history'
+MAX_ENTRIES_PER_TICKER_DAY = 20
+MINUTES_BEFORE_CLOSE_TO_SELL = 10
+SESSION_CLOSE_SECONDS = 16 * 3600
+SESSION_OPEN_SECONDS = 9 * 3600 + 30 * 60
+TICKS_FILE_NAME = 'ticks.csv'
+
+EXIT_EOD = 0
+EXIT_STOP = 1
+EXIT_TARGET = 2
+EXIT_NAMES = {EXIT_EOD: "eod", EXIT_STOP: "stop", EXIT_TARGET: "target"}
+
+
+@dataclass(frozen=True)
+class StrategyParameters:
+    stop_loss_pct: float = 2.0
+    take_profit_pct: float = 5.0
+    next_investment: float = 1000.0
+    ops_per_day: int = 5
+    buy_range_lower_pct: float = BUY_RANGE_LOWER_PCT
+    buy_range_upper_pct: float = BUY_RANGE_UPPER_PCT
+    above_threshold_pct: float = ABOVE_THRESHOLD_PCT
+
+    @property
+    def budget_per_trade(self) -> float:
+        if self.next_investment > 0 and self.ops_per_day > 0:
+            return self.next_investment / self.ops_per_day
+        return 0
+
+
+@dataclass
+class MarketDataSet:
+    """
+    Columnar session data: one row per (day, ticker), one column per time step.
+    Prices are forward-filled onto a fixed grid starting at the open; NaN means no trade yet.
+    """
+    days: List[str]
+    tickers: List[str]
+    row_days: np.ndarray
+    prices: np.ndarray
+    closes: np.ndarray
+    step_seconds: int = DEFAULT_STEP_SECONDS
+
+    @property
+    def step_count(self) -> int:
+        return self.prices.shape[1]
+
+
+@dataclass
+class BacktestResult:
+    """One entry per accepted trade; rows index the dataset's (day, ticker) rows."""
+    parameters: StrategyParameters
+    rows: np.ndarray
+    entry_steps: np.ndarray
+    exit_steps: np.ndarray
+    entry_prices: np.ndarray
+    exit_prices: np.ndarray
+    exit_reasons: np.ndarray
+    quantities: np.ndarray
+    profits: np.ndarray
+    daily_profits: np.ndarray
+    exposure_skips: int = 0
+    summary: Dict[str, float] = field(default_factory=dict)
+
+
+def build_session_grid(step_seconds: int) -> int:
+    return (SESSION_CLOSE_SECONDS - SESSION_OPEN_SECONDS) // step_seconds + 1
+
+
+def to_eastern_seconds(epoch_seconds: np.ndarray) -> np.ndarray:
+    return (epoch_seconds + EASTERN_OFFSET.total_seconds()) % 86400
+
+
+def forward_fill(prices: np.ndarray) -> np.ndarray:
+    """Forward-fill NaNs along each row without a Python loop over steps."""
+    valid = ~np.isnan(prices)
+    last_valid_index = np.where(valid, np.arange(prices.shape[1]), 0)
+    np.maximum.accumulate(last_valid_index, axis=1, out=last_valid_index)
+    filled = prices[np.arange(prices.shape[0])[:, None], last_valid_index]
+    filled[~np.maximum.accumulate(valid, axis=1)] = np.nan
+    return filled
+
+
+def build_dataset(records: Dict[Tuple[str, str], Tuple[np.ndarray, np.ndarray, Optional[float]]], step_seconds: int) -> MarketDataSet:
+    """
+    records maps (day, ticker) to (epoch_seconds, prices, reference close).
+    The last observation in each step wins; rows without a reference close are dropped.
+    """
+    step_count = build_session_grid(step_seconds)
+    keys = sorted(key for key, (_, _, close) in records.items() if close)
+    days = sorted({day for day, _ in keys})
+    day_index = {day: index for index, day in enumerate(days)}
+
+    prices = np.full((len(keys), step_count), np.nan)
+    closes = np.empty(len(keys))
+
+    for row, key in enumerate(keys):
+        epoch_seconds, values, close = records[key]
+        steps = ((to_eastern_seconds(epoch_seconds) - SESSION_OPEN_SECONDS) // step_seconds).astype(np.int64)
+        in_session = (steps >= 0) & (steps < step_count)
+        prices[row, steps[in_session]] = values[in_session]
+        closes[row] = close
+
+    return MarketDataSet(
+        days=days,
+        tickers=[ticker for _, ticker in keys],
+        row_days=np.array([day_index[day] for day, _ in keys], dtype=np.int64),
+        prices=forward_fill(prices),
+        closes=closes,
+        step_seconds=step_seconds
+    )
+
+
+def iterate_days(start: date, end: date) -> List[date]:
+    return [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+
+
+def read_ticks_file(file_path: str) -> Dict[str, Tuple[List[float], List[float], Optional[float]]]:
+    """Rows are epoch_ms,ticker,last_price,closing_price; the first non-empty close per ticker is kept."""
+    epochs_by_ticker: Dict[str, List[float]] = {}
+    prices_by_ticker: Dict[str, List[float]] = {}
+    close_by_ticker: Dict[str, Optional[float]] = {}
+
+    with open(file_path, 'r', newline='') as f:
+        for row in reader(f):
+            if len(row) != 4:
+                continue
+
+            epoch_ms, ticker, last_price, closing_price = row
+            try:
+                epoch_seconds = float(epoch_ms) / 1000
+                price = float(last_price)
+            except ValueError:
+                continue
+
+            epochs_by_ticker.setdefault(ticker, []).append(epoch_seconds)
+            prices_by_ticker.setdefault(ticker, []).append(price)
+            if closing_price and close_by_ticker.get(ticker) is None:
+                close_by_ticker[ticker] = float(closing_price)
+
+    return {
+        ticker: (epochs_by_ticker[ticker], prices_by_ticker[ticker], close_by_ticker.get(ticker))
+        for ticker in epochs_by_ticker
+    }
+
+
+def load_tick_files(start: date, end: date, files_root: str = FILES_ROOT, step_seconds: int = DEFAULT_STEP_SECONDS) -> MarketDataSet:
+    """Load the per-day ticks.csv files the trading app records under files/Y/M/D/."""
+    records = {}
+
+    for day in iterate_days(start, end):
+        file_path = f"{files_root}/{day.year}/{day.month}/{day.day}/{TICKS_FILE_NAME}"
+        if not path.exists(file_path):
+            continue
+
+        for ticker, (epochs, values, close) in read_ticks_file(file_path).items():
+            records[(day.isoformat(), ticker)] = (np.array(epochs), np.array(values), close)
+
+    return build_dataset(records, step_seconds)
+
+
+def fetch_history_bars(ticker: str, period: str, bar: str, cache_dir: str = HISTORY_CACHE_DIR) -> List[Dict]:
+    """Fetch hmds/history bars for a ticker, caching the raw response on disk."""
+    cache_path = f"{cache_dir}/{ticker}_{period}_{bar}.json"
+    if path.exists(cache_path):
+        with open(cache_path, 'r') as f:
+            return loads(f.read())
+
+    conid = contract_search(ticker)
+    bars = get_market_data(int(conid), period, bar).get('data', [])
+
+    makedirs(cache_dir, exist_ok=True)
+    with open(cache_path, 'w') as f:
+        f.write(dumps(bars))
+
+    return bars
+
+
+def group_bars_by_day(bars: List[Dict]) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    epochs = np.array([bar['t'] / 1000 for bar in bars], dtype=np.float64)
+    closes = np.array([bar['c'] for bar in bars], dtype=np.float64)
+    eastern_days = [(datetime.fromtimestamp(epoch, timezone.utc) + EASTERN_OFFSET).date().isoformat() for epoch in epochs]
+
+    grouped: Dict[str, Tuple[List[float], List[float]]] = {}
+    for day, epoch, close in zip(eastern_days, epochs, closes):
+        day_epochs, day_closes = grouped.setdefault(day, ([], []))
+        day_epochs.append(epoch)
+        day_closes.append(close)
+
+    return {day: (np.array(day_epochs), np.array(day_closes)) for day, (day_epochs, day_closes) in grouped.items()}
+
+
+def load_history_bars(tickers: Sequence[str], period: str = '1m', bar: str = '1min', step_seconds: int = DEFAULT_STEP_SECONDS) -> MarketDataSet:
+    """
+    Build a dataset from hmds bars. Each day's reference close is the last
+    in-session bar of the previous day, so the first day of the period is skipped.
+    """
+    records = {}
+
+    for ticker in tickers:
+        bars_by_day = group_bars_by_day(fetch_history_bars(ticker, period, bar))
+        previous_close = None
+
+        for day in sorted(bars_by_day):
+            epochs, closes = bars_by_day[day]
+            seconds = to_eastern_seconds(epochs)
+            in_session = (seconds >= SESSION_OPEN_SECONDS) & (seconds <= SESSION_CLOSE_SECONDS)
+            records[(day, ticker)] = (epochs, closes, previous_close)
+            if in_session.any():
+                previous_close = float(closes[in_session][-1])
+
+    return build_dataset(records, step_seconds)
+
+
+def first_true_index(mask: np.ndarray) -> np.ndarray:
+    """Index of the first True per row, or the row length when there is none."""
+    return np.where(mask.any(axis=1), mask.argmax(axis=1), mask.shape[1])
+
+
+def calculate_liquidation_step(step_seconds: int, step_count: int) -> int:
+    liquidation_seconds = SESSION_CLOSE_SECONDS - MINUTES_BEFORE_CLOSE_TO_SELL * 60
+    return min(step_count - 1, (liquidation_seconds - SESSION_OPEN_SECONDS) // step_seconds)
+
+
+def simulate_entries(prices: np.ndarray, in_band: np.ndarray, start_steps: np.ndarray, liquidation_step: int,
+                     parameters: StrategyParameters) -> Tuple[np.ndarray, ...]:
+    """
+    The next trade of every row: the first in-band price at or after its start step
+    and before the liquidation sweep, with stop and target from the entry like
+    calculate_stop_loss_price/calculate_take_profit_price.
+    """
+    row_count, step_count = prices.shape
+    steps = np.arange(step_count)
+
+    eligible = in_band & (steps[None, :] >= start_steps[:, None]) & (steps[None, :] < liquidation_step)
+    entry_step = first_true_index(eligible)
+    entered = entry_step < step_count
+    safe_entry_step = np.minimum(entry_step, step_count - 1)
+    entry_prices = np.where(entered, prices[np.arange(row_count), safe_entry_step], np.nan)
+
+    stop_prices = np.round(entry_prices * (1 - parameters.stop_loss_pct / 100), 2)
+    target_prices = np.round(entry_prices * (1 + parameters.take_profit_pct / 100), 2)
+
+    after_entry = steps[None, :] > entry_step[:, None]
+    valid = ~np.isnan(prices)
+    stop_step = first_true_index(after_entry & valid & (prices <= stop_prices[:, None]))
+    target_step = first_true_index(after_entry & valid & (prices >= target_prices[:, None]))
+    eod_step = np.minimum(np.maximum(entry_step + 1, liquidation_step), step_count - 1)
+
+    exit_step = np.minimum(np.minimum(stop_step, target_step), eod_step)
+    exit_reasons = np.select(
+        [exit_step == stop_step, exit_step == target_step],
+        [EXIT_STOP, EXIT_TARGET],
+        default=EXIT_EOD
+    ).astype(np.int8)
+    exit_prices = np.where(entered, prices[np.arange(row_count), np.minimum(exit_step, step_count - 1)], np.nan)
+
+    return entered, entry_step, exit_step, exit_reasons, entry_prices, exit_prices
+
+
+def apply_exposure_cap(row_days: np.ndarray, rows: np.ndarray, entry_steps: np.ndarray, exit_steps: np.ndarray,
+                       costs: np.ndarray, budget: float) -> np.ndarray:
+    """
+    Accept trades in time order like is_within_exposure_budget: an entry is refused
+    when its cost plus the cost of positions still open would exceed the budget.
+    """
+    accepted = np.ones(len(rows), dtype=bool)
+    if budget <= 0:
+        return accepted
+
+    open_positions: List[Tuple[int, float]] = []
+    current_day = None
+    for index in np.lexsort((rows, entry_steps, row_days)):
+        if row_days[index] != current_day:
+            current_day = row_days[index]
+            open_positions = []
+        open_positions = [(exit_step, cost) for exit_step, cost in open_positions if exit_step > entry_steps[index]]
+        if costs[index] + sum(cost for _, cost in open_positions) > budget:
+            accepted[index] = False
+            continue
+        open_positions.append((exit_steps[index], costs[index]))
+    return accepted
+
+
+def run_backtest(dataset: MarketDataSet, parameters: StrategyParameters) -> BacktestResult:
+    """
+    Replay the live rules on every (day, ticker) row at once:
+    - buy at the first price inside the buy band, never in the liquidation window
+      (handle_buy_action refuses buys there)
+    - after a stop or target exit the ticker may be bought again, as the broker
+      position sync frees it in the app; trades are simulated in rounds until no
+      row re-enters
+    - liquidate whatever is still open at the 10-minutes-before-close sweep
+    - refuse entries that would take open cost past nextInvestment
+
+    Known gaps: a refused entry is not retried at the next in-band price, the
+    ticker only re-enters after the refused trade's simulated exit; exposure is
+    freed at the exit step rather than after the app's broker syncs; fills are at
+    the step price without slippage.
+    """
+    prices = dataset.prices
+    row_count, step_count = prices.shape
+
+    pct = calculate_price_change_percentages(prices, dataset.closes[:, None])
+    in_band = (pct >= parameters.buy_range_lower_pct) & (pct <= parameters.buy_range_upper_pct)
+    in_band &= pct < parameters.above_threshold_pct
+    liquidation_step = calculate_liquidation_step(dataset.step_seconds, step_count)
+
+    trades: List[Tuple[np.ndarray, ...]] = []
+    active_rows = np.arange(row_count)
+    start_steps = np.zeros(row_count, dtype=np.int64)
+    for _ in range(MAX_ENTRIES_PER_TICKER_DAY):
+        entered, entry_step, exit_step, exit_reasons, entry_prices, exit_prices = simulate_entries(
+            prices[active_rows], in_band[active_rows], start_steps, liquidation_step, parameters)
+        trades.append((active_rows[entered], entry_step[entered], exit_step[entered], exit_reasons[entered],
+                       entry_prices[entered], exit_prices[entered]))
+
+        re_entering = entered & (exit_reasons != EXIT_EOD)
+        active_rows = active_rows[re_entering]
+        start_steps = exit_step[re_entering] + 1
+        if len(active_rows) == 0:
+            break
+
+    rows, entry_steps, exit_steps, exit_reasons, entry_prices, exit_prices = (np.concatenate(column) for column in zip(*trades))
+
+    budget = parameters.budget_per_trade
+    with np.errstate(divide='ignore', invalid='ignore'):
+        quantities = np.where(budget > 0, np.floor(budget / entry_prices), 1)
+    quantities = np.maximum(1, np.nan_to_num(quantities)).astype(np.int64)
+
+    accepted = apply_exposure_cap(dataset.row_days[rows], rows, entry_steps, exit_steps,
+                                  quantities * entry_prices, parameters.next_investment)
+    exposure_skips = int((~accepted).sum())
+    rows, entry_steps, exit_steps, exit_reasons = rows[accepted], entry_steps[accepted], exit_steps[accepted], exit_reasons[accepted]
+    entry_prices, exit_prices, quantities = entry_prices[accepted], exit_prices[accepted], quantities[accepted]
+
+    profits = np.nan_to_num((exit_prices - entry_prices) * quantities)
+    daily_profits = np.bincount(dataset.row_days[rows], weights=profits, minlength=len(dataset.days))
+
+    result = BacktestResult(parameters, rows, entry_steps, exit_steps, entry_prices, exit_prices, exit_reasons,
+                            quantities, profits, daily_profits, exposure_skips)
+    result.summary = summarize_result(result)
+    return result
+
+
+def calculate_max_drawdown(daily_profits: np.ndarray) -> float:
+    if len(daily_profits) == 0:
+        return 0.0
+    equity = np.cumsum(daily_profits)
+    peaks = np.maximum.accumulate(np.concatenate(([0.0], equity)))[1:]
+    return float(np.max(peaks - equity))
+
+
+def summarize_result(result: BacktestResult) -> Dict[str, float]:
+    trades = len(result.rows)
+    traded_profits = result.profits
+    reasons = result.exit_reasons
+
+    summary = {
+        "trades": trades,
+        "total_profit": round(float(result.profits.sum()), 2),
+        "win_rate": round(float((traded_profits > 0).mean()), 4) if trades else 0.0,
+        "avg_profit_per_trade": round(float(traded_profits.mean()), 2) if trades else 0.0,
+        "max_drawdown": round(calculate_max_drawdown(result.daily_profits), 2),
+        "exposure_skips": result.exposure_skips,
+        "days": len(result.daily_profits)
+    }
+    for reason, name in EXIT_NAMES.items():
+        summary[f"{name}_rate"] = round(float((reasons == reason).mean()), 4) if trades else 0.0
+
+    return summary
+
+
+def format_summary(summary: Dict[str, float]) -> str:
+    return " | ".join(f"{key}: {value}" for key, value in summary.items())
+
+
+def parse_arguments():
+    parser = ArgumentParser(description="Replay the intraday strategy over stored market data")
+    add_data_arguments(parser)
+    parser.add_argument("--stop-loss", type=float, default=2.0)
+    parser.add_argument("--take-profit", type=float, default=5.0)
+    parser.add_argument("--next-investment", type=float, default=1000.0)
+    parser.add_argument("--ops-per-day", type=int, default=5)
+    return parser.parse_args()
+
+
+def filter_days(dataset: MarketDataSet, start: date, end: date) -> MarketDataSet:
+    keep_days = [day for day in dataset.days if start.isoformat() <= day <= end.isoformat()]
+    day_map = {dataset.days.index(day): index for index, day in enumerate(keep_days)}
+    rows = np.array([index for index, day in enumerate(dataset.row_days) if day in day_map], dtype=np.int64)
+
+    return MarketDataSet(
+        days=keep_days,
+        tickers=[dataset.tickers[row] for row in rows],
+        row_days=np.array([day_map[dataset.row_days[row]] for row in rows], dtype=np.int64),
+        prices=dataset.prices[rows],
+        closes=dataset.closes[rows],
+        step_seconds=dataset.step_seconds
+    )
+
+
+def load_dataset(source: str, start: date, end: date, tickers: Sequence[str], period: str, bar: str, step_seconds: int) -> MarketDataSet:
+    if source == "ticks":
+        return load_tick_files(start, end, step_seconds=step_seconds)
+
+    dataset = load_history_bars(tickers, period, bar, step_seconds)
+    return filter_days(dataset, start, end)
+
+
+def add_data_arguments(parser: ArgumentParser) -> None:
+    parser.add_argument("--start", required=True, type=date.fromisoformat)
+    parser.add_argument("--end", required=True, type=date.fromisoformat)
+    parser.add_argument("--source", choices=["ticks", "hmds"], default="ticks")
+    parser.add_argument("--tickers", nargs="*", default=[], help="Tickers to fetch when --source hmds")
+    parser.add_argument("--period", default="1m")
+    parser.add_argument("--bar", default="1min")
+    parser.add_argument("--step-seconds", type=int, default=DEFAULT_STEP_SECONDS)
+
+
+def main() -> None:
+    arguments = parse_arguments()
+    dataset = load_dataset(arguments.source, arguments.start, arguments.end, arguments.tickers,
+                           arguments.period, arguments.bar, arguments.step_seconds)
+
+    parameters = StrategyParameters(
+        stop_loss_pct=arguments.stop_loss,
+        take_profit_pct=arguments.take_profit,
+        next_investment=arguments.next_investment,
+        ops_per_day=arguments.ops_per_day
+    )
+
+    result = run_backtest(dataset, parameters)
+    print(f"Rows: {len(dataset.tickers)} (ticker-days) x {dataset.step_count} steps")
+    print(format_summary(result.summary))
+
+
+if __name__ == "__main__":
+    main()
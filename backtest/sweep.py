@@ -0,0 +1,176 @@
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from csv import DictWriter
+from dataclasses import asdict
+from itertools import product
+from multiprocessing.shared_memory import SharedMemory
+from os import cpu_count, makedirs, path
+from random import Random
+from sys import path as sys_path
+from time import perf_counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+sys_path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+from backtest.engine import MarketDataSet, StrategyParameters, add_data_arguments, load_dataset, run_backtest
+
+DEFAULT_CHUNK_SIZE = 8
+DEFAULT_RANK_BY = "total_profit"
+SHARED_ARRAYS = ("prices", "closes", "row_days")
+
+ArraySpec = Tuple[str, Tuple[int, ...], str]
+
+worker_dataset: Optional[MarketDataSet] = None
+worker_segments: List[SharedMemory] = []
+
+
+def share_array(array: np.ndarray) -> Tuple[SharedMemory, ArraySpec]:
+    segment = SharedMemory(create=True, size=max(1, array.nbytes))
+    view = np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)
+    view[...] = array
+    return segment, (segment.name, array.shape, array.dtype.str)
+
+
+def attach_array(spec: ArraySpec) -> Tuple[SharedMemory, np.ndarray]:
+    name, shape, dtype = spec
+    segment = SharedMemory(name=name)
+    array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=segment.buf)
+    array.flags.writeable = False
+    return segment, array
+
+
+def initialize_worker(specs: Dict[str, ArraySpec], days: List[str], tickers: List[str], step_seconds: int) -> None:
+    """Attach to the parent's shared segments once per worker; nothing is pickled per task."""
+    global worker_dataset
+
+    arrays = {}
+    for key, spec in specs.items():
+        segment, arrays[key] = attach_array(spec)
+        worker_segments.append(segment)
+
+    worker_dataset = MarketDataSet(
+        days=days,
+        tickers=tickers,
+        row_days=arrays["row_days"],
+        prices=arrays["prices"],
+        closes=arrays["closes"],
+        step_seconds=step_seconds
+    )
+
+
+def evaluate_parameters(parameters: StrategyParameters) -> Dict[str, float]:
+    result = run_backtest(worker_dataset, parameters)
+    return {**asdict(parameters), **result.summary}
+
+
+def build_grid(stop_losses: Sequence[float], take_profits: Sequence[float], next_investments: Sequence[float],
+               ops_per_day: Sequence[int], lower_bands: Sequence[float], upper_bands: Sequence[float],
+               above_thresholds: Sequence[float]) -> List[StrategyParameters]:
+    combinations = product(stop_losses, take_profits, next_investments, ops_per_day, lower_bands, upper_bands, above_thresholds)
+    return [
+        StrategyParameters(stop_loss, take_profit, investment, ops, lower, upper, threshold)
+        for stop_loss, take_profit, investment, ops, lower, upper, threshold in combinations
+        if lower < upper
+    ]
+
+
+def sample_random(grid: List[StrategyParameters], samples: int, seed: int) -> List[StrategyParameters]:
+    if samples >= len(grid):
+        return grid
+    return Random(seed).sample(grid, samples)
+
+
+def run_sweep(dataset: MarketDataSet, candidates: List[StrategyParameters], workers: int,
+              chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[Dict[str, float]]:
+    segments = []
+    specs = {}
+
+    try:
+        for key in SHARED_ARRAYS:
+            segment, specs[key] = share_array(np.ascontiguousarray(getattr(dataset, key)))
+            segments.append(segment)
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=initialize_worker,
+            initargs=(specs, dataset.days, dataset.tickers, dataset.step_seconds)
+        ) as executor:
+            return list(executor.map(evaluate_parameters, candidates, chunksize=chunk_size))
+    finally:
+        for segment in segments:
+            segment.close()
+            segment.unlink()
+
+
+def rank_results(results: List[Dict[str, float]], rank_by: str) -> List[Dict[str, float]]:
+    return sorted(results, key=lambda row: row.get(rank_by, 0), reverse=True)
+
+
+def format_results_table(results: List[Dict[str, float]], limit: int) -> str:
+    if not results:
+        return "No results"
+
+    columns = list(results[0].keys())
+    widths = {column: max(len(column), *(len(str(row[column])) for row in results[:limit])) for column in columns}
+    header = "  ".join(column.rjust(widths[column]) for column in columns)
+    rows = ["  ".join(str(row[column]).rjust(widths[column]) for column in columns) for row in results[:limit]]
+    return "\n".join([header] + rows)
+
+
+def save_results(results: List[Dict[str, float]], file_path: str) -> None:
+    directory = path.dirname(file_path)
+    if directory:
+        makedirs(directory, exist_ok=True)
+
+    with open(file_path, 'w', newline='') as f:
+        writer = DictWriter(f, fieldnames=list(results[0].keys()))
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def parse_arguments():
+    parser = ArgumentParser(description="Sweep strategy settings over historical days in parallel")
+    add_data_arguments(parser)
+    parser.add_argument("--stop-loss", nargs="+", type=float, default=[1.0, 1.5, 2.0, 3.0])
+    parser.add_argument("--take-profit", nargs="+", type=float, default=[2.0, 3.0, 5.0, 8.0])
+    parser.add_argument("--next-investment", nargs="+", type=float, default=[1000.0])
+    parser.add_argument("--ops-per-day", nargs="+", type=int, default=[5])
+    parser.add_argument("--buy-lower", nargs="+", type=float, default=[0.6, 0.8, 1.0])
+    parser.add_argument("--buy-upper", nargs="+", type=float, default=[0.95, 1.2])
+    parser.add_argument("--above-threshold", nargs="+", type=float, default=[1.0, 1.5])
+    parser.add_argument("--random", type=int, default=0, help="Evaluate a random sample of this size instead of the full grid")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=cpu_count())
+    parser.add_argument("--rank-by", default=DEFAULT_RANK_BY)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--output", default=None, help="Optional CSV path for the full ranked table")
+    return parser.parse_args()
+
+
+def main() -> None:
+    arguments = parse_arguments()
+    dataset = load_dataset(arguments.source, arguments.start, arguments.end, arguments.tickers,
+                           arguments.period, arguments.bar, arguments.step_seconds)
+
+    candidates = build_grid(arguments.stop_loss, arguments.take_profit, arguments.next_investment, arguments.ops_per_day,
+                            arguments.buy_lower, arguments.buy_upper, arguments.above_threshold)
+    if arguments.random > 0:
+        candidates = sample_random(candidates, arguments.random, arguments.seed)
+
+    start = perf_counter()
+    results = rank_results(run_sweep(dataset, candidates, arguments.workers), arguments.rank_by)
+    elapsed = perf_counter() - start
+
+    print(f"Evaluated {len(candidates)} parameter sets over {len(dataset.tickers)} ticker-days "
+          f"with {arguments.workers} workers in {elapsed:.2f}s")
+    print(format_results_table(results, arguments.top))
+
+    if arguments.output and results:
+        save_results(results, arguments.output)
+        print(f"Saved ranked results to {arguments.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+from json import dumps, loads
+from os import path
+from sys import path as sys_path
+from time import perf_counter
+
+sys_path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+from ibkr.order_request import build_bracket_orders, get_bracket_template
+from metrics.order_trace import summarize_values
+
+CONID = 265598
+QUANTITY = 37
+STOP_LOSS_PRICE = 98.41
+TAKE_PROFIT_PRICE = 105.27
+CLIENT_ORDER_ID = "20261019-AAPL-BUY-1"
+SAMPLES = 20000
+
+
+def build_per_order() -> str:
+    return dumps({"orders": build_bracket_orders(CONID, QUANTITY, STOP_LOSS_PRICE, TAKE_PROFIT_PRICE, CLIENT_ORDER_ID)})
+
+
+def render_template() -> str:
+    return get_bracket_template(CONID).render(QUANTITY, STOP_LOSS_PRICE, TAKE_PROFIT_PRICE, CLIENT_ORDER_ID)
+
+
+def sample_microseconds(build) -> list:
+    samples = []
+    for _ in range(SAMPLES):
+        start = perf_counter()
+        build()
+        samples.append((perf_counter() - start) * 1e6)
+    return samples
+
+
+def main() -> None:
+    if loads(build_per_order()) != loads(render_template()):
+        raise AssertionError("Rendered template differs from the per-order payload")
+
+    for name, build in (("Per-order build", build_per_order), ("Template render", render_template)):
+        summary = summarize_values(sample_microseconds(build))
+        print(f"{name:16s} p50 {summary['p50_ms']:6.2f} us | p99 {summary['p99_ms']:6.2f} us | max {summary['max_ms']:8.2f} us")
+
+
+if __name__ == "__main__":
+    main()
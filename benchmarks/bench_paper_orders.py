@@ -0,0 +1,38 @@
+from concurrent.futures import ThreadPoolExecutor
+from os import path
+from sys import path as sys_path
+from time import perf_counter
+
+sys_path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+from simulation.paper_broker import PaperBroker, PaperBrokerConfig
+
+CONID_COUNT = 500
+ORDERS_PER_CONID = 20
+THREADS = 8
+
+
+def round_trip(broker: PaperBroker, conid: int) -> None:
+    for _ in range(ORDERS_PER_CONID):
+        broker.place_market_buy_order_with_stop_and_profit(conid, 10, 98.0, 105.0)
+        broker.update_price(conid, 100.5)
+        broker.place_market_sell_order(conid, 10)
+
+
+def main() -> None:
+    broker = PaperBroker(PaperBrokerConfig(slippage_bps=5.0, latency_seconds=0.0))
+    for conid in range(CONID_COUNT):
+        broker.update_price(conid, 100.0, f"T{conid}")
+
+    start = perf_counter()
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        list(executor.map(lambda conid: round_trip(broker, conid), range(CONID_COUNT)))
+    elapsed = perf_counter() - start
+
+    order_count = len(broker.fills)
+    open_positions = len(broker.get_all_positions()["positions"])
+    print(f"Orders filled: {order_count} in {elapsed:.3f}s ({order_count / elapsed:,.0f} orders/s) | Open positions: {open_positions}")
+
+
+if __name__ == "__main__":
+    main()
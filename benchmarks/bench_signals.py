@@ -0,0 +1,58 @@
+from sys import path as sys_path
+from os import path
+from timeit import repeat
+
+import numpy as np
+
+sys_path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+from strategy.signals import ACTION_NAMES, classify_price_change, evaluate_watchlist
+
+TICKER_COUNT = 5000
+REPEATS = 5
+ITERATIONS = 20
+SEED = 42
+
+
+def generate_watchlist(ticker_count: int, seed: int) -> tuple[list, np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    tickers = [f"T{i:05d}" for i in range(ticker_count)]
+    closing_prices = rng.uniform(5, 500, ticker_count).round(2)
+    last_prices = (closing_prices * (1 + rng.normal(0, 0.01, ticker_count))).round(2)
+    return tickers, last_prices, closing_prices
+
+
+def evaluate_scalar(last_prices: list, closing_prices: list) -> list:
+    return [
+        classify_price_change(((last - close) / close) * 100)
+        for last, close in zip(last_prices, closing_prices)
+    ]
+
+
+def best_time_per_call(statement, iterations: int) -> float:
+    return min(repeat(statement, number=iterations, repeat=REPEATS)) / iterations
+
+
+def main() -> None:
+    _, last_prices, closing_prices = generate_watchlist(TICKER_COUNT, SEED)
+    last_list = last_prices.tolist()
+    close_list = closing_prices.tolist()
+
+    vectorized = evaluate_watchlist(last_prices, closing_prices)
+    reference = evaluate_scalar(last_list, close_list)
+
+    if vectorized.tolist() != reference:
+        raise AssertionError("Vectorized actions differ from the scalar reference")
+
+    scalar_time = best_time_per_call(lambda: evaluate_scalar(last_list, close_list), ITERATIONS)
+    vector_time = best_time_per_call(lambda: evaluate_watchlist(last_prices, closing_prices), ITERATIONS)
+
+    counts = {ACTION_NAMES[action]: int((vectorized == action).sum()) for action in ACTION_NAMES}
+    print(f"Tickers: {TICKER_COUNT} | Actions: {counts}")
+    print(f"Scalar:     {scalar_time * 1e3:8.3f} ms/cycle")
+    print(f"Vectorized: {vector_time * 1e3:8.3f} ms/cycle")
+    print(f"Speedup:    {scalar_time / vector_time:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+from argparse import ArgumentParser
+from json import loads
+from logging import INFO, Logger
+from multiprocessing import Process
+from multiprocessing.managers import BaseManager
+from os import path, urandom
+from sys import path as sys_path
+from threading import Lock, Thread
+from time import sleep
+from typing import Dict, List, Optional, Tuple
+
+sys_path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+import app
+from cluster.hash_ring import ConsistentHashRing
+from cluster.order_authority import OrderAuthority
+from cluster.worker import run_worker
+from logs.setup import setup_logging
+from runtime.clock import get_clock
+
+DEFAULT_COORDINATOR_PORT = 50555
+MONITOR_INTERVAL_SECONDS = 1.0
+
+
+class ShardTable:
+    """Versioned ticker assignments that workers poll once per cycle."""
+
+    def __init__(self):
+        self.version = 0
+        self.assignments: Dict[str, List[str]] = {}
+        self._lock = Lock()
+
+    def publish(self, assignments: Dict[str, List[str]]) -> int:
+        with self._lock:
+            self.assignments = assignments
+            self.version += 1
+            return self.version
+
+    def get_assignment(self, worker_id: str) -> Tuple[int, List[str]]:
+        with self._lock:
+            return self.version, list(self.assignments.get(worker_id, []))
+
+
+class ClusterServerManager(BaseManager):
+    pass
+
+
+def start_coordinator_server(authority: OrderAuthority, shards: ShardTable, port: int, authkey: bytes) -> Tuple[str, int]:
+    ClusterServerManager.register('authority', callable=lambda: authority)
+    ClusterServerManager.register('shards', callable=lambda: shards)
+
+    server = ClusterServerManager(address=("127.0.0.1", port), authkey=authkey).get_server()
+    Thread(target=server.serve_forever, daemon=True).start()
+    return server.address
+
+
+def build_worker_id(index: int) -> str:
+    return f"worker-{index}"
+
+
+def count_moved(previous: Dict[str, List[str]], current: Dict[str, List[str]]) -> int:
+    owners = {ticker: worker_id for worker_id, tickers in previous.items() for ticker in tickers}
+    return sum(1 for worker_id, tickers in current.items() for ticker in tickers if owners.get(ticker) != worker_id)
+
+
+def load_companies(companies_file: str) -> List[str]:
+    with open(companies_file, 'r') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def load_settings(settings_file: str) -> Dict:
+    with open(settings_file, 'r') as f:
+        return loads(f.read())
+
+
+def load_daily_inputs(arguments, logger: Logger) -> Tuple[Optional[Dict], Optional[List[str]]]:
+    if arguments.companies_file and arguments.settings_file:
+        return load_settings(arguments.settings_file), load_companies(arguments.companies_file)
+
+    s3_client = app.assume_iam_role(app.IAM_ROLE_NAME, logger)
+    year, month, day = app.get_current_date()
+    return app.download_daily_files(s3_client, app.S3_BUCKET, year, month, day, logger)
+
+
+def spawn_worker(worker_id: str, gateway_url: str, address: Tuple[str, int], authkey: bytes, update_interval: float) -> Process:
+    process = Process(target=run_worker, args=(worker_id, gateway_url, address, authkey, update_interval),
+                      name=worker_id, daemon=True)
+    process.start()
+    return process
+
+
+def run_coordinator(gateways: List[str], companies: List[str], settings: Dict, port: int,
+                    update_interval: float, logger: Logger) -> None:
+    """
+    Partition the watchlist across one worker process per gateway session.
+    Tickers are placed on a consistent hash ring, so when a worker dies only its own
+    tickers move to the survivors. All buys are approved by the shared OrderAuthority.
+    """
+    authority = OrderAuthority()
+    authority.update_settings(settings)
+    shards = ShardTable()
+    authkey = urandom(16)
+    address = start_coordinator_server(authority, shards, port, authkey)
+
+    worker_ids = [build_worker_id(index) for index in range(len(gateways))]
+    ring = ConsistentHashRing(worker_ids)
+    assignments = ring.assign(companies)
+    shards.publish(assignments)
+
+    for worker_id, tickers in assignments.items():
+        logger.info(f"{worker_id}: {len(tickers)} ticker(s)")
+
+    workers = {worker_id: spawn_worker(worker_id, gateway_url, address, authkey, update_interval)
+               for worker_id, gateway_url in zip(worker_ids, gateways)}
+    logger.info(f"Coordinator at {address[0]}:{address[1]} started {len(workers)} worker(s) for {len(companies)} ticker(s)")
+
+    while workers:
+        sleep(MONITOR_INTERVAL_SECONDS)
+
+        for worker_id in [worker_id for worker_id, process in workers.items() if not process.is_alive()]:
+            exit_code = workers.pop(worker_id).exitcode
+            ring.remove_node(worker_id)
+            blocked = authority.release_worker(worker_id)
+
+            if not ring.nodes:
+                logger.error(f"{worker_id} exited with code {exit_code} - no workers left")
+                break
+
+            previous, assignments = assignments, ring.assign(companies)
+            version = shards.publish(assignments)
+            logger.warning(f"{worker_id} exited with code {exit_code} - assignment v{version} moved "
+                           f"{count_moved(previous, assignments)} ticker(s) to {len(ring.nodes)} worker(s)"
+                           f"{f', blocked in-flight buys {blocked}' if blocked else ''}")
+
+    logger.info(f"Order authority at shutdown: {authority.summary()}")
+
+
+def parse_arguments():
+    parser = ArgumentParser(description="Shard the watchlist across several Client Portal gateway sessions")
+    parser.add_argument("--gateways", nargs="+", required=True, help="Gateway origins, e.g. https://localhost:5001")
+    parser.add_argument("--companies-file", help="Local selected_companies.txt; downloaded from S3 when omitted")
+    parser.add_argument("--settings-file", help="Local settings.json; downloaded from S3 when omitted")
+    parser.add_argument("--port", type=int, default=DEFAULT_COORDINATOR_PORT)
+    parser.add_argument("--update-interval", type=float, default=app.UPDATE_INTERVAL)
+    return parser.parse_args()
+
+
+def main() -> None:
+    arguments = parse_arguments()
+    current_date = get_clock().now_utc().strftime('%Y-%m-%d')
+    logger = setup_logging(log_file=f'logs/coordinator_{current_date}.log', log_level=INFO)
+
+    settings, companies = load_daily_inputs(arguments, logger)
+    if not settings or not companies:
+        logger.error("Failed to load settings or companies. Coordinator cannot start.")
+        exit(1)
+
+    run_coordinator(arguments.gateways, companies, settings, arguments.port, arguments.update_interval, logger)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+from bisect import bisect
+from hashlib import md5
+from typing import Dict, Iterable, List
+
+DEFAULT_VIRTUAL_NODES = 128
+
+
+def hash_key(key: str) -> int:
+    return int.from_bytes(md5(key.encode('utf-8')).digest()[:8], 'big')
+
+
+class ConsistentHashRing:
+    """
+    Maps keys (tickers) to nodes (worker ids) on a hash ring with virtual nodes.
+    Removing a node only moves the keys that node owned; every other key keeps its owner.
+    """
+
+    def __init__(self, nodes: Iterable[str] = (), virtual_nodes: int = DEFAULT_VIRTUAL_NODES):
+        self.virtual_nodes = virtual_nodes
+        self._points: List[int] = []
+        self._owners: Dict[int, str] = {}
+        self.nodes: List[str] = []
+        for node in nodes:
+            self.add_node(node)
+
+    def add_node(self, node: str) -> None:
+        if node in self.nodes:
+            return
+
+        self.nodes.append(node)
+        for replica in range(self.virtual_nodes):
+            point = hash_key(f"{node}#{replica}")
+            self._owners[point] = node
+        self._points = sorted(self._owners)
+
+    def remove_node(self, node: str) -> None:
+        if node not in self.nodes:
+            return
+
+        self.nodes.remove(node)
+        self._owners = {point: owner for point, owner in self._owners.items() if owner != node}
+        self._points = sorted(self._owners)
+
+    def get_node(self, key: str) -> str:
+        if not self._points:
+            raise ValueError("Hash ring has no nodes")
+
+        index = bisect(self._points, hash_key(key)) % len(self._points)
+        return self._owners[self._points[index]]
+
+    def assign(self, keys: Iterable[str]) -> Dict[str, List[str]]:
+        assignments: Dict[str, List[str]] = {node: [] for node in self.nodes}
+        for key in keys:
+            assignments[self.get_node(key)].append(key)
+        return assignments
@@ -0,0 +1,244 @@
+from argparse import ArgumentParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from json import dumps, loads
+from random import Random
+from threading import Lock, Thread
+from time import sleep, time
+from typing import Any, Dict, List
+from urllib.parse import parse_qs, urlsplit
+
+API_PATH_PREFIX = "/v1/api/"
+MOCK_ACCOUNT_ID = "DU0000000"
+PRICE_STEP_PCT = 0.2
+
+
+def build_mock_conid(symbol: str) -> int:
+    return 100000 + sum(ord(char) * (index + 1) for index, char in enumerate(symbol)) % 900000
+
+
+class MockGatewayState:
+    """Deterministic random-walk prices and an in-memory order book for one gateway session."""
+
+    def __init__(self, seed: int):
+        self.random = Random(seed)
+        self.closes: Dict[int, float] = {}
+        self.prices: Dict[int, float] = {}
+        self.symbols: Dict[int, str] = {}
+        self.positions: Dict[int, Dict[str, Any]] = {}
+        self.alerts: Dict[int, Dict[str, Any]] = {}
+        self.working_orders: Dict[int, Dict[str, Any]] = {}
+        self.filled_orders: Dict[int, Dict[str, Any]] = {}
+        self.executions: List[Dict[str, Any]] = []
+        self.requests = 0
+        self.next_order_id = 1
+        self.lock = Lock()
+
+    def search(self, symbol: str) -> List[Dict[str, Any]]:
+        conid = build_mock_conid(symbol)
+        with self.lock:
+            if conid not in self.closes:
+                self.symbols[conid] = symbol
+                self.closes[conid] = round(self.random.uniform(20, 300), 2)
+                self.prices[conid] = self.closes[conid]
+        return [{"conid": str(conid), "symbol": symbol, "sections": [{"secType": "STK"}]}]
+
+    def snapshot(self, conid: int) -> List[Dict[str, Any]]:
+        with self.lock:
+            close = self.closes.setdefault(conid, 100.0)
+            price = self.prices.get(conid, close) * (1 + self.random.uniform(-PRICE_STEP_PCT, PRICE_STEP_PCT) / 100)
+            self.prices[conid] = round(price, 2)
+            change = self.prices[conid] - close
+            return [{
+                "conid": conid,
+                "31": f"{self.prices[conid]:.2f}",
+                "82": f"{change:+.2f}",
+                "83": f"{change / close * 100:.2f}",
+                "84": f"{self.prices[conid] - 0.01:.2f}",
+                "86": f"{self.prices[conid] + 0.01:.2f}",
+                "_updated": int(time() * 1000)
+            }]
+
+    def daily_bars(self, conid: int, today_ms: int) -> List[Dict[str, Any]]:
+        with self.lock:
+            close = self.closes.setdefault(conid, 100.0)
+        return [{"o": close, "h": close, "l": close, "c": close, "v": 1000, "t": today_ms - 86400000}]
+
+    def place_orders(self, orders: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        with self.lock:
+            replies = []
+            for order in orders:
+                if order.get("parentId"):
+                    self.working_orders[self.next_order_id] = dict(order)
+                    replies.append({"order_id": str(self.next_order_id), "order_status": "PreSubmitted",
+                                    "local_order_id": order.get("cOID")})
+                    self.next_order_id += 1
+                    continue
+                conid = int(order.get("conid"))
+                quantity = order.get("quantity", 0) * (1 if order.get("side") == "BUY" else -1)
+                price = self.prices.get(conid, 100.0)
+                position = self.positions.setdefault(conid, {"conid": conid, "position": 0, "avgPrice": price,
+                                                             "ticker": self.symbols.get(conid, str(conid))})
+                position["position"] += quantity
+                if position["position"] == 0:
+                    self.positions.pop(conid)
+                self.filled_orders[self.next_order_id] = dict(order, avgPrice=price)
+                self.executions.append({"execution_id": f"mock.{self.next_order_id}", "conid": conid,
+                                        "symbol": self.symbols.get(conid, str(conid)), "side": order.get("side", "")[:1],
+                                        "size": order.get("quantity", 0), "price": f"{price:.2f}",
+                                        "commission": f"{max(1.0, 0.005 * order.get('quantity', 0)):.2f}",
+                                        "order_ref": order.get("cOID"), "trade_time_r": int(time() * 1000),
+                                        "account": MOCK_ACCOUNT_ID})
+                replies.append({"order_id": str(self.next_order_id), "order_status": "Submitted",
+                                "local_order_id": order.get("cOID")})
+                self.next_order_id += 1
+            return replies
+
+    def create_alert(self, alert: Dict[str, Any]) -> Dict[str, Any]:
+        condition = alert["conditions"][0]
+        with self.lock:
+            alert_id = self.next_order_id
+            self.next_order_id += 1
+            self.alerts[alert_id] = {"conid": int(condition["conidex"].split("@")[0]), "operator": condition["operator"],
+                                     "value": float(condition["value"]), "name": alert.get("alertName"), "triggered": False}
+        return {"order_id": alert_id, "success": True, "text": "Submitted"}
+
+    def list_alerts(self) -> List[Dict[str, Any]]:
+        """Every untriggered alert's price takes a random-walk step, then its condition is checked."""
+        with self.lock:
+            for alert in self.alerts.values():
+                if alert["triggered"]:
+                    continue
+                conid = alert["conid"]
+                price = self.prices.get(conid, 100.0) * (1 + self.random.uniform(-PRICE_STEP_PCT, PRICE_STEP_PCT) / 100)
+                self.prices[conid] = round(price, 2)
+                above = self.prices[conid] >= alert["value"]
+                alert["triggered"] = above if alert["operator"] == ">=" else self.prices[conid] <= alert["value"]
+            return [{"order_id": alert_id, "alert_name": alert["name"], "alert_active": int(not alert["triggered"]),
+                     "alert_triggered": alert["triggered"], "alert_repeatable": 0}
+                    for alert_id, alert in self.alerts.items()]
+
+    def delete_alert(self, alert_id: int) -> Dict[str, Any]:
+        with self.lock:
+            deleted = self.alerts.pop(alert_id, None) is not None
+        return {"success": deleted}
+
+    def list_orders(self) -> List[Dict[str, Any]]:
+        with self.lock:
+            return ([{"orderId": order_id, "order_ref": order.get("cOID"), "conid": order.get("conid"), "side": order.get("side"),
+                      "status": "Filled", "filledQuantity": order.get("quantity"), "avgPrice": order.get("avgPrice")}
+                     for order_id, order in self.filled_orders.items()] +
+                    [{"orderId": order_id, "order_ref": order.get("cOID"), "conid": order.get("conid"), "side": order.get("side"),
+                      "status": "PreSubmitted", "filledQuantity": 0}
+                     for order_id, order in self.working_orders.items()])
+
+    def list_positions(self) -> List[Dict[str, Any]]:
+        with self.lock:
+            return [dict(position, acctId=MOCK_ACCOUNT_ID, contractDesc=position["ticker"],
+                         mktPrice=self.prices.get(conid), currency="USD")
+                    for conid, position in self.positions.items()]
+
+
+def create_handler(state: MockGatewayState, latency_seconds: float):
+    class MockGatewayHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.dispatch("GET")
+
+        def do_POST(self):
+            self.dispatch("POST")
+
+        def do_DELETE(self):
+            self.dispatch("DELETE")
+
+        def dispatch(self, method: str) -> None:
+            url = urlsplit(self.path)
+            endpoint = url.path[len(API_PATH_PREFIX):] if url.path.startswith(API_PATH_PREFIX) else url.path.strip("/")
+            query = parse_qs(url.query)
+            length = int(self.headers.get("Content-Length") or 0)
+            body = loads(self.rfile.read(length)) if length else {}
+
+            with state.lock:
+                state.requests += 1
+            if latency_seconds > 0:
+                sleep(latency_seconds)
+
+            self.respond(route(state, method, endpoint, query, body))
+
+        def respond(self, payload: Any) -> None:
+            data = dumps(payload).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MockGatewayHandler
+
+
+def route(state: MockGatewayState, method: str, endpoint: str, query: Dict[str, List[str]], body: Any) -> Any:
+    if endpoint == "iserver/secdef/search":
+        return state.search(body.get("symbol", ""))
+    if endpoint == "iserver/marketdata/snapshot":
+        conids = query.get("conids", [""])[0] or ",".join(str(conid) for conid in body.get("conids", []))
+        return [item for conid in conids.split(",") if conid for item in state.snapshot(int(conid))]
+    if endpoint == "hmds/history":
+        return {"data": state.daily_bars(int(query.get("conid", ["0"])[0]), int(time() * 1000))}
+    if endpoint == "iserver/accounts":
+        return {"accounts": [MOCK_ACCOUNT_ID], "selectedAccount": MOCK_ACCOUNT_ID}
+    if endpoint.startswith("iserver/account/") and endpoint.endswith("/orders") and method == "POST":
+        return state.place_orders(body.get("orders", []))
+    if endpoint == "iserver/account/orders":
+        return {"orders": state.list_orders(), "snapshot": True}
+    if endpoint == "iserver/account/trades":
+        with state.lock:
+            return list(state.executions)
+    if endpoint.startswith("iserver/account/") and endpoint.endswith("/alert") and method == "POST":
+        return state.create_alert(body)
+    if endpoint.startswith("iserver/account/") and endpoint.endswith("/alerts"):
+        return state.list_alerts()
+    if endpoint.startswith("iserver/account/") and "/alert/" in endpoint and method == "DELETE":
+        return state.delete_alert(int(endpoint.rsplit("/", 1)[1]))
+    if endpoint.startswith("iserver/account/") and "/order/" in endpoint and method == "DELETE":
+        with state.lock:
+            cancelled = state.working_orders.pop(int(endpoint.rsplit("/", 1)[1]), None) is not None
+        return {"msg": "Request was submitted" if cancelled else "Order not found"}
+    if endpoint == "portfolio/accounts":
+        return [{"id": MOCK_ACCOUNT_ID}]
+    if endpoint.startswith("portfolio/") and "/positions/" in endpoint:
+        return state.list_positions()
+    return {"authenticated": True, "connected": True}
+
+
+def start_mock_gateway(port: int, host: str = "127.0.0.1", seed: int = 0, latency_seconds: float = 0.0) -> ThreadingHTTPServer:
+    state = MockGatewayState(seed or port)
+    server = ThreadingHTTPServer((host, port), create_handler(state, latency_seconds))
+    server.state = state
+    Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def parse_arguments():
+    parser = ArgumentParser(description="Run mock Client Portal gateways on localhost for sharding tests")
+    parser.add_argument("--ports", nargs="+", type=int, default=[5101, 5102, 5103])
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    return parser.parse_args()
+
+
+def main() -> None:
+    arguments = parse_arguments()
+    servers = [start_mock_gateway(port, latency_seconds=arguments.latency_ms / 1000) for port in arguments.ports]
+    print(f"Mock gateways listening on {', '.join(f'http://127.0.0.1:{port}' for port in arguments.ports)}")
+
+    try:
+        while True:
+            sleep(10)
+            print(" | ".join(f"{server.server_address[1]}: {server.state.requests} requests" for server in servers))
+    except KeyboardInterrupt:
+        for server in servers:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.settings_store import TradingSettings, parse_settings
+
+REASON_ALREADY_HELD = "position already open or pending"
+REASON_BLOCKED = "blocked after a worker died with the buy in flight"
+REASON_BUDGET_EXHAUSTED = "exposure budget exhausted"
+
+
+class OrderAuthority:
+    """
+    Single decision point for buys across all shard workers, applying the same rules
+    as handle_buy_action: no buy while the ticker is held or has a buy in flight, and
+    the cost of open positions plus in-flight reservations stays within next_investment
+    (zero means no cap). A sold ticker can be bought again. Confirmed positions are
+    kept so that another worker can adopt them when the shard moves.
+    """
+
+    def __init__(self, settings: Optional[TradingSettings] = None):
+        self.settings = settings or TradingSettings()
+        self.settings_version = 0
+        self.trading_day: Optional[str] = None
+        self.blocked_today: Dict[str, float] = {}
+        self.reservations: Dict[str, Tuple[str, float]] = {}
+        self.positions: Dict[str, Dict[str, Any]] = {}
+        self.position_costs: Dict[str, float] = {}
+        self._lock = Lock()
+
+    @property
+    def committed(self) -> float:
+        return sum(self.position_costs.values()) + sum(self.blocked_today.values())
+
+    def start_day(self, trading_day: str) -> None:
+        """Called by every worker at its day rollover; only the first call for a day clears the previous one."""
+        with self._lock:
+            if trading_day == self.trading_day:
+                return
+            self.trading_day = trading_day
+            self.blocked_today.clear()
+            self.reservations.clear()
+            self.positions.clear()
+            self.position_costs.clear()
+
+    def update_settings(self, data: Dict[str, Any], version: Optional[str] = None) -> None:
+        with self._lock:
+            self.settings = parse_settings(data, version)
+            self.settings_version += 1
+
+    def get_settings(self) -> Tuple[int, Dict[str, Any]]:
+        with self._lock:
+            return self.settings_version, self.settings.to_dict()
+
+    def reserve_buy(self, ticker: str, worker_id: str, estimated_cost: float) -> Tuple[bool, Optional[str]]:
+        with self._lock:
+            if ticker in self.positions or ticker in self.reservations:
+                return False, REASON_ALREADY_HELD
+
+            if ticker in self.blocked_today:
+                return False, REASON_BLOCKED
+
+            if self.settings.next_investment > 0:
+                reserved = sum(cost for _, cost in self.reservations.values())
+                if self.committed + reserved + estimated_cost > self.settings.next_investment:
+                    return False, REASON_BUDGET_EXHAUSTED
+
+            self.reservations[ticker] = (worker_id, estimated_cost)
+            return True, None
+
+    def confirm_buy(self, ticker: str, position: Dict[str, Any]) -> None:
+        with self._lock:
+            _, cost = self.reservations.pop(ticker, ("", 0.0))
+            self.position_costs[ticker] = cost
+            self.positions[ticker] = position
+
+    def release_buy(self, ticker: str) -> None:
+        with self._lock:
+            self.reservations.pop(ticker, None)
+
+    def record_sell(self, ticker: str) -> None:
+        with self._lock:
+            self.positions.pop(ticker, None)
+            self.position_costs.pop(ticker, None)
+
+    def get_positions(self, tickers: List[str]) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {ticker: self.positions[ticker] for ticker in tickers if ticker in self.positions}
+
+    def release_worker(self, worker_id: str) -> List[str]:
+        """Drop in-flight reservations of a dead worker; the tickers stay blocked for the day."""
+        with self._lock:
+            tickers = [ticker for ticker, (owner, _) in self.reservations.items() if owner == worker_id]
+            for ticker in tickers:
+                _, cost = self.reservations.pop(ticker)
+                self.blocked_today[ticker] = cost
+            return tickers
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "blocked_today": sorted(self.blocked_today),
+                "open_positions": sorted(self.positions),
+                "reservations": len(self.reservations),
+                "committed": round(self.committed, 2)
+            }
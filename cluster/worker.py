@@ -0,0 +1,128 @@
+from logging import INFO, Logger
+from multiprocessing.managers import BaseManager
+from typing import Any, Dict, List, Optional, Tuple
+
+import app
+from config.settings_store import parse_settings
+from ibkr.http_client import set_gateway_origin
+from logs.setup import setup_logging
+from runtime.clock import get_clock
+from runtime.day_rollover import DailyInputs, DayRolloverPrefetcher
+
+
+class ClusterClientManager(BaseManager):
+    pass
+
+
+ClusterClientManager.register('authority')
+ClusterClientManager.register('shards')
+
+
+class AuthorityClient:
+    """Binds the shared OrderAuthority proxy to one worker id for app.handle_buy_action."""
+
+    def __init__(self, authority, worker_id: str):
+        self.authority = authority
+        self.worker_id = worker_id
+
+    def reserve_buy(self, ticker: str, estimated_cost: float) -> Tuple[bool, Optional[str]]:
+        return self.authority.reserve_buy(ticker, self.worker_id, estimated_cost)
+
+    def confirm_buy(self, ticker: str, position: Dict[str, Any]) -> None:
+        self.authority.confirm_buy(ticker, position)
+
+    def release_buy(self, ticker: str) -> None:
+        self.authority.release_buy(ticker)
+
+    def record_sell(self, ticker: str) -> None:
+        self.authority.record_sell(ticker)
+
+
+def connect_to_coordinator(address: Tuple[str, int], authkey: bytes) -> ClusterClientManager:
+    manager = ClusterClientManager(address=address, authkey=authkey)
+    manager.connect()
+    return manager
+
+
+def refresh_worker_settings(authority, known_version: Optional[int], logger: Logger) -> int:
+    version, data = authority.get_settings()
+    if version != known_version:
+        app.settings_store.swap(parse_settings(data, str(version)))
+        app.update_cached_settings(app.settings_store.get())
+        logger.info("Settings v%s applied: %s", version, data)
+    return version
+
+
+def apply_assignment(authority, tickers: List[str], logger: Logger) -> None:
+    """
+    Adopt open positions for tickers that moved here and forget the ones that moved
+    away; the shard becomes the watchlist that app.run_trading_cycle polls.
+    """
+    app.cached_companies = tickers
+    app.daily_files_downloaded = True
+
+    for ticker in [ticker for ticker in app.bought_shares_today if ticker not in tickers]:
+        app.bought_shares_today.pop(ticker, None)
+
+    adopted = {ticker: position for ticker, position in authority.get_positions(tickers).items()
+               if ticker not in app.bought_shares_today}
+    app.bought_shares_today.update(adopted)
+
+    for ticker in adopted:
+        logger.info("%s - Adopted open position from the order authority", ticker)
+    app.rebuild_portfolio_ledger()
+
+
+def fetch_worker_inputs(authority, shards, worker_id: str, day) -> DailyInputs:
+    """A worker's daily inputs come from the coordinator instead of S3: its shard and the shared settings."""
+    _, tickers = shards.get_assignment(worker_id)
+    _, settings = authority.get_settings()
+    return DailyInputs(day=day, settings=settings, companies=tickers)
+
+
+def start_worker_day(authority, logger: Logger) -> None:
+    """Open today's journal in the worker's own state directory and reconcile it with the gateway."""
+    year, month, day = app.get_current_date()
+    app.active_trading_day = app.get_current_day()
+    authority.start_day(app.active_trading_day.isoformat())
+    app.reconcile_restored_positions(app.restore_state_from_journal(year, month, day, logger), logger)
+
+
+def run_worker(worker_id: str, gateway_url: str, address: Tuple[str, int], authkey: bytes, update_interval: float) -> None:
+    set_gateway_origin(gateway_url)
+    current_date = get_clock().now_utc().strftime('%Y-%m-%d')
+    logger = setup_logging(log_file=f'logs/{worker_id}_{current_date}.log', log_level=INFO)
+    logger.info(f"Worker {worker_id} bound to gateway {gateway_url}")
+
+    manager = connect_to_coordinator(address, authkey)
+    authority = manager.authority()
+    shards = manager.shards()
+    app.order_authority = AuthorityClient(authority, worker_id)
+
+    app.state_directory_name = worker_id
+    app.initialize_ibkr_brokerage_session(logger)
+    start_worker_day(authority, logger)
+    app.day_prefetcher = DayRolloverPrefetcher(lambda day: fetch_worker_inputs(authority, shards, worker_id, day), logger,
+                                               app.PREFETCH_RETRY_INTERVAL)
+
+    settings_version = None
+    assignment_version = None
+
+    while True:
+        settings_version = refresh_worker_settings(authority, settings_version, logger)
+
+        version, tickers = shards.get_assignment(worker_id)
+        if version != assignment_version:
+            assignment_version = version
+            apply_assignment(authority, tickers, logger)
+            app.warm_market_data(tickers, logger)
+            app.bootstrap_closing_prices(tickers, logger)
+            logger.info("Assignment v%s: %d ticker(s)", version, len(tickers))
+
+        if app.get_current_day() != app.active_trading_day:
+            authority.start_day(app.get_current_day().isoformat())
+        app.run_trading_cycle(None, logger)
+
+        if update_interval > 0:
+            app.log_next_update_time(update_interval, logger)
+            get_clock().sleep(update_interval)
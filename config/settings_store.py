@@ -0,0 +1,141 @@
+from dataclasses import dataclass
+from functools import cached_property
+from json import loads
+from logging import Logger
+from threading import Lock, Thread
+from time import sleep
+from typing import Any, Callable, Dict, List, Optional
+
+from botocore.exceptions import ClientError
+
+DEFAULT_NEXT_INVESTMENT = 0.0
+DEFAULT_OPS_PER_DAY = 1
+DEFAULT_REFRESH_INTERVAL_SECONDS = 30
+DEFAULT_STOP_LOSS_PCT = 2.0
+DEFAULT_TAKE_PROFIT_PCT = 5.0
+NOT_MODIFIED_CODES = ('304', 'NotModified')
+
+NEXT_INVESTMENT_KEY = 'nextInvestment'
+OPS_PER_DAY_KEY = 'opsPerDay'
+STOP_LOSS_KEY = 'stopLoss'
+TAKE_PROFIT_KEY = 'takeProfit'
+
+
+@dataclass(frozen=True)
+class TradingSettings:
+    stop_loss_pct: float = DEFAULT_STOP_LOSS_PCT
+    take_profit_pct: float = DEFAULT_TAKE_PROFIT_PCT
+    next_investment: float = DEFAULT_NEXT_INVESTMENT
+    ops_per_day: int = DEFAULT_OPS_PER_DAY
+    version: Optional[str] = None
+
+    @cached_property
+    def budget_per_trade(self) -> float:
+        if self.next_investment > 0 and self.ops_per_day > 0:
+            return self.next_investment / self.ops_per_day
+        return 0
+
+    @cached_property
+    def stop_loss_ratio(self) -> float:
+        return 1 - self.stop_loss_pct / 100
+
+    @cached_property
+    def take_profit_ratio(self) -> float:
+        return 1 + self.take_profit_pct / 100
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            STOP_LOSS_KEY: self.stop_loss_pct,
+            TAKE_PROFIT_KEY: self.take_profit_pct,
+            NEXT_INVESTMENT_KEY: self.next_investment,
+            OPS_PER_DAY_KEY: self.ops_per_day
+        }
+
+
+SettingsListener = Callable[[TradingSettings, TradingSettings], None]
+
+
+def parse_settings(data: Dict[str, Any], version: Optional[str] = None) -> TradingSettings:
+    return TradingSettings(
+        stop_loss_pct=float(data.get(STOP_LOSS_KEY, DEFAULT_STOP_LOSS_PCT)),
+        take_profit_pct=float(data.get(TAKE_PROFIT_KEY, DEFAULT_TAKE_PROFIT_PCT)),
+        next_investment=float(data.get(NEXT_INVESTMENT_KEY, DEFAULT_NEXT_INVESTMENT)),
+        ops_per_day=int(data.get(OPS_PER_DAY_KEY, DEFAULT_OPS_PER_DAY)),
+        version=version
+    )
+
+
+def is_not_modified_error(error: ClientError) -> bool:
+    return error.response.get('Error', {}).get('Code') in NOT_MODIFIED_CODES
+
+
+class SettingsStore:
+    """
+    In-memory settings snapshot backed by an S3 object.
+    Readers call get() and receive an immutable TradingSettings; refreshes build a
+    new snapshot and swap the reference, so readers never block or do I/O.
+    Refreshes use the ETag as IfNoneMatch, so an unchanged object returns 304 with no body.
+    """
+
+    def __init__(self, bucket: str, key: str):
+        self.bucket = bucket
+        self.key = key
+        self._current = TradingSettings()
+        self._listeners: List[SettingsListener] = []
+        self._refresh_lock = Lock()
+        self._thread: Optional[Thread] = None
+
+    def get(self) -> TradingSettings:
+        return self._current
+
+    def subscribe(self, listener: SettingsListener) -> None:
+        self._listeners.append(listener)
+
+    def swap(self, new_settings: TradingSettings) -> None:
+        previous = self._current
+        self._current = new_settings
+
+        if previous.to_dict() != new_settings.to_dict():
+            for listener in list(self._listeners):
+                listener(previous, new_settings)
+
+    def refresh(self, s3_client) -> bool:
+        """
+        Fetch the settings object if its ETag changed.
+        Returns True if a new snapshot was swapped in, False if unchanged.
+        """
+        with self._refresh_lock:
+            request = {'Bucket': self.bucket, 'Key': self.key}
+            if self._current.version:
+                request['IfNoneMatch'] = self._current.version
+
+            try:
+                response = s3_client.get_object(**request)
+            except ClientError as e:
+                if is_not_modified_error(e):
+                    return False
+                raise
+
+            data = loads(response['Body'].read().decode('utf-8'))
+            self.swap(parse_settings(data, response.get('ETag')))
+            return True
+
+    def start_background_refresh(self, s3_client, logger: Logger, interval_seconds: int = DEFAULT_REFRESH_INTERVAL_SECONDS) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._thread = Thread(
+            target=self._refresh_loop,
+            args=(s3_client, logger, interval_seconds),
+            name='settings-refresh',
+            daemon=True
+        )
+        self._thread.start()
+
+    def _refresh_loop(self, s3_client, logger: Logger, interval_seconds: int) -> None:
+        while True:
+            sleep(interval_seconds)
+            try:
+                self.refresh(s3_client)
+            except Exception as e:
+                logger.warning(f"Settings refresh failed, keeping version {self._current.version}: {e}")
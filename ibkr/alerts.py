@@ -0,0 +1,82 @@
+from typing import Any, Dict, List
+from urllib3 import disable_warnings
+from urllib3.exceptions import InsecureRequestWarning
+
+from ibkr.http_client import delete, get, post
+
+disable_warnings(InsecureRequestWarning)
+
+BASE_URL = "https://localhost:5001/v1/api/"
+HTTP_OK = 200
+
+ALERT_ID_KEY = "order_id"
+ALERT_NAME_KEY = "alert_name"
+ALERT_TRIGGERED_KEY = "alert_triggered"
+CONDITION_TYPE_PRICE = 1
+TRIGGER_METHOD_DEFAULT = "0"
+TIME_IN_FORCE_GTC = "GTC"
+
+
+def build_url(endpoint: str) -> str:
+    return BASE_URL + endpoint
+
+
+def build_price_alert_payload(name: str, conid: int, operator: str, price: float) -> Dict[str, Any]:
+    """One-shot, regular-hours price alert that only shows up in the alert list (no popup, email or order)."""
+    return {
+        "orderId": 0,
+        "alertName": name,
+        "alertMessage": f"{name} {operator} {price:.2f}",
+        "alertRepeatable": 0,
+        "outsideRth": 0,
+        "sendMessage": 0,
+        "showPopup": 0,
+        "iTWSOrdersOnly": 0,
+        "tif": TIME_IN_FORCE_GTC,
+        "conditions": [{
+            "conidex": f"{conid}@SMART",
+            "logicBind": "n",
+            "operator": operator,
+            "triggerMethod": TRIGGER_METHOD_DEFAULT,
+            "type": CONDITION_TYPE_PRICE,
+            "value": f"{price:.2f}"
+        }]
+    }
+
+
+def create_price_alert(account_id: str, name: str, conid: int, operator: str, price: float) -> int:
+    payload = build_price_alert_payload(name, conid, operator, price)
+    response = post(url=build_url(f"iserver/account/{account_id}/alert"), json=payload, verify=False)
+
+    if response.status_code != HTTP_OK:
+        raise Exception(f"Error: {response.status_code}, Response text: {response.text}")
+
+    data = response.json()
+    if not data.get("success") or data.get(ALERT_ID_KEY) is None:
+        raise Exception(f"Alert {name} was not accepted: {data}")
+    return int(data[ALERT_ID_KEY])
+
+
+def get_alerts(account_id: str) -> List[Dict[str, Any]]:
+    response = get(url=build_url(f"iserver/account/{account_id}/alerts"), verify=False)
+
+    if response.status_code != HTTP_OK:
+        raise Exception(f"Error: {response.status_code}, Response text: {response.text}")
+
+    data = response.json()
+    return data if isinstance(data, list) else []
+
+
+def get_triggered_alert_ids(alerts: List[Dict[str, Any]]) -> List[int]:
+    return [int(alert[ALERT_ID_KEY]) for alert in alerts
+            if alert.get(ALERT_TRIGGERED_KEY) and alert.get(ALERT_ID_KEY) is not None]
+
+
+def find_alert_ids(alerts: List[Dict[str, Any]], name_prefix: str) -> List[int]:
+    return [int(alert[ALERT_ID_KEY]) for alert in alerts
+            if str(alert.get(ALERT_NAME_KEY, "")).startswith(name_prefix) and alert.get(ALERT_ID_KEY) is not None]
+
+
+def delete_alert(account_id: str, alert_id: int) -> bool:
+    response = delete(url=build_url(f"iserver/account/{account_id}/alert/{alert_id}"), verify=False)
+    return response.status_code == HTTP_OK
@@ -8,11 +8,13 @@ from urllib3.exceptions import InsecureRequestWarning
 
 disable_warnings(InsecureRequestWarning)
 
+REQUEST_TIMEOUT_SECONDS = 10
+
 def confirm_authentication():
     base_url = "https://localhost:5001/v1/api/"
     endpoint = "iserver/auth/status"
 
-    auth_req = get(url=base_url + endpoint, verify=False)
+    auth_req = get(url=base_url + endpoint, verify=False, timeout=REQUEST_TIMEOUT_SECONDS)
     print(auth_req)
     print(auth_req.text)
 
@@ -0,0 +1,32 @@
+from typing import Optional
+
+from ibkr.order_request import (cancel_orders, get_executions, get_live_orders, place_market_buy_order, place_market_buy_order_with_stop_and_profit,
+                                place_market_sell_order)
+from ibkr.portfolio import get_all_positions
+from simulation.paper_broker import PaperBroker, PaperBrokerConfig, PriceProvider
+
+BROKER_MODE_LIVE = "live"
+BROKER_MODE_PAPER = "paper"
+
+
+class LiveBroker:
+    """Routes orders and position queries to the Client Portal gateway."""
+
+    place_market_buy_order = staticmethod(place_market_buy_order)
+    place_market_buy_order_with_stop_and_profit = staticmethod(place_market_buy_order_with_stop_and_profit)
+    place_market_sell_order = staticmethod(place_market_sell_order)
+    cancel_orders = staticmethod(cancel_orders)
+    get_live_orders = staticmethod(get_live_orders)
+    get_executions = staticmethod(get_executions)
+    get_all_positions = staticmethod(get_all_positions)
+
+    def update_price(self, conid: int, price: float, ticker: Optional[str] = None) -> None:
+        pass
+
+
+def create_broker(mode: str, paper_config: Optional[PaperBrokerConfig] = None, price_provider: Optional[PriceProvider] = None):
+    if mode == BROKER_MODE_PAPER:
+        return PaperBroker(paper_config, price_provider)
+    if mode == BROKER_MODE_LIVE:
+        return LiveBroker()
+    raise ValueError(f"Unknown broker mode: {mode}")
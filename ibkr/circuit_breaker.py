@@ -0,0 +1,82 @@
+from threading import Lock
+from typing import Optional
+
+from metrics.instrumentation import increment, set_gauge
+from runtime.clock import get_clock
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_HALF_OPEN = "half_open"
+CIRCUIT_OPEN = "open"
+CIRCUIT_STATE_VALUES = {CIRCUIT_CLOSED: 0, CIRCUIT_HALF_OPEN: 1, CIRCUIT_OPEN: 2}
+CIRCUIT_STATE_METRIC = "ibkr_circuit_state"
+CIRCUIT_REJECTED_METRIC = "ibkr_circuit_rejected_total"
+CIRCUIT_OPENED_METRIC = "ibkr_circuit_opened_total"
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_OPEN_SECONDS = 10.0
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while its endpoint class is open; nothing reached the gateway."""
+
+
+class CircuitBreaker:
+    """
+    Shared by every request of one endpoint class. After failure_threshold
+    consecutive failures (timeouts, connection errors, 5xx) the circuit opens and
+    requests fail fast for open_seconds. Then one request is let through as a probe
+    (half-open): success closes the circuit, failure opens it again.
+    The state is exported as the ibkr_circuit_state gauge: 0 closed, 1 half-open, 2 open.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 open_seconds: float = DEFAULT_OPEN_SECONDS):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.state = CIRCUIT_CLOSED
+        self.consecutive_failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_in_flight = False
+        self._lock = Lock()
+        self._publish()
+
+    def is_rejecting(self) -> bool:
+        """True while open and not yet due for a probe, i.e. the next request would fail fast."""
+        with self._lock:
+            return self.state == CIRCUIT_OPEN and not self._is_probe_due()
+
+    def before_request(self) -> None:
+        with self._lock:
+            if self.state == CIRCUIT_OPEN and self._is_probe_due():
+                self._transition(CIRCUIT_HALF_OPEN)
+            if self.state == CIRCUIT_OPEN or (self.state == CIRCUIT_HALF_OPEN and self._probe_in_flight):
+                increment(CIRCUIT_REJECTED_METRIC, "endpoint_class", self.name)
+                raise CircuitOpenError(f"Circuit {self.name} is {self.state} after {self.consecutive_failures} consecutive failure(s)")
+            if self.state == CIRCUIT_HALF_OPEN:
+                self._probe_in_flight = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+            if self.state != CIRCUIT_CLOSED:
+                self._transition(CIRCUIT_CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            self._probe_in_flight = False
+            if self.state == CIRCUIT_HALF_OPEN or (self.state == CIRCUIT_CLOSED and self.consecutive_failures >= self.failure_threshold):
+                self._opened_at = get_clock().monotonic()
+                increment(CIRCUIT_OPENED_METRIC, "endpoint_class", self.name)
+                self._transition(CIRCUIT_OPEN)
+
+    def _is_probe_due(self) -> bool:
+        return get_clock().monotonic() - (self._opened_at or 0.0) >= self.open_seconds
+
+    def _transition(self, state: str) -> None:
+        self.state = state
+        self._publish()
+
+    def _publish(self) -> None:
+        set_gauge(CIRCUIT_STATE_METRIC, CIRCUIT_STATE_VALUES[self.state], "endpoint_class", self.name)
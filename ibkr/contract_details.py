@@ -1,8 +1,9 @@
 from typing import Optional
-from requests import post
 from urllib3 import disable_warnings
 from urllib3.exceptions import InsecureRequestWarning
 
+from ibkr.http_client import post
+
 disable_warnings(InsecureRequestWarning)
 
 BASE_URL = "https://localhost:5001/v1/api/"
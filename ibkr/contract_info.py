@@ -9,6 +9,8 @@ from urllib3.exceptions import InsecureRequestWarning
 
 disable_warnings(InsecureRequestWarning)
 
+REQUEST_TIMEOUT_SECONDS = 10
+
 def contract_info():
     base_url = "https://localhost:5001/v1/api/"
     endpoint = "iserver/secdef/info"
@@ -21,7 +23,7 @@ def contract_info():
     query_params = "&".join([conid, secType, month, exchange])
 
     request_url = "".join([base_url, endpoint, "?", query_params])
-    contract_req = get(request_url, verify=False)
+    contract_req = get(request_url, verify=False, timeout=REQUEST_TIMEOUT_SECONDS)
 
     if contract_req.status_code == 200:
         contract_json = dumps(contract_req.json(), indent=2)
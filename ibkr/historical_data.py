@@ -1,12 +1,24 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
 from time import sleep
-from requests import get, post
+from typing import Dict, List, Optional
 from urllib3 import disable_warnings
 from urllib3.exceptions import InsecureRequestWarning
 
+from ibkr.http_client import get, post
+from metrics.instrumentation import timed
+
 disable_warnings(InsecureRequestWarning)
 
 BASE_URL = "https://localhost:5001/v1/api/"
+DEFAULT_SNAPSHOT_FIELDS = "31,82,83,84,86,87"
+SNAPSHOT_ENDPOINT = "iserver/marketdata/snapshot"
+SUBSCRIPTION_BATCH_SIZE = 50
 SUBSCRIPTION_WAIT_SECONDS = 1
+HISTORY_ENDPOINT = "hmds/history"
+HISTORY_WORKERS = 5
+PREVIOUS_CLOSE_PERIOD = "5d"
+EASTERN_OFFSET = timedelta(hours=-5)
 
 
 def build_query_params(**params) -> str:
@@ -37,6 +49,44 @@ def get_market_data(conid: int, period: str, bar: str):
         raise Exception(f"Error: {contract_req.status_code}, Response text: {contract_req.text}")
 
 
+def get_daily_bars(conid: int, period: str = PREVIOUS_CLOSE_PERIOD) -> List[dict]:
+    """Regular-session daily trade bars, whose close is the official close."""
+    query_params = build_query_params(conid=conid, period=period, bar="1d", outsideRth="false", barType="Last")
+    contract_req = get(build_request_url(HISTORY_ENDPOINT, query_params), verify=False)
+
+    if contract_req.status_code == 200:
+        return contract_req.json().get('data', [])
+    else:
+        raise Exception(f"Error: {contract_req.status_code}, Response text: {contract_req.text}")
+
+
+def get_bar_session_date(bar: dict) -> date:
+    return (datetime.fromtimestamp(bar['t'] / 1000, timezone.utc) + EASTERN_OFFSET).date()
+
+
+def find_previous_close(bars: List[dict], before: date) -> Optional[float]:
+    previous = [bar for bar in bars if 't' in bar and 'c' in bar and get_bar_session_date(bar) < before]
+    if not previous:
+        return None
+    return float(max(previous, key=lambda bar: bar['t'])['c'])
+
+
+def get_previous_closes(conids: List[int], before: date, workers: int = HISTORY_WORKERS) -> Dict[int, Optional[float]]:
+    """
+    Official close of the last session before the given date for every conid, fetched
+    with at most `workers` history requests in flight (the gateway paces hmds harder
+    than snapshots). Conids whose request failed map to None.
+    """
+    def fetch_close(conid: int) -> Optional[float]:
+        try:
+            return find_previous_close(get_daily_bars(conid), before)
+        except Exception:
+            return None
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hmds") as executor:
+        return dict(zip(conids, executor.map(fetch_close, conids)))
+
+
 def is_subscription_confirmation(response: list) -> bool:
     if not isinstance(response, list) or len(response) == 0:
         return False
@@ -46,7 +96,8 @@ def is_subscription_confirmation(response: list) -> bool:
 
 
 def fetch_market_data_with_subscription(request_url: str):
-    sleep(SUBSCRIPTION_WAIT_SECONDS)
+    with timed("snapshot_subscription_wait"):
+        sleep(SUBSCRIPTION_WAIT_SECONDS)
     contract_req = get(request_url, verify=False)
 
     if contract_req.status_code == 200:
@@ -68,8 +119,8 @@ def try_post_fallback(endpoint: str, conid: int, fields: str):
         raise Exception(f"Error: {contract_req.status_code}, Response text: {contract_req.text}")
 
 
-def get_market_snapshot(conid: int, fields: str = "31,82,83,84,86,87"):
-    endpoint = "iserver/marketdata/snapshot"
+def get_market_snapshot(conid: int, fields: str = DEFAULT_SNAPSHOT_FIELDS):
+    endpoint = SNAPSHOT_ENDPOINT
 
     query_params = build_query_params(conids=conid, fields=fields)
     request_url = build_request_url(endpoint, query_params)
@@ -88,3 +139,54 @@ def get_market_snapshot(conid: int, fields: str = "31,82,83,84,86,87"):
         return try_post_fallback(endpoint, conid, fields)
     else:
         raise Exception(f"Error: {contract_req.status_code}, Response text: {contract_req.text}")
+
+
+def split_batches(conids: list, batch_size: int = SUBSCRIPTION_BATCH_SIZE) -> list:
+    return [conids[start:start + batch_size] for start in range(0, len(conids), batch_size)]
+
+
+def build_batch_snapshot_url(conids: list, fields: str) -> str:
+    query_params = build_query_params(conids=",".join(str(conid) for conid in conids), fields=fields)
+    return build_request_url(SNAPSHOT_ENDPOINT, query_params)
+
+
+def prime_market_data_subscriptions(conids: list, fields: str = DEFAULT_SNAPSHOT_FIELDS) -> int:
+    """
+    Open snapshot subscriptions for many conids with one request per batch, so the first
+    per-ticker snapshot returns data instead of a subscription confirmation.
+    Returns the number of conids in batches the gateway accepted.
+    """
+    primed = 0
+    for batch in split_batches(conids):
+        contract_req = get(build_batch_snapshot_url(batch, fields), verify=False)
+
+        if contract_req.status_code == 200:
+            primed += len(batch)
+
+    return primed
+
+
+def has_snapshot_data(item: dict) -> bool:
+    return isinstance(item, dict) and len(item.keys()) > 2 and 'conid' in item
+
+
+def get_market_snapshots(conids: list, fields: str = DEFAULT_SNAPSHOT_FIELDS) -> list:
+    """
+    Snapshot up to SUBSCRIPTION_BATCH_SIZE conids in one request. Conids that only
+    return a subscription confirmation are asked again once after the subscription wait.
+    Returns the items that carry data.
+    """
+    request_url = build_batch_snapshot_url(conids, fields)
+    contract_req = get(request_url, verify=False)
+
+    if contract_req.status_code != 200:
+        raise Exception(f"Error: {contract_req.status_code}, Response text: {contract_req.text}")
+
+    items = [item for item in contract_req.json() if has_snapshot_data(item)]
+    if len(items) < len(conids):
+        received = {str(item.get('conid')) for item in items}
+        missing = [conid for conid in conids if str(conid) not in received]
+        retried = fetch_market_data_with_subscription(build_batch_snapshot_url(missing, fields))
+        items.extend(item for item in retried if has_snapshot_data(item))
+
+    return items
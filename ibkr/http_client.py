@@ -0,0 +1,148 @@
+from os import environ
+from random import uniform
+from typing import Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+from requests import RequestException, Response, delete as requests_delete, get as requests_get, post as requests_post
+
+from ibkr.circuit_breaker import CircuitBreaker
+from metrics.instrumentation import increment, timed_request
+from runtime.clock import get_clock
+
+API_PATH_PREFIX = "/v1/api/"
+DEFAULT_GATEWAY_ORIGIN = "https://localhost:5001"
+ID_PLACEHOLDER = "{id}"
+HTTP_SERVER_ERROR = 500
+
+ENDPOINT_CLASS_MARKET_DATA = "market_data"
+ENDPOINT_CLASS_ORDERS = "orders"
+ENDPOINT_CLASS_PORTFOLIO = "portfolio"
+ENDPOINT_CLASS_SESSION = "session"
+ENDPOINT_CLASS_PREFIXES = (
+    (ENDPOINT_CLASS_MARKET_DATA, ("iserver/marketdata", "iserver/secdef", "hmds", "trsrv", "md")),
+    (ENDPOINT_CLASS_ORDERS, ("iserver/account", "iserver/reply")),
+    (ENDPOINT_CLASS_PORTFOLIO, ("portfolio",))
+)
+# Whole-call budget including read retries; the read timeout of each attempt is what is left of it
+CALL_DEADLINE_SECONDS = {
+    ENDPOINT_CLASS_MARKET_DATA: float(environ.get('IBKR_MARKET_DATA_DEADLINE', '5')),
+    ENDPOINT_CLASS_ORDERS: float(environ.get('IBKR_ORDERS_DEADLINE', '10')),
+    ENDPOINT_CLASS_PORTFOLIO: float(environ.get('IBKR_PORTFOLIO_DEADLINE', '10')),
+    ENDPOINT_CLASS_SESSION: 10.0
+}
+CONNECT_TIMEOUT_SECONDS = 3.05
+MIN_READ_TIMEOUT_SECONDS = 0.5
+READ_RETRY_ATTEMPTS = 2
+RETRY_BASE_DELAY_SECONDS = 0.1
+RETRY_MAX_DELAY_SECONDS = 1.0
+RETRY_METRIC = "ibkr_request_retries_total"
+FAILURE_METRIC = "ibkr_request_failures_total"
+
+gateway_origin = environ.get('IBKR_GATEWAY_URL', DEFAULT_GATEWAY_ORIGIN).rstrip("/")
+circuit_breakers: Dict[str, CircuitBreaker] = {
+    endpoint_class: CircuitBreaker(endpoint_class) for endpoint_class, _ in ENDPOINT_CLASS_PREFIXES
+}
+
+
+def set_gateway_origin(origin: str) -> None:
+    """Bind this process to another gateway session, e.g. http://127.0.0.1:5102."""
+    global gateway_origin
+    gateway_origin = origin.rstrip("/")
+
+
+def resolve_url(url: str) -> str:
+    if gateway_origin != DEFAULT_GATEWAY_ORIGIN and url.startswith(DEFAULT_GATEWAY_ORIGIN):
+        return gateway_origin + url[len(DEFAULT_GATEWAY_ORIGIN):]
+    return url
+
+
+def normalize_endpoint(url: str) -> str:
+    """Map a gateway URL to a low-cardinality label, e.g. iserver/account/{id}/orders."""
+    url_path = urlsplit(url).path
+    if url_path.startswith(API_PATH_PREFIX):
+        url_path = url_path[len(API_PATH_PREFIX):]
+
+    segments = [ID_PLACEHOLDER if any(char.isdigit() for char in segment) else segment
+                for segment in url_path.strip("/").split("/")]
+    return "/".join(segments)
+
+
+def classify_endpoint(endpoint: str) -> str:
+    for endpoint_class, prefixes in ENDPOINT_CLASS_PREFIXES:
+        if endpoint.startswith(prefixes):
+            return endpoint_class
+    return ENDPOINT_CLASS_SESSION
+
+
+def get_circuit_breaker(endpoint_class: str) -> Optional[CircuitBreaker]:
+    return circuit_breakers.get(endpoint_class)
+
+
+def calculate_retry_delay(attempt: int) -> float:
+    """Full jitter: uniform over an exponentially growing window, so retrying clients spread out."""
+    return uniform(0, min(RETRY_MAX_DELAY_SECONDS, RETRY_BASE_DELAY_SECONDS * 2 ** attempt))
+
+
+def send(request: Callable[..., Response], url: str, retry_reads: bool, kwargs: Dict) -> Response:
+    """
+    Send one gateway request within its endpoint class's deadline and circuit breaker.
+    Timeouts, connection errors and 5xx count as failures; only idempotent reads are
+    retried, and only while the deadline allows. The last failure is raised (or its
+    5xx response returned) once the retries are spent.
+    """
+    endpoint = normalize_endpoint(url)
+    endpoint_class = classify_endpoint(endpoint)
+    breaker = circuit_breakers.get(endpoint_class)
+    clock = get_clock()
+    deadline = clock.monotonic() + CALL_DEADLINE_SECONDS[endpoint_class]
+
+    attempt = 0
+    while True:
+        if breaker is not None:
+            breaker.before_request()
+        call_kwargs = kwargs
+        if "timeout" not in kwargs:
+            call_kwargs = dict(kwargs, timeout=(CONNECT_TIMEOUT_SECONDS, max(deadline - clock.monotonic(), MIN_READ_TIMEOUT_SECONDS)))
+
+        error = None
+        response = None
+        try:
+            with timed_request(endpoint):
+                response = request(resolve_url(url), **call_kwargs)
+        except RequestException as e:
+            error = e
+        except Exception:
+            if breaker is not None:
+                breaker.record_failure()
+            raise
+
+        if error is None and response.status_code < HTTP_SERVER_ERROR:
+            if breaker is not None:
+                breaker.record_success()
+            return response
+
+        increment(FAILURE_METRIC, "endpoint_class", endpoint_class)
+        if breaker is not None:
+            breaker.record_failure()
+
+        delay = calculate_retry_delay(attempt)
+        if not retry_reads or attempt >= READ_RETRY_ATTEMPTS or clock.monotonic() + delay >= deadline:
+            if error is not None:
+                raise error
+            return response
+
+        increment(RETRY_METRIC, "endpoint_class", endpoint_class)
+        clock.sleep(delay)
+        attempt += 1
+
+
+def get(url: str, **kwargs) -> Response:
+    return send(requests_get, url, True, kwargs)
+
+
+def post(url: str, **kwargs) -> Response:
+    return send(requests_post, url, False, kwargs)
+
+
+def delete(url: str, **kwargs) -> Response:
+    return send(requests_delete, url, False, kwargs)
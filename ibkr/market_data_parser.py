@@ -1,5 +1,7 @@
 from datetime import datetime, time
 
+from runtime.clock import get_clock
+
 CLOSING_PRICE_PREFIX = 'C'
 MARKET_CLOSE_TIME = time(16, 0)
 MARKET_OPEN_TIME = time(9, 30)
@@ -7,9 +9,9 @@ OPENING_PRICE_PREFIX = 'O'
 
 
 def get_current_eastern_time() -> time:
-    from datetime import timedelta, timezone
+    from datetime import timedelta
     eastern_offset = timedelta(hours=-5)
-    eastern_time = datetime.now(timezone.utc) + eastern_offset
+    eastern_time = get_clock().now_utc() + eastern_offset
     return eastern_time.time()
 
 
@@ -68,6 +70,16 @@ def parse_last_price(market_data: dict, result: dict) -> None:
         result['last_price'] = str(price_str)
 
 
+def extract_last_price(market_data: dict) -> float:
+    """Last price without its C/O prefix; NaN when the snapshot has none."""
+    result = {}
+    parse_last_price(market_data, result)
+    try:
+        return float(result['last_price'])
+    except (KeyError, TypeError, ValueError):
+        return float('nan')
+
+
 def calculate_previous_close(change_value: float, current_price: float) -> str:
     return str(round(current_price - change_value, 2))
 
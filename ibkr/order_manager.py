@@ -0,0 +1,178 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ibkr.order_request import CLIENT_ORDER_ID_KEY, UNCONFIRMED_KEY, find_orders_by_client_order_id
+from runtime.clock import get_clock
+
+DEFAULT_SUBMISSION_WORKERS = 1
+RECONCILE_ATTEMPTS = 3
+RECONCILE_RETRY_SECONDS = 1.0
+IN_DOUBT_RETRY_SECONDS = 30.0
+IN_DOUBT_KEY = "in_doubt"
+
+OrderKey = Tuple[str, str]
+SendOrder = Callable[[str], Dict[str, Any]]
+ListLiveOrders = Callable[[], Dict[str, Any]]
+
+
+def build_client_order_id(day: date, ticker: str, side: str, attempt: int) -> str:
+    """Same day, ticker, side and attempt always give the same cOID, so a resend after a crash is recognizable."""
+    return f"{day:%Y%m%d}-{ticker}-{side}-{attempt}"
+
+
+def parse_client_order_attempt(client_order_id: str) -> int:
+    try:
+        return int(client_order_id.rsplit("-", 1)[1])
+    except (IndexError, ValueError):
+        return 0
+
+
+@dataclass
+class ManagedOrder:
+    ticker: str
+    side: str
+    client_order_id: str
+    context: Dict[str, Any] = field(default_factory=dict)
+    result: Optional[Dict[str, Any]] = None
+    reconciled: bool = False
+    checked_at: Optional[float] = None
+
+
+class OrderManager:
+    """
+    Local book of in-flight orders plus the worker that submits them. Every order
+    carries a deterministic client order ID; at most one order per (ticker, side) is
+    in flight. Sends run on the worker so the market data loop keeps going, and
+    completed orders are handed back to the caller's thread by drain_completed().
+
+    A send that fails without a definite answer (timeout, 5xx, unreadable reply) is
+    never re-sent: the manager looks the cOID up among the gateway's live orders. When
+    the live orders cannot be read either, the order stays in doubt and blocks its
+    ticker and side until retry_in_doubt() has resolved it.
+    With workers=0 orders are submitted inline (replay and backtests).
+    """
+
+    def __init__(self, list_live_orders: ListLiveOrders, workers: int = DEFAULT_SUBMISSION_WORKERS):
+        self.list_live_orders = list_live_orders
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="orders") if workers > 0 else None
+        self._lock = Lock()
+        self._in_flight: Dict[OrderKey, ManagedOrder] = {}
+        self._in_doubt: Dict[OrderKey, ManagedOrder] = {}
+        self._attempts: Dict[OrderKey, int] = {}
+        self._completed: List[ManagedOrder] = []
+
+    def is_pending(self, ticker: str, side: str) -> bool:
+        with self._lock:
+            return (ticker, side) in self._in_flight or (ticker, side) in self._in_doubt
+
+    def in_flight_orders(self) -> List[ManagedOrder]:
+        with self._lock:
+            return list(self._in_flight.values())
+
+    def pending_orders(self) -> List[ManagedOrder]:
+        """In-flight and in-doubt orders: every submission that may still fill."""
+        with self._lock:
+            return list(self._in_flight.values()) + list(self._in_doubt.values())
+
+    def next_client_order_id(self, day: date, ticker: str, side: str) -> str:
+        with self._lock:
+            return build_client_order_id(day, ticker, side, self._attempts.get((ticker, side), 0) + 1)
+
+    def seed(self, ticker: str, side: str, client_order_id: str) -> None:
+        """Continue the attempt numbering of an earlier run, so no cOID is reused."""
+        with self._lock:
+            key = (ticker, side)
+            self._attempts[key] = max(self._attempts.get(key, 0), parse_client_order_attempt(client_order_id))
+
+    def submit(self, ticker: str, side: str, client_order_id: str, send: SendOrder,
+               context: Optional[Dict[str, Any]] = None) -> Optional[ManagedOrder]:
+        """Queue an order; None when an order for this ticker and side is already in flight or in doubt."""
+        key = (ticker, side)
+        with self._lock:
+            if key in self._in_flight or key in self._in_doubt:
+                return None
+            order = ManagedOrder(ticker, side, client_order_id, dict(context or {}))
+            self._in_flight[key] = order
+
+        self._run(self._send, order, send)
+        return order
+
+    def retry_in_doubt(self) -> int:
+        """Look in-doubt orders up again, at most every IN_DOUBT_RETRY_SECONDS each."""
+        now = get_clock().monotonic()
+        with self._lock:
+            due = [key for key, order in self._in_doubt.items() if now - (order.checked_at or 0.0) >= IN_DOUBT_RETRY_SECONDS]
+            orders = [self._in_doubt.pop(key) for key in due]
+            for order in orders:
+                self._in_flight[(order.ticker, order.side)] = order
+
+        for order in orders:
+            self._run(self._reconcile, order)
+        return len(orders)
+
+    def drain_completed(self) -> List[ManagedOrder]:
+        with self._lock:
+            completed, self._completed = self._completed, []
+        return completed
+
+    def reset(self) -> None:
+        with self._lock:
+            self._in_doubt.clear()
+            self._attempts.clear()
+            self._completed.clear()
+
+    def _run(self, job: Callable, *args) -> None:
+        if self._executor is None:
+            job(*args)
+        else:
+            self._executor.submit(job, *args)
+
+    def _send(self, order: ManagedOrder, send: SendOrder) -> None:
+        try:
+            result = send(order.client_order_id)
+        except Exception as e:
+            result = {"success": False, "error": f"Exception: {e}", UNCONFIRMED_KEY: True}
+
+        if not result.get("success") and result.get(UNCONFIRMED_KEY):
+            order.result = result
+            self._reconcile(order)
+            return
+        self._complete(order, result)
+
+    def _reconcile(self, order: ManagedOrder) -> None:
+        order.checked_at = get_clock().monotonic()
+        send_error = order.context.setdefault("send_error", (order.result or {}).get("error", "Order outcome unknown"))
+        for attempt in range(RECONCILE_ATTEMPTS):
+            if attempt > 0:
+                get_clock().sleep(RECONCILE_RETRY_SECONDS)
+            try:
+                live = self.list_live_orders()
+            except Exception as e:
+                live = {"success": False, "error": str(e)}
+            if not live.get("success"):
+                continue
+
+            order.reconciled = True
+            legs = find_orders_by_client_order_id(live.get("orders", []), order.client_order_id)
+            if legs:
+                self._complete(order, {"success": True, "orders": legs, CLIENT_ORDER_ID_KEY: order.client_order_id})
+            else:
+                self._complete(order, {"success": False, "error": f"{send_error} (cOID {order.client_order_id} not at the gateway)"})
+            return
+
+        self._complete(order, {"success": False, IN_DOUBT_KEY: True,
+                               "error": f"{send_error} (live orders unavailable, cOID {order.client_order_id} in doubt)"})
+
+    def _complete(self, order: ManagedOrder, result: Dict[str, Any]) -> None:
+        order.result = result
+        key = (order.ticker, order.side)
+        with self._lock:
+            self._in_flight.pop(key, None)
+            if result.get(IN_DOUBT_KEY):
+                self._in_doubt[key] = order
+            else:
+                self._attempts[key] = max(self._attempts.get(key, 0), parse_client_order_attempt(order.client_order_id))
+            self._completed.append(order)
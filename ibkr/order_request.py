@@ -1,9 +1,16 @@
-from typing import Optional, Dict, Any
-from requests import Response, get, post
+from functools import lru_cache
+from json import dumps
+from typing import Optional, Dict, Any, List
+from requests import Response
 
 from urllib3 import disable_warnings
 from urllib3.exceptions import InsecureRequestWarning
 
+from ibkr.circuit_breaker import CircuitOpenError
+from ibkr.http_client import delete, get, post
+from metrics.order_trace import HOP_ACK, HOP_CONFIRM_ROUND_PREFIX, HOP_ORDER_POST, HOP_ORDER_RESPONSE, record_hop
+from runtime.clock import get_clock
+
 disable_warnings(InsecureRequestWarning)
 
 BASE_URL = "https://localhost:5001/v1/api/"
@@ -13,11 +20,16 @@ ACCOUNT_ID_KEY = "acctId"
 ACCOUNTS_ENDPOINT = "iserver/accounts"
 ACCOUNT_SWITCH_ENDPOINT = "iserver/account"
 ACCOUNTS_KEY = "accounts"
+CLIENT_ORDER_ID_KEY = "cOID"
 CONID_KEY = "conid"
 ERROR_KEY = "error"
 ID_KEY = "id"
 ORDER_TYPE_KEY = "orderType"
 ORDERS_KEY = "orders"
+ORDER_REF_KEY = "order_ref"
+LIVE_ORDERS_ENDPOINT = "iserver/account/orders"
+EXECUTIONS_ENDPOINT = "iserver/account/trades"
+PARENT_ID_KEY = "parentId"
 PRICE_KEY = "price"
 QUANTITY_KEY = "quantity"
 REPLY_ENDPOINT_PREFIX = "iserver/reply"
@@ -32,11 +44,23 @@ ACTION_SELL = "SELL"
 MAX_CONFIRMATION_ROUNDS = 5
 MESSAGE_KEY = "message"
 ORDER_ID_KEY = "orderId"
+GATEWAY_ORDER_ID_KEY = "order_id"
 ORDER_STATUS_KEY = "order_status"
-ORDER_TYPE_LIMIT = "LIMIT"
+ORDER_TYPE_LIMIT = "LMT"
 ORDER_TYPE_MARKET = "MKT"
+ORDER_TYPE_STOP = "STP"
 STATUS_PRESUBMITTED = "PreSubmitted"
 STATUS_SUBMITTED = "Submitted"
+REJECTED_ORDER_STATUSES = ("Cancelled", "Inactive", "Rejected")
+STOP_LEG_SUFFIX = "-stop"
+TARGET_LEG_SUFFIX = "-target"
+UNCONFIRMED_KEY = "unconfirmed"
+JSON_HEADERS = {"Content-Type": "application/json"}
+QUANTITY_MARKER = -7001
+STOP_MARKER = -7002.5
+TARGET_MARKER = -7003.5
+CLIENT_ORDER_ID_MARKER = "__client_order_id__"
+HTTP_SERVER_ERROR = 500
 TIME_IN_FORCE_DAY = "DAY"
 
 
@@ -54,6 +78,9 @@ def create_success_response(**kwargs) -> Dict[str, Any]:
     return result
 
 
+default_account_id: Optional[str] = None
+
+
 def extract_account_from_dict(data: Dict) -> Optional[str]:
     if SELECTED_ACCOUNT_KEY in data:
         return data[SELECTED_ACCOUNT_KEY]
@@ -77,19 +104,34 @@ def extract_account_id(data: Any) -> Optional[str]:
     return None
 
 
-def get_account_id() -> Optional[str]:
+def extract_account_ids(data: Any) -> List[str]:
+    if isinstance(data, dict) and isinstance(data.get(ACCOUNTS_KEY), list):
+        return [str(account) for account in data[ACCOUNTS_KEY]]
+    if isinstance(data, list):
+        return [str(account) for account in data]
+    return []
+
+
+def fetch_accounts_data() -> Any:
     try:
         response = get(url=build_url(ACCOUNTS_ENDPOINT), verify=False)
 
         if response.status_code != HTTP_OK:
             return None
 
-        data = response.json()
-        return extract_account_id(data)
+        return response.json()
     except Exception:
         return None
 
 
+def get_account_id() -> Optional[str]:
+    return extract_account_id(fetch_accounts_data())
+
+
+def get_account_ids() -> List[str]:
+    return extract_account_ids(fetch_accounts_data())
+
+
 def is_successful_response(response: Response) -> bool:
     return response.status_code == HTTP_OK
 
@@ -118,7 +160,12 @@ def build_order_endpoint(account_id: str) -> str:
     return f"iserver/account/{account_id}/orders"
 
 
-def build_order_payload(conid: int, order_type: str, action: str, quantity: int, price: Optional[float], stop_loss_price: Optional[float] = None, take_profit_price: Optional[float] = None) -> Dict[str, Any]:
+@lru_cache(maxsize=64)
+def build_order_url(account_id: str) -> str:
+    return build_url(build_order_endpoint(account_id))
+
+
+def build_order(conid: int, order_type: str, action: str, quantity: int, price: Optional[float] = None) -> Dict[str, Any]:
     order_data = {
         CONID_KEY: conid,
         ORDER_TYPE_KEY: order_type,
@@ -127,27 +174,104 @@ def build_order_payload(conid: int, order_type: str, action: str, quantity: int,
         QUANTITY_KEY: quantity
     }
 
-    if order_type == ORDER_TYPE_LIMIT and price is not None:
+    if order_type in (ORDER_TYPE_LIMIT, ORDER_TYPE_STOP) and price is not None:
         order_data[PRICE_KEY] = float(price)
 
-    if stop_loss_price is not None:
-        order_data["auxPrice"] = float(stop_loss_price)
+    return order_data
+
 
-    if take_profit_price is not None:
-        order_data["profitPrice"] = float(take_profit_price)
+def build_order_payload(conid: int, order_type: str, action: str, quantity: int, price: Optional[float]) -> Dict[str, Any]:
+    return {ORDERS_KEY: [build_order(conid, order_type, action, quantity, price)]}
 
-    return {ORDERS_KEY: [order_data]}
+
+def build_client_order_id(conid: int) -> str:
+    return f"{conid}-{get_clock().now_utc().strftime('%Y%m%d%H%M%S%f')}"
+
+
+def build_bracket_orders(conid: int, quantity: int, stop_loss_price: Optional[float], take_profit_price: Optional[float],
+                         parent_order_id: str) -> List[Dict[str, Any]]:
+    """
+    Market entry plus its protective children, for a single POST. The children name
+    the entry's cOID as parentId, so the gateway transmits the whole bracket together,
+    only works the children once the entry fills, and treats them as one OCA group:
+    when the stop or the target fills, the other is cancelled.
+    """
+    parent = build_order(conid, ORDER_TYPE_MARKET, ACTION_BUY, quantity)
+    parent[CLIENT_ORDER_ID_KEY] = parent_order_id
+    orders = [parent]
+
+    for suffix, order_type, price in ((STOP_LEG_SUFFIX, ORDER_TYPE_STOP, stop_loss_price),
+                                      (TARGET_LEG_SUFFIX, ORDER_TYPE_LIMIT, take_profit_price)):
+        if price is None:
+            continue
+        child = build_order(conid, order_type, ACTION_SELL, quantity, price)
+        child[CLIENT_ORDER_ID_KEY] = f"{parent_order_id}{suffix}"
+        child[PARENT_ID_KEY] = parent_order_id
+        orders.append(child)
+
+    return orders
+
+
+class BracketOrderTemplate:
+    """
+    Serialized bracket POST body for one conid with %-placeholders for the values only
+    known at signal time (quantity, stop, target, cOID). Firing an order renders it with
+    a single string format: no order dicts are built and nothing is JSON-encoded.
+    """
+
+    def __init__(self, conid: int, with_target: bool = True):
+        self.conid = conid
+        orders = build_bracket_orders(conid, QUANTITY_MARKER, STOP_MARKER, TARGET_MARKER if with_target else None,
+                                      CLIENT_ORDER_ID_MARKER)
+        self.order_count = len(orders)
+        self.skeleton = (dumps({ORDERS_KEY: orders}, separators=(",", ":"))
+                         .replace("%", "%%")
+                         .replace(str(QUANTITY_MARKER), "%(quantity)d")
+                         .replace(str(STOP_MARKER), "%(stop_loss_price).2f")
+                         .replace(str(TARGET_MARKER), "%(take_profit_price).2f")
+                         .replace(CLIENT_ORDER_ID_MARKER, "%(client_order_id)s"))
+
+    def render(self, quantity: int, stop_loss_price: float, take_profit_price: Optional[float], client_order_id: str) -> str:
+        return self.skeleton % {
+            "quantity": quantity,
+            "stop_loss_price": stop_loss_price,
+            "take_profit_price": take_profit_price or 0.0,
+            "client_order_id": client_order_id
+        }
+
+
+@lru_cache(maxsize=8192)
+def get_bracket_template(conid: int, with_target: bool = True) -> BracketOrderTemplate:
+    return BracketOrderTemplate(conid, with_target)
+
+
+def prepare_order_templates(conids: List[int]) -> int:
+    """Build the watchlist's bracket templates and resolve the order URL ahead of the first signal."""
+    account = ensure_account_id(None)
+    if account:
+        build_order_url(account)
+    for conid in conids:
+        get_bracket_template(conid)
+    return len(conids)
 
 
 def ensure_account_id(account_id: Optional[str]) -> Optional[str]:
-    return account_id if account_id else get_account_id()
+    """Explicit account, else the gateway's selected account, looked up once per process."""
+    global default_account_id
+
+    if account_id:
+        return account_id
+    if default_account_id is None:
+        default_account_id = get_account_id()
+    return default_account_id
 
 
 def handle_http_error(status_code: int, response_text: str) -> Dict[str, Any]:
     return {
         SUCCESS_KEY: False,
         ERROR_KEY: f"HTTP {status_code}: {response_text}",
-        RESPONSE_KEY: response_text
+        RESPONSE_KEY: response_text,
+        UNCONFIRMED_KEY: status_code >= HTTP_SERVER_ERROR
     }
 
 
@@ -156,39 +280,37 @@ def handle_json_parse_error(error: Exception, response_text: str, status_code: i
         SUCCESS_KEY: False,
         ERROR_KEY: f"Failed to parse response as JSON: {str(error)}",
         RESPONSE_KEY: response_text,
-        "status_code": status_code
+        "status_code": status_code,
+        UNCONFIRMED_KEY: True
     }
 
 
-def has_order_id(response_data: Any) -> bool:
-    return (isinstance(response_data, list) and
-            len(response_data) > 0 and
-            ID_KEY in response_data[0])
-
-
-def is_confirmation_required(response_data: Any) -> bool:
-    if not isinstance(response_data, list) or len(response_data) == 0:
+def is_acknowledged_order(item: Any) -> bool:
+    if not isinstance(item, dict) or item.get(ORDER_STATUS_KEY) in REJECTED_ORDER_STATUSES:
         return False
-
-    first_item = response_data[0]
-    return ID_KEY in first_item and MESSAGE_KEY in first_item
+    if ORDER_ID_KEY in item or GATEWAY_ORDER_ID_KEY in item:
+        return True
+    return item.get(ORDER_STATUS_KEY) in [STATUS_PRESUBMITTED, STATUS_SUBMITTED]
 
 
-def is_order_placed(response_data: Any) -> bool:
-    if not isinstance(response_data, list) or len(response_data) == 0:
-        return False
+def extract_acknowledged_orders(response_data: Any) -> List[Dict[str, Any]]:
+    if not isinstance(response_data, list):
+        return []
+    return [item for item in response_data if is_acknowledged_order(item)]
 
-    first_item = response_data[0]
 
-    if ORDER_ID_KEY in first_item:
-        return True
+def find_confirmation_request(response_data: Any) -> Optional[Dict[str, Any]]:
+    if not isinstance(response_data, list):
+        return None
+    for item in response_data:
+        if isinstance(item, dict) and ID_KEY in item and MESSAGE_KEY in item:
+            return item
+    return None
 
-    if ORDER_STATUS_KEY in first_item:
-        status = first_item[ORDER_STATUS_KEY]
-        if status in [STATUS_PRESUBMITTED, STATUS_SUBMITTED]:
-            return True
 
-    return False
+def get_gateway_order_id(order: Dict[str, Any]) -> Optional[str]:
+    order_id = order.get(GATEWAY_ORDER_ID_KEY, order.get(ORDER_ID_KEY))
+    return str(order_id) if order_id is not None else None
 
 
 def is_insufficient_funds_error(response_data: Any) -> bool:
@@ -223,47 +345,85 @@ def send_confirmation(reply_id: str) -> Any:
         return []
 
 
-def confirm_order(initial_response: Any) -> tuple[bool, Optional[str]]:
+def confirm_order(initial_response: Any, expected_orders: int = 1) -> tuple[bool, Optional[str], List[Dict[str, Any]]]:
     """
-    Handle all confirmation rounds for an order.
-    Returns (True, None) if order was successfully placed.
-    Returns (False, error_message) if confirmation failed with error message.
+    Handle all confirmation rounds for an order or a bracket. Legs can be acknowledged
+    in different rounds; the submission only succeeds once every leg is.
+    Returns (True, None, legs) if all expected_orders were placed.
+    Returns (False, error_message, legs) otherwise, with the legs that were acknowledged.
     """
     order_json = initial_response
+    acknowledged = []
     confirmation_round = 0
 
-    if is_insufficient_funds_error(order_json):
-        return False, extract_funds_error_message(order_json)
+    while True:
+        if is_insufficient_funds_error(order_json):
+            return False, extract_funds_error_message(order_json), acknowledged
 
-    while confirmation_round < MAX_CONFIRMATION_ROUNDS:
-        if is_order_placed(order_json):
-            return True, None
+        acknowledged.extend(extract_acknowledged_orders(order_json))
+        confirmation = find_confirmation_request(order_json)
+        if confirmation is None or confirmation_round >= MAX_CONFIRMATION_ROUNDS:
+            break
 
-        if is_confirmation_required(order_json):
-            reply_id = order_json[0][ID_KEY]
-            order_json = send_confirmation(reply_id)
-            confirmation_round += 1
+        order_json = send_confirmation(confirmation[ID_KEY])
+        confirmation_round += 1
+        record_hop(f"{HOP_CONFIRM_ROUND_PREFIX}{confirmation_round}")
 
-            if not order_json or len(order_json) == 0:
-                return False, f"Empty response after confirmation round {confirmation_round}"
+        if not order_json or len(order_json) == 0:
+            return False, f"Empty response after confirmation round {confirmation_round}", acknowledged
 
-            if is_insufficient_funds_error(order_json):
-                return False, extract_funds_error_message(order_json)
-        else:
-            break
+    if len(acknowledged) >= expected_orders:
+        return True, None, acknowledged
+    if acknowledged:
+        return False, f"Only {len(acknowledged)} of {expected_orders} order leg(s) acknowledged", acknowledged
+    return False, "Order not placed after all confirmation rounds", acknowledged
 
-    if is_order_placed(order_json):
-        return True, None
 
-    return False, "Order not placed after all confirmation rounds"
+def cancel_order(account_id: str, order_id: str) -> bool:
+    try:
+        response = delete(url=build_url(f"iserver/account/{account_id}/order/{order_id}"), verify=False)
+        return is_successful_response(response)
+    except Exception:
+        return False
 
 
-def order_request(account_id: str, action: str, conid: int, quantity: int, order_type: str, price: Optional[float], stop_loss_price: Optional[float] = None, take_profit_price: Optional[float] = None) -> Dict[str, Any]:
+def cancel_orders(order_ids: List[str], account_id: Optional[str] = None) -> Dict[str, Any]:
+    account = ensure_account_id(account_id)
+
+    if not account:
+        return create_error_response("Unable to fetch account ID")
+
+    failed = [order_id for order_id in order_ids if not cancel_order(account, order_id)]
+    if failed:
+        return create_error_response(f"Failed to cancel order(s) {', '.join(failed)}")
+    return create_success_response(cancelled=len(order_ids))
+
+
+def extract_child_order_ids(legs: List[Dict[str, Any]]) -> List[str]:
+    """Gateway ids of a bracket's children; legs are acknowledged in submission order, parent first."""
+    return [order_id for order_id in map(get_gateway_order_id, legs[1:]) if order_id is not None]
+
+
+def cancel_acknowledged_legs(account_id: str, legs: List[Dict[str, Any]]) -> None:
+    """An incomplete bracket is not protected; withdraw whatever part of it the gateway took."""
+    for leg in legs:
+        order_id = get_gateway_order_id(leg)
+        if order_id is not None:
+            cancel_order(account_id, order_id)
+
+
+def submit_orders(account_id: str, orders: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return submit_order_body(account_id, dumps({ORDERS_KEY: orders}), len(orders))
+
+
+def submit_order_body(account_id: str, body: str, order_count: int) -> Dict[str, Any]:
+    """POST every leg in one request and confirm them together."""
     try:
-        url = build_url(build_order_endpoint(account_id))
-        payload = build_order_payload(conid, order_type, action, quantity, price, stop_loss_price, take_profit_price)
+        url = build_order_url(account_id)
 
-        response = post(url=url, json=payload, verify=False)
+        record_hop(HOP_ORDER_POST)
+        response = post(url=url, data=body, headers=JSON_HEADERS, verify=False)
+        record_hop(HOP_ORDER_RESPONSE)
 
         if not is_successful_response(response):
             return handle_http_error(response.status_code, response.text)
@@ -273,50 +433,121 @@ def order_request(account_id: str, action: str, conid: int, quantity: int, order
         except Exception as json_error:
             return handle_json_parse_error(json_error, response.text, response.status_code)
 
-        success, error_message = confirm_order(order_json)
+        success, error_message, legs = confirm_order(order_json, order_count)
 
         if success:
-            return create_success_response(initial_response=order_json)
+            record_hop(HOP_ACK)
+            return create_success_response(initial_response=order_json, orders=legs)
 
+        if legs:
+            cancel_acknowledged_legs(account_id, legs)
         return create_error_response(error_message if error_message else "Order confirmation failed")
 
+    except CircuitOpenError as e:
+        return create_error_response(str(e))
+    except Exception as e:
+        return dict(create_error_response(f"Exception: {str(e)}"), **{UNCONFIRMED_KEY: True})
+
+
+def get_live_orders() -> Dict[str, Any]:
+    try:
+        response = get(url=build_url(LIVE_ORDERS_ENDPOINT), verify=False)
+
+        if not is_successful_response(response):
+            return create_error_response(f"Status {response.status_code}: {response.text}")
+
+        data = parse_json_safely(response)
+        orders = data.get(ORDERS_KEY) if isinstance(data, dict) else None
+        return create_success_response(orders=orders or [])
+    except Exception as e:
+        return create_error_response(str(e))
+
+
+def get_executions(days: int = 1) -> Dict[str, Any]:
+    """The account's executions of the last `days` days (at most 7) for every conid, in one request."""
+    try:
+        response = get(url=build_url(EXECUTIONS_ENDPOINT), params={"days": days}, verify=False)
+
+        if not is_successful_response(response):
+            return create_error_response(f"Status {response.status_code}: {response.text}")
+
+        data = parse_json_safely(response)
+        return create_success_response(executions=data if isinstance(data, list) else [])
     except Exception as e:
-        return create_error_response(f"Exception: {str(e)}")
+        return create_error_response(str(e))
+
+
+def find_orders_by_client_order_id(live_orders: List[Dict[str, Any]], client_order_id: str) -> List[Dict[str, Any]]:
+    """
+    The legs a cOID placed, parent first, shaped like submission acknowledgements.
+    Empty unless the parent is live or filled.
+    """
+    def to_leg(order: Dict[str, Any]) -> Dict[str, Any]:
+        return {GATEWAY_ORDER_ID_KEY: str(order.get(ORDER_ID_KEY)), ORDER_STATUS_KEY: order.get("status"),
+                "local_order_id": order.get(ORDER_REF_KEY)}
+
+    parents = [order for order in live_orders if order.get(ORDER_REF_KEY) == client_order_id]
+    if not parents or parents[0].get("status") in REJECTED_ORDER_STATUSES:
+        return []
+
+    children = [order for order in live_orders
+                if str(order.get(ORDER_REF_KEY, "")).startswith(f"{client_order_id}-")]
+    return [to_leg(order) for order in parents[:1] + children]
 
 
-def prepare_order(conid: int, quantity: int, account_id: Optional[str], action: str, order_type: str, price: Optional[float], stop_loss_price: Optional[float] = None, take_profit_price: Optional[float] = None) -> Dict[str, Any]:
+def order_request(account_id: str, action: str, conid: int, quantity: int, order_type: str, price: Optional[float],
+                  client_order_id: Optional[str] = None) -> Dict[str, Any]:
+    orders = build_order_payload(conid, order_type, action, quantity, price)[ORDERS_KEY]
+    if client_order_id:
+        orders[0][CLIENT_ORDER_ID_KEY] = client_order_id
+    return submit_orders(account_id, orders)
+
+
+def prepare_order(conid: int, quantity: int, account_id: Optional[str], action: str, order_type: str, price: Optional[float],
+                  client_order_id: Optional[str] = None) -> Dict[str, Any]:
     account = ensure_account_id(account_id)
 
     if not account:
         return create_error_response("Unable to fetch account ID")
 
-    switch_result = switch_account(account)
+    # The account is part of the order URL, so no iserver/account switch is needed per order
+    return order_request(account, action, conid, quantity, order_type, price, client_order_id)
 
-    if not switch_result.get(SUCCESS_KEY):
-        error_msg = switch_result.get(ERROR_KEY, "Account switch failed")
-        return create_error_response(f"Failed to switch to account {account}: {error_msg}")
 
-    return order_request(account, action, conid, quantity, order_type, price, stop_loss_price, take_profit_price)
+def prepare_bracket_order(conid: int, quantity: int, account_id: Optional[str], stop_loss_price: Optional[float],
+                          take_profit_price: Optional[float], client_order_id: Optional[str] = None) -> Dict[str, Any]:
+    account = ensure_account_id(account_id)
+
+    if not account:
+        return create_error_response("Unable to fetch account ID")
+
+    parent_order_id = client_order_id or build_client_order_id(conid)
+    template = get_bracket_template(conid, take_profit_price is not None)
+    result = submit_order_body(account, template.render(quantity, stop_loss_price, take_profit_price, parent_order_id),
+                               template.order_count)
+    result[CLIENT_ORDER_ID_KEY] = parent_order_id
+    return result
 
 
 def place_buy_order(conid: int, quantity: int, price: float, account_id: Optional[str] = None) -> Dict[str, Any]:
     return prepare_order(conid, quantity, account_id, ACTION_BUY, ORDER_TYPE_LIMIT, price)
 
 
-def place_market_buy_order(conid: int, quantity: int, account_id: Optional[str] = None) -> Dict[str, Any]:
-    return prepare_order(conid, quantity, account_id, ACTION_BUY, ORDER_TYPE_MARKET, None)
+def place_market_buy_order(conid: int, quantity: int, account_id: Optional[str] = None, client_order_id: Optional[str] = None) -> Dict[str, Any]:
+    return prepare_order(conid, quantity, account_id, ACTION_BUY, ORDER_TYPE_MARKET, None, client_order_id)
 
 
 def place_market_buy_order_with_stop_loss(conid: int, quantity: int, stop_loss_price: float, account_id: Optional[str] = None) -> Dict[str, Any]:
-    return prepare_order(conid, quantity, account_id, ACTION_BUY, ORDER_TYPE_MARKET, None, stop_loss_price)
+    return prepare_bracket_order(conid, quantity, account_id, stop_loss_price, None)
 
 
-def place_market_buy_order_with_stop_and_profit(conid: int, quantity: int, stop_loss_price: float, take_profit_price: float, account_id: Optional[str] = None) -> Dict[str, Any]:
-    return prepare_order(conid, quantity, account_id, ACTION_BUY, ORDER_TYPE_MARKET, None, stop_loss_price, take_profit_price)
+def place_market_buy_order_with_stop_and_profit(conid: int, quantity: int, stop_loss_price: float, take_profit_price: float, account_id: Optional[str] = None,
+                                                client_order_id: Optional[str] = None) -> Dict[str, Any]:
+    return prepare_bracket_order(conid, quantity, account_id, stop_loss_price, take_profit_price, client_order_id)
 
 
-def place_market_sell_order(conid: int, quantity: int, account_id: Optional[str] = None) -> Dict[str, Any]:
-    return prepare_order(conid, quantity, account_id, ACTION_SELL, ORDER_TYPE_MARKET, None)
+def place_market_sell_order(conid: int, quantity: int, account_id: Optional[str] = None, client_order_id: Optional[str] = None) -> Dict[str, Any]:
+    return prepare_order(conid, quantity, account_id, ACTION_SELL, ORDER_TYPE_MARKET, None, client_order_id)
 
 
 def place_sell_order(conid: int, quantity: int, price: float, account_id: Optional[str] = None) -> Dict[str, Any]:
@@ -1,14 +1,19 @@
-from typing import Dict, Any
-from requests import Response, get
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+from requests import Response
 
 from urllib3 import disable_warnings
 from urllib3.exceptions import InsecureRequestWarning
 
+from ibkr.http_client import get
+from ibkr.order_request import ensure_account_id
+
 disable_warnings(InsecureRequestWarning)
 
 BASE_URL = "https://localhost:5001/v1/api/"
 HTTP_OK = 200
 PAGE_ID_ALL = 0
+POSITIONS_FETCH_WORKERS = 4
 
 ACCOUNT_ID_KEY = "acctId"
 ACCOUNTS_ENDPOINT = "portfolio/accounts"
@@ -57,12 +62,12 @@ def build_url(endpoint: str) -> str:
     return BASE_URL + endpoint
 
 
-def extract_account_id(accounts_data: Any) -> str:
+def extract_account_ids(accounts_data: Any) -> List[str]:
     if isinstance(accounts_data, list):
-        return str(accounts_data[0].get('id'))
+        return [str(account.get('id')) for account in accounts_data if account.get('id')]
     elif isinstance(accounts_data, dict):
-        return str(accounts_data.get(ACCOUNT_ID_KEY, accounts_data.get('accountId', '')))
-    return str(accounts_data)
+        return [str(accounts_data.get(ACCOUNT_ID_KEY, accounts_data.get('accountId', '')))]
+    return [str(accounts_data)]
 
 
 def fetch_accounts() -> Response:
@@ -104,8 +109,20 @@ def get_account_positions(account_id: str) -> Dict[str, Any]:
         return build_error_response(str(e))
 
 
-def get_all_positions() -> Dict[str, Any]:
+def get_all_positions(account_ids: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Positions of the given trading accounts. Without accounts (single-account mode)
+    only the account orders go to is read: the gateway's selected account, else the
+    first portfolio account, so holdings of other sub-accounts are never tracked.
+    """
+    if account_ids:
+        return get_positions_for_accounts(account_ids)
+
     try:
+        selected_account_id = ensure_account_id(None)
+        if selected_account_id:
+            return get_positions_for_accounts([selected_account_id])
+
         accounts_response = fetch_accounts()
 
         if not is_successful_response(accounts_response):
@@ -117,13 +134,31 @@ def get_all_positions() -> Dict[str, Any]:
         if not has_accounts(accounts):
             return build_success_response([], message="No accounts found")
 
-        account_id = extract_account_id(accounts)
-        return get_account_positions(account_id)
+        return get_positions_for_accounts(extract_account_ids(accounts)[:1])
 
     except Exception as e:
         return build_error_response(str(e))
 
 
+def get_positions_for_accounts(account_ids: List[str]) -> Dict[str, Any]:
+    """
+    Fetch every account's positions concurrently and merge them; each position keeps
+    its acctId. Fails as a whole if any account fails, so a missing account is never
+    mistaken for a flat one.
+    """
+    with ThreadPoolExecutor(max_workers=POSITIONS_FETCH_WORKERS, thread_name_prefix="positions") as executor:
+        results = list(executor.map(get_account_positions, account_ids))
+
+    positions = []
+    for account_id, result in zip(account_ids, results):
+        if not result.get(SUCCESS_KEY):
+            return build_error_response(f"Account {account_id}: {result.get(ERROR_KEY)}")
+        positions.extend(dict(position, **{ACCOUNT_ID_KEY: position.get(ACCOUNT_ID_KEY) or account_id})
+                         for position in result.get(POSITIONS_KEY, []))
+
+    return build_success_response(positions, accounts=account_ids)
+
+
 def handle_failed_response(response: Response) -> Dict[str, Any]:
     error_msg = f"HTTP {response.status_code}: {response.text}"
     return build_error_response(error_msg)
@@ -0,0 +1,196 @@
+from atexit import register
+from json import dumps
+from logging import (INFO, WARNING, FileHandler, Filter, Formatter, Handler, Logger, LogRecord, StreamHandler,
+                     getLogger, makeLogRecord)
+from logging.handlers import QueueHandler, QueueListener
+from os import makedirs, path
+from queue import Full, Queue
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable, Dict, Optional, Tuple
+
+DEFAULT_QUEUE_SIZE = 10000
+DEFAULT_SAMPLE_INTERVAL_SECONDS = 5.0
+MAX_SAMPLE_KEYS = 50000
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+LOGGER_NAME = 'trading'
+RESERVED_RECORD_ATTRIBUTES = set(makeLogRecord({}).__dict__) | {'message', 'asctime'}
+
+
+class LazyFormat:
+    """Defers an expensive message builder until the listener thread formats the record."""
+
+    def __init__(self, builder: Callable[..., str], *args: Any):
+        self.builder = builder
+        self.args = args
+
+    def __str__(self) -> str:
+        return self.builder(*self.args)
+
+
+def build_sample_key(record: LogRecord) -> Tuple[str, str]:
+    first_arg = record.args[0] if isinstance(record.args, tuple) and record.args else ''
+    if isinstance(first_arg, LazyFormat):
+        first_arg = first_arg.args[0] if first_arg.args else ''
+    if not isinstance(first_arg, (str, int, float)):
+        first_arg = ''
+    return str(record.msg), str(first_arg)
+
+
+class RateLimitFilter(Filter):
+    """
+    Lets through at most one INFO-or-lower record per (template, first argument) per
+    interval, e.g. one NEUTRAL line per ticker. Warnings and errors always pass.
+    The next record emitted for a key reports how many were suppressed.
+    """
+
+    def __init__(self, interval_seconds: float):
+        super().__init__()
+        self.interval_seconds = interval_seconds
+        self._last_emitted: Dict[Tuple[str, str], float] = {}
+        self._suppressed: Dict[Tuple[str, str], int] = {}
+
+    def filter(self, record: LogRecord) -> bool:
+        if record.levelno > INFO or self.interval_seconds <= 0:
+            return True
+
+        key = build_sample_key(record)
+        now = monotonic()
+        last_emitted = self._last_emitted.get(key)
+
+        if last_emitted is not None and now - last_emitted < self.interval_seconds:
+            self._suppressed[key] = self._suppressed.get(key, 0) + 1
+            return False
+
+        if len(self._last_emitted) >= MAX_SAMPLE_KEYS:
+            self._prune(now)
+
+        self._last_emitted[key] = now
+        suppressed = self._suppressed.pop(key, 0)
+        if suppressed:
+            record.msg = f"{record.msg} [{suppressed} similar suppressed]"
+        return True
+
+    def _prune(self, now: float) -> None:
+        expired = [key for key, emitted in self._last_emitted.items() if now - emitted >= self.interval_seconds]
+        for key in expired:
+            self._last_emitted.pop(key, None)
+            self._suppressed.pop(key, None)
+
+        if len(self._last_emitted) >= MAX_SAMPLE_KEYS:
+            self._last_emitted.clear()
+            self._suppressed.clear()
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    Non-blocking producer side: records are queued unformatted (formatting happens in
+    the listener thread) and dropped, with a count, when the queue is full.
+    Message args must not be mutated after the logging call.
+    """
+
+    def __init__(self, queue: Queue):
+        super().__init__(queue)
+        self.dropped = 0
+        self._dropped_lock = Lock()
+
+    def prepare(self, record: LogRecord) -> LogRecord:
+        if record.exc_info and not record.exc_text:
+            record.exc_text = Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record: LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except Full:
+            with self._dropped_lock:
+                self.dropped += 1
+            return
+
+        if self.dropped:
+            self._report_dropped(record)
+
+    def _report_dropped(self, record: LogRecord) -> None:
+        with self._dropped_lock:
+            dropped, self.dropped = self.dropped, 0
+
+        notice = makeLogRecord({
+            'name': record.name,
+            'levelno': WARNING,
+            'levelname': 'WARNING',
+            'msg': f"Log queue full - dropped {dropped} record(s)",
+            'created': record.created
+        })
+        try:
+            self.queue.put_nowait(notice)
+        except Full:
+            with self._dropped_lock:
+                self.dropped += dropped
+
+
+class JsonLinesFormatter(Formatter):
+    def format(self, record: LogRecord) -> str:
+        entry = {
+            'timestamp': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        for key, value in record.__dict__.items():
+            if key not in RESERVED_RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return dumps(entry, default=str)
+
+
+def create_output_handlers(log_file: str, json_log_file: Optional[str]) -> list:
+    handlers: list[Handler] = []
+
+    for file_path in filter(None, (log_file, json_log_file)):
+        directory = path.dirname(file_path)
+        if directory:
+            makedirs(directory, exist_ok=True)
+
+    file_handler = FileHandler(log_file)
+    file_handler.setFormatter(Formatter(LOG_FORMAT))
+    handlers.append(file_handler)
+
+    console_handler = StreamHandler()
+    console_handler.setFormatter(Formatter(LOG_FORMAT))
+    handlers.append(console_handler)
+
+    if json_log_file:
+        json_handler = FileHandler(json_log_file)
+        json_handler.setFormatter(JsonLinesFormatter())
+        handlers.append(json_handler)
+
+    return handlers
+
+
+def setup_logging(log_file: str, log_level: int = INFO, json_log_file: Optional[str] = None,
+                  sample_interval_seconds: float = DEFAULT_SAMPLE_INTERVAL_SECONDS,
+                  queue_size: int = DEFAULT_QUEUE_SIZE) -> Logger:
+    """
+    Configure the application logger with an asynchronous writer.
+    The calling thread only filters and enqueues; a QueueListener thread formats and
+    writes to the log file, the console and the optional JSONL sink.
+    """
+    logger = getLogger(LOGGER_NAME)
+    logger.setLevel(log_level)
+    logger.propagate = False
+
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+
+    log_queue: Queue = Queue(maxsize=queue_size)
+    queue_handler = BoundedQueueHandler(log_queue)
+    queue_handler.addFilter(RateLimitFilter(sample_interval_seconds))
+    logger.addHandler(queue_handler)
+
+    listener = QueueListener(log_queue, *create_output_handlers(log_file, json_log_file), respect_handler_level=True)
+    listener.start()
+    register(listener.stop)
+
+    return logger
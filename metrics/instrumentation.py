@@ -0,0 +1,192 @@
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from os import makedirs, path, replace
+from threading import Lock, Thread
+from time import perf_counter
+from typing import Dict, Iterator, List, Tuple
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METRIC_PREFIX = "trading"
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4"
+REQUEST_METRIC = "ibkr_request_seconds"
+STAGE_METRIC = "stage_seconds"
+
+MetricKey = Tuple[str, str, str]
+
+
+class Histogram:
+    """Cumulative Prometheus-style histogram plus a resettable per-cycle window."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+        self.cycle_count = 0
+        self.cycle_total = 0.0
+        self.cycle_max = 0.0
+        self._lock = Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.total += value
+            self.cycle_count += 1
+            self.cycle_total += value
+            if value > self.cycle_max:
+                self.cycle_max = value
+            for index, upper_bound in enumerate(self.buckets):
+                if value <= upper_bound:
+                    self.bucket_counts[index] += 1
+                    break
+
+    def reset_cycle(self) -> None:
+        with self._lock:
+            self.cycle_count = 0
+            self.cycle_total = 0.0
+            self.cycle_max = 0.0
+
+    def cumulative_buckets(self) -> List[Tuple[float, int]]:
+        running = 0
+        result = []
+        for upper_bound, bucket_count in zip(self.buckets, self.bucket_counts):
+            running += bucket_count
+            result.append((upper_bound, running))
+        return result
+
+
+_histograms: Dict[MetricKey, Histogram] = {}
+_counters: Dict[MetricKey, float] = {}
+_gauges: Dict[MetricKey, float] = {}
+_registry_lock = Lock()
+
+
+def get_histogram(metric: str, label_name: str, label_value: str) -> Histogram:
+    key = (metric, label_name, label_value)
+    histogram = _histograms.get(key)
+    if histogram is None:
+        with _registry_lock:
+            histogram = _histograms.setdefault(key, Histogram())
+    return histogram
+
+
+def observe(metric: str, label_name: str, label_value: str, seconds: float) -> None:
+    get_histogram(metric, label_name, label_value).observe(seconds)
+
+
+def increment(metric: str, label_name: str = "", label_value: str = "", amount: float = 1) -> None:
+    key = (metric, label_name, label_value)
+    with _registry_lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+def set_gauge(metric: str, value: float, label_name: str = "", label_value: str = "") -> None:
+    _gauges[(metric, label_name, label_value)] = value
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        observe(STAGE_METRIC, "stage", stage, perf_counter() - start)
+
+
+@contextmanager
+def timed_request(endpoint: str) -> Iterator[None]:
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        observe(REQUEST_METRIC, "endpoint", endpoint, perf_counter() - start)
+
+
+def format_cycle_summary() -> str:
+    """
+    Summarize stage timings observed since the previous call and start a new window.
+    Stages are ordered by total time spent, largest first.
+    """
+    entries = []
+    for (metric, _, label_value), histogram in list(_histograms.items()):
+        if histogram.cycle_count == 0:
+            continue
+        entries.append((histogram.cycle_total, metric, label_value, histogram))
+
+    parts = []
+    for cycle_total, metric, label_value, histogram in sorted(entries, reverse=True):
+        mean_ms = cycle_total / histogram.cycle_count * 1000
+        parts.append(f"{label_value}: n={histogram.cycle_count} total={cycle_total * 1000:.1f}ms "
+                     f"mean={mean_ms:.1f}ms max={histogram.cycle_max * 1000:.1f}ms")
+        histogram.reset_cycle()
+
+    return "LATENCY SUMMARY - " + (" | ".join(parts) if parts else "no samples")
+
+
+def format_bucket_label(upper_bound: str) -> str:
+    return f'le="{upper_bound}"'
+
+
+def format_labels(label_name: str, label_value: str, extra: str = "") -> str:
+    labels = [f'{label_name}="{label_value}"'] if label_name else []
+    if extra:
+        labels.append(extra)
+    return "{" + ",".join(labels) + "}" if labels else ""
+
+
+def render_prometheus() -> str:
+    lines = []
+    seen_types = set()
+
+    for (metric, label_name, label_value), histogram in sorted(_histograms.items()):
+        name = f"{METRIC_PREFIX}_{metric}"
+        if name not in seen_types:
+            lines.append(f"# TYPE {name} histogram")
+            seen_types.add(name)
+        for upper_bound, cumulative in histogram.cumulative_buckets():
+            bucket_labels = format_labels(label_name, label_value, format_bucket_label(str(upper_bound)))
+            lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+        inf_labels = format_labels(label_name, label_value, format_bucket_label("+Inf"))
+        lines.append(f"{name}_bucket{inf_labels} {histogram.count}")
+        lines.append(f"{name}_sum{format_labels(label_name, label_value)} {histogram.total:.6f}")
+        lines.append(f"{name}_count{format_labels(label_name, label_value)} {histogram.count}")
+
+    for metric_type, values in (("counter", _counters), ("gauge", _gauges)):
+        for (metric, label_name, label_value), value in sorted(values.items()):
+            name = f"{METRIC_PREFIX}_{metric}"
+            if name not in seen_types:
+                lines.append(f"# TYPE {name} {metric_type}")
+                seen_types.add(name)
+            lines.append(f"{name}{format_labels(label_name, label_value)} {value}")
+
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus_file(file_path: str) -> None:
+    directory = path.dirname(file_path)
+    if directory:
+        makedirs(directory, exist_ok=True)
+
+    temp_path = f"{file_path}.tmp"
+    with open(temp_path, 'w') as f:
+        f.write(render_prometheus())
+    replace(temp_path, file_path)
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = render_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), MetricsRequestHandler)
+    Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
@@ -0,0 +1,120 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from math import ceil
+from typing import Any, Dict, Iterator, List, Optional
+
+from runtime.clock import get_clock
+
+HOP_ACK = "ack"
+HOP_CONFIRM_ROUND_PREFIX = "confirm_round_"
+HOP_ORDER_POST = "order_post"
+HOP_ORDER_RESPONSE = "order_response"
+HOP_RECEIVED = "snapshot_received"
+HOP_SIGNAL = "signal"
+PERCENTILES = (50, 90, 99)
+TICK_AGE_KEY = "tick_to_signal_ms"
+
+
+class OrderTrace:
+    """
+    Monotonic hop timestamps for a single order, from the gateway tick to the final ack.
+    The gateway's _updated is wall-clock, so it is kept as an epoch and related to the
+    monotonic hops through the wall/monotonic pair captured when the trace starts.
+    """
+
+    def __init__(self, ticker: str, side: str, tick_epoch: Optional[float] = None, received_at: Optional[float] = None):
+        self.ticker = ticker
+        self.side = side
+        self.tick_epoch = tick_epoch
+        clock = get_clock()
+        self.start_epoch = clock.now_utc().timestamp()
+        self.start_monotonic = clock.monotonic()
+        self.hops: List[tuple[str, float]] = []
+
+        if received_at is not None:
+            self.hops.append((HOP_RECEIVED, received_at))
+        self.hops.append((HOP_SIGNAL, self.start_monotonic))
+
+    def record(self, hop_name: str) -> None:
+        self.hops.append((hop_name, get_clock().monotonic()))
+
+    def tick_to_signal_ms(self) -> Optional[float]:
+        if self.tick_epoch is None:
+            return None
+        return round((self.start_epoch - self.tick_epoch) * 1000, 3)
+
+    def to_dict(self) -> Dict[str, Any]:
+        first_hop_time = self.hops[0][1]
+        return {
+            "ticker": self.ticker,
+            "side": self.side,
+            "tick_epoch": self.tick_epoch,
+            "signal_epoch": self.start_epoch,
+            TICK_AGE_KEY: self.tick_to_signal_ms(),
+            "hops": [
+                {"name": hop_name, "offset_ms": round((hop_time - first_hop_time) * 1000, 3)}
+                for hop_name, hop_time in self.hops
+            ],
+            "total_ms": round((self.hops[-1][1] - first_hop_time) * 1000, 3)
+        }
+
+
+active_trace: ContextVar[Optional[OrderTrace]] = ContextVar("active_order_trace", default=None)
+
+
+@contextmanager
+def tracing(trace: OrderTrace) -> Iterator[OrderTrace]:
+    token = active_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        active_trace.reset(token)
+
+
+def record_hop(hop_name: str) -> None:
+    trace = active_trace.get()
+    if trace is not None:
+        trace.record(hop_name)
+
+
+def calculate_percentile(sorted_values: List[float], percentile: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(0, ceil(percentile / 100 * len(sorted_values)) - 1)
+    return sorted_values[rank]
+
+
+def summarize_values(values: List[float]) -> Dict[str, float]:
+    sorted_values = sorted(values)
+    summary = {"count": len(sorted_values)}
+    for percentile in PERCENTILES:
+        summary[f"p{percentile}_ms"] = calculate_percentile(sorted_values, percentile)
+    summary["max_ms"] = sorted_values[-1] if sorted_values else 0.0
+    return summary
+
+
+def summarize_traces(traces: List[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    """Percentiles per hop offset, the tick age at signal time, and the end-to-end total."""
+    offsets_by_hop: Dict[str, List[float]] = {}
+    tick_ages = []
+    totals = []
+
+    for trace in traces:
+        for hop in trace.get("hops", []):
+            offsets_by_hop.setdefault(hop["name"], []).append(hop["offset_ms"])
+        if trace.get(TICK_AGE_KEY) is not None:
+            tick_ages.append(trace[TICK_AGE_KEY])
+        totals.append(trace.get("total_ms", 0.0))
+
+    summary = {hop_name: summarize_values(offsets) for hop_name, offsets in offsets_by_hop.items()}
+    summary[TICK_AGE_KEY] = summarize_values(tick_ages)
+    summary["total"] = summarize_values(totals)
+    return summary
+
+
+def format_trace_summary(summary: Dict[str, Dict[str, float]]) -> str:
+    parts = [
+        f"{name}: n={stats['count']} p50={stats['p50_ms']:.1f}ms p90={stats['p90_ms']:.1f}ms p99={stats['p99_ms']:.1f}ms"
+        for name, stats in summary.items() if stats["count"] > 0
+    ]
+    return "ORDER LATENCY - " + (" | ".join(parts) if parts else "no orders traced")
@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta, timezone
+from heapq import heappop, heappush
+from itertools import count
+from time import monotonic as system_monotonic, sleep as system_sleep
+from typing import Callable, List, Optional, Tuple
+
+
+class RealClock:
+    """Wall-clock time, used in production."""
+
+    def now_utc(self) -> datetime:
+        return datetime.now(timezone.utc)
+
+    def monotonic(self) -> float:
+        return system_monotonic()
+
+    def sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            system_sleep(seconds)
+
+
+class SimulatedClock:
+    """
+    Manually driven clock for replays and tests.
+    Time only moves through advance(), advance_to(), sleep() or step(); callbacks
+    scheduled with call_at() fire in timestamp order as time passes them.
+    """
+
+    def __init__(self, start: datetime):
+        self._now = start if start.tzinfo else start.replace(tzinfo=timezone.utc)
+        self._start = self._now
+        self._events: List[Tuple[datetime, int, Callable[[], None]]] = []
+        self._sequence = count()
+
+    def now_utc(self) -> datetime:
+        return self._now
+
+    def monotonic(self) -> float:
+        return (self._now - self._start).total_seconds()
+
+    def sleep(self, seconds: float) -> None:
+        self.advance(seconds)
+
+    def advance(self, seconds: float) -> None:
+        self.advance_to(self._now + timedelta(seconds=seconds))
+
+    def advance_to(self, target: datetime) -> None:
+        while self._events and self._events[0][0] <= target:
+            self.step()
+        if target > self._now:
+            self._now = target
+
+    def call_at(self, when: datetime, callback: Callable[[], None]) -> None:
+        heappush(self._events, (when, next(self._sequence), callback))
+
+    def call_later(self, seconds: float, callback: Callable[[], None]) -> None:
+        self.call_at(self._now + timedelta(seconds=seconds), callback)
+
+    def step(self) -> Optional[datetime]:
+        """Jump to the next scheduled event and run it. Returns its time, or None if idle."""
+        if not self._events:
+            return None
+
+        when, _, callback = heappop(self._events)
+        if when > self._now:
+            self._now = when
+        callback()
+        return when
+
+    def pending_events(self) -> int:
+        return len(self._events)
+
+
+current_clock = RealClock()
+
+
+def get_clock():
+    return current_clock
+
+
+def set_clock(clock) -> None:
+    global current_clock
+    current_clock = clock
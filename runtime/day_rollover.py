@@ -0,0 +1,88 @@
+from dataclasses import dataclass
+from datetime import date, timedelta
+from logging import Logger
+from threading import Event, Lock, Thread
+from typing import Any, Callable, Dict, List, Optional
+
+DEFAULT_RETRY_INTERVAL_SECONDS = 300
+SATURDAY = 5
+
+
+@dataclass(frozen=True)
+class DailyInputs:
+    day: date
+    settings: Dict[str, Any]
+    companies: List[str]
+
+
+def next_weekday(day: date) -> date:
+    following = day + timedelta(days=1)
+    while following.weekday() >= SATURDAY:
+        following += timedelta(days=1)
+    return following
+
+
+def first_trading_day_from(day: date) -> date:
+    return day if day.weekday() < SATURDAY else next_weekday(day)
+
+
+class DayRolloverPrefetcher:
+    """
+    Fetches one upcoming day's inputs on a background thread, retrying until they
+    are published. The trading loop picks them up with take() at the day boundary.
+    """
+
+    def __init__(self, fetch: Callable[[date], Optional[DailyInputs]], logger: Logger,
+                 retry_interval: float = DEFAULT_RETRY_INTERVAL_SECONDS):
+        self.fetch = fetch
+        self.logger = logger
+        self.retry_interval = retry_interval
+        self.target: Optional[date] = None
+        self._inputs: Optional[DailyInputs] = None
+        self._lock = Lock()
+        self._stop_event = Event()
+        self._thread: Optional[Thread] = None
+
+    def schedule(self, day: date) -> None:
+        if self.target == day:
+            return
+
+        self.cancel()
+        self.target = day
+        self._stop_event = Event()
+        self.logger.info(f"Prefetching inputs for {day.isoformat()} in the background")
+        self._thread = Thread(target=self._run, args=(day, self._stop_event), name="day-prefetch", daemon=True)
+        self._thread.start()
+
+    def is_ready(self, day: date) -> bool:
+        with self._lock:
+            return self._inputs is not None and self._inputs.day == day
+
+    def take(self, day: date) -> Optional[DailyInputs]:
+        with self._lock:
+            if self._inputs is None or self._inputs.day != day:
+                return None
+            inputs, self._inputs = self._inputs, None
+        self.target = None
+        return inputs
+
+    def cancel(self) -> None:
+        self._stop_event.set()
+        self.target = None
+
+    def _run(self, day: date, stop_event: Event) -> None:
+        while not stop_event.is_set():
+            try:
+                inputs = self.fetch(day)
+            except Exception as e:
+                self.logger.warning(f"Prefetch for {day.isoformat()} failed: {e}")
+                inputs = None
+
+            if inputs is not None:
+                with self._lock:
+                    if not stop_event.is_set():
+                        self._inputs = inputs
+                self.logger.info(f"Prefetched {len(inputs.companies)} companies for {day.isoformat()}")
+                return
+
+            stop_event.wait(self.retry_interval)
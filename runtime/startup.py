@@ -0,0 +1,93 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from runtime.clock import get_clock
+
+
+class StartupReport:
+    """Offsets and durations of startup steps and milestones, relative to process start."""
+
+    def __init__(self):
+        self.started_at = get_clock().monotonic()
+        self.steps: Dict[str, Tuple[float, float]] = {}
+        self.milestones: Dict[str, float] = {}
+        self.failures: Dict[str, str] = {}
+        self._lock = Lock()
+
+    def elapsed(self) -> float:
+        return get_clock().monotonic() - self.started_at
+
+    def record_step(self, name: str, started: float, duration: float) -> None:
+        with self._lock:
+            self.steps[name] = (started, duration)
+
+    def record_failure(self, name: str, error: Exception) -> None:
+        with self._lock:
+            self.failures[name] = str(error)
+
+    def mark_once(self, milestone: str) -> None:
+        if milestone in self.milestones:
+            return
+        with self._lock:
+            self.milestones.setdefault(milestone, self.elapsed())
+
+    def format_report(self) -> str:
+        lines = ["STARTUP TIMING (offset from start | duration)"]
+        for name, (started, duration) in sorted(self.steps.items(), key=lambda item: item[1][0]):
+            status = f"  FAILED: {self.failures[name]}" if name in self.failures else ""
+            lines.append(f"  {name:<24} +{started * 1000:8.0f}ms | {duration * 1000:8.0f}ms{status}")
+        for milestone, offset in sorted(self.milestones.items(), key=lambda item: item[1]):
+            lines.append(f"  {milestone:<24} +{offset * 1000:8.0f}ms")
+        return "\n".join(lines)
+
+
+class StartupOrchestrator:
+    """
+    Runs startup steps on a thread pool, each as soon as the steps it depends on have
+    finished. Steps must be added after their dependencies; a failed step fails its
+    dependents. Step results are available to later steps through self.results;
+    run() returns them all, with None for failed steps.
+    """
+
+    def __init__(self, report: Optional[StartupReport] = None):
+        self.report = report or StartupReport()
+        self.results: Dict[str, Any] = {}
+        self._steps: List[Tuple[str, Callable[[], Any], Sequence[str]]] = []
+
+    def add_step(self, name: str, action: Callable[[], Any], depends_on: Sequence[str] = ()) -> None:
+        known = {step_name for step_name, _, _ in self._steps}
+        missing = [dependency for dependency in depends_on if dependency not in known]
+        if missing:
+            raise ValueError(f"Startup step {name} depends on unknown step(s): {missing}")
+        self._steps.append((name, action, depends_on))
+
+    def run(self) -> Dict[str, Any]:
+        futures: Dict[str, Future] = {}
+        with ThreadPoolExecutor(max_workers=max(1, len(self._steps)), thread_name_prefix="startup") as executor:
+            for name, action, depends_on in self._steps:
+                dependencies = [futures[dependency] for dependency in depends_on]
+                futures[name] = executor.submit(self._run_step, name, action, dependencies)
+
+        for name in futures:
+            self.results.setdefault(name, None)
+        return self.results
+
+    def _run_step(self, name: str, action: Callable[[], Any], dependencies: List[Future]) -> Any:
+        try:
+            for dependency in dependencies:
+                dependency.result()
+        except Exception as e:
+            self.report.record_step(name, self.report.elapsed(), 0.0)
+            self.report.record_failure(name, RuntimeError(f"skipped, dependency failed: {e}"))
+            raise
+
+        started = self.report.elapsed()
+        try:
+            self.results[name] = action()
+            return self.results[name]
+        except Exception as e:
+            self.report.record_failure(name, e)
+            raise
+        finally:
+            self.report.record_step(name, started, self.report.elapsed() - started)
@@ -0,0 +1,270 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import count
+from threading import RLock
+from time import sleep
+from typing import Any, Callable, Dict, List, Optional
+
+from runtime.clock import get_clock
+
+ACTION_BUY = "BUY"
+ACTION_SELL = "SELL"
+CHILD_STOP = "STP"
+CHILD_TAKE_PROFIT = "LMT"
+DEFAULT_ACCOUNT_ID = "PAPER"
+ORDER_STATUS_FILLED = "Filled"
+ORDER_STATUS_PRESUBMITTED = "PreSubmitted"
+
+PriceProvider = Callable[[int], Optional[float]]
+
+
+@dataclass
+class PaperPosition:
+    conid: int
+    ticker: Optional[str]
+    quantity: int = 0
+    average_price: float = 0.0
+    realized_pnl: float = 0.0
+
+
+@dataclass
+class ChildOrder:
+    order_id: str
+    parent_id: str
+    conid: int
+    order_type: str
+    trigger_price: float
+    quantity: int
+    oca_group: str
+
+
+@dataclass
+class Fill:
+    order_id: str
+    conid: int
+    side: str
+    quantity: int
+    price: float
+    reason: str
+    commission: float = 0.0
+    executed_at: Optional[datetime] = None
+
+
+@dataclass
+class PaperBrokerConfig:
+    slippage_bps: float = 5.0
+    latency_seconds: float = 0.0
+    account_id: str = DEFAULT_ACCOUNT_ID
+    currency: str = "USD"
+    commission_per_share: float = 0.0
+    sleep: Callable[[float], None] = field(default=sleep)
+
+
+def create_success_response(**kwargs) -> Dict[str, Any]:
+    result = {"success": True}
+    result.update(kwargs)
+    return result
+
+
+def create_error_response(error_message: str) -> Dict[str, Any]:
+    return {"success": False, "error": error_message}
+
+
+class PaperBroker:
+    """
+    Simulated broker with the same surface as ibkr.order_request/ibkr.portfolio.
+    Market orders fill at the latest known price plus adverse slippage after the
+    configured latency. Stop and take-profit children are held locally as an OCA
+    pair and triggered by update_price(). The account is long-only: sells are clipped
+    to the held quantity and rejected when flat.
+    """
+
+    def __init__(self, config: Optional[PaperBrokerConfig] = None, price_provider: Optional[PriceProvider] = None):
+        self.config = config or PaperBrokerConfig()
+        self.price_provider = price_provider
+        self.positions: Dict[int, PaperPosition] = {}
+        self.child_orders: Dict[str, ChildOrder] = {}
+        self.fills: List[Fill] = []
+        self.client_order_ids: Dict[str, str] = {}
+        self._prices: Dict[int, float] = {}
+        self._tickers: Dict[int, str] = {}
+        self._order_ids = count(1)
+        self._lock = RLock()
+
+    def update_price(self, conid: int, price: float, ticker: Optional[str] = None) -> None:
+        with self._lock:
+            conid = int(conid)
+            self._prices[conid] = price
+            if ticker:
+                self._tickers[conid] = ticker
+            self._trigger_child_orders(conid, price)
+
+    def get_price(self, conid: int) -> Optional[float]:
+        price = self._prices.get(int(conid))
+        if price is None and self.price_provider is not None:
+            price = self.price_provider(int(conid))
+        return price
+
+    def place_market_buy_order_with_stop_and_profit(self, conid: int, quantity: int, stop_loss_price: float, take_profit_price: float, account_id: Optional[str] = None,
+                                                    client_order_id: Optional[str] = None) -> Dict[str, Any]:
+        result = self._execute_market_order(conid, ACTION_BUY, quantity, "entry", client_order_id)
+        if not result["success"]:
+            return result
+
+        parent_id = result["initial_response"][0]["order_id"]
+        oca_group = f"OCA-{parent_id}"
+        legs = [{"order_id": parent_id, "order_status": ORDER_STATUS_FILLED}]
+        with self._lock:
+            for order_type, trigger_price, suffix in ((CHILD_STOP, stop_loss_price, "-stop"), (CHILD_TAKE_PROFIT, take_profit_price, "-target")):
+                if trigger_price is None:
+                    continue
+                child_id = self._next_order_id()
+                self.child_orders[child_id] = ChildOrder(child_id, parent_id, int(conid), order_type, float(trigger_price), quantity, oca_group)
+                if client_order_id:
+                    self.client_order_ids[child_id] = f"{client_order_id}{suffix}"
+                legs.append({"order_id": child_id, "order_status": ORDER_STATUS_PRESUBMITTED})
+
+        result["orders"] = legs
+        return result
+
+    def place_market_buy_order(self, conid: int, quantity: int, account_id: Optional[str] = None, client_order_id: Optional[str] = None) -> Dict[str, Any]:
+        return self._execute_market_order(conid, ACTION_BUY, quantity, "entry", client_order_id)
+
+    def place_market_sell_order(self, conid: int, quantity: int, account_id: Optional[str] = None, client_order_id: Optional[str] = None) -> Dict[str, Any]:
+        result = self._execute_market_order(conid, ACTION_SELL, quantity, "exit", client_order_id)
+        if result["success"]:
+            with self._lock:
+                self._cancel_children_if_flat(int(conid))
+        return result
+
+    def cancel_orders(self, order_ids: List[str], account_id: Optional[str] = None) -> Dict[str, Any]:
+        with self._lock:
+            for order_id in order_ids:
+                self.child_orders.pop(order_id, None)
+        return create_success_response(cancelled=len(order_ids))
+
+    def get_live_orders(self) -> Dict[str, Any]:
+        """Orders placed with a cOID, shaped like iserver/account/orders: fills plus working children."""
+        with self._lock:
+            orders = [{"orderId": fill.order_id, "order_ref": self.client_order_ids[fill.order_id], "conid": fill.conid,
+                       "side": fill.side, "status": ORDER_STATUS_FILLED, "filledQuantity": fill.quantity, "avgPrice": fill.price}
+                      for fill in self.fills if fill.order_id in self.client_order_ids]
+            orders += [{"orderId": child.order_id, "order_ref": self.client_order_ids[child.order_id], "conid": child.conid,
+                        "side": ACTION_SELL, "status": ORDER_STATUS_PRESUBMITTED, "filledQuantity": 0}
+                       for child in self.child_orders.values() if child.order_id in self.client_order_ids]
+        return {"success": True, "orders": orders}
+
+    def get_executions(self, days: int = 1) -> Dict[str, Any]:
+        """Every fill of the session, shaped like iserver/account/trades rows."""
+        with self._lock:
+            executions = [{"execution_id": fill.order_id, "conid": fill.conid, "symbol": self._tickers.get(fill.conid),
+                           "side": fill.side[0], "size": fill.quantity, "price": str(fill.price),
+                           "commission": f"{fill.commission:.4f}", "order_ref": self.client_order_ids.get(fill.order_id),
+                           "trade_time_r": int(fill.executed_at.timestamp() * 1000), "account": self.config.account_id}
+                          for fill in self.fills]
+        return {"success": True, "executions": executions}
+
+    def get_all_positions(self, account_ids: Optional[List[str]] = None) -> Dict[str, Any]:
+        with self._lock:
+            positions = [self._format_position(position) for position in self.positions.values() if position.quantity != 0]
+        return {"success": True, "positions": positions}
+
+    def _execute_market_order(self, conid: int, side: str, quantity: int, reason: str,
+                              client_order_id: Optional[str] = None) -> Dict[str, Any]:
+        if self.config.latency_seconds > 0:
+            self.config.sleep(self.config.latency_seconds)
+
+        with self._lock:
+            price = self.get_price(conid)
+            if price is None:
+                return create_error_response(f"No price available for conid {conid}")
+
+            if side == ACTION_SELL:
+                position = self.positions.get(int(conid))
+                held = position.quantity if position is not None else 0
+                if held <= 0:
+                    return create_error_response(f"No position to sell for conid {conid}")
+                quantity = min(quantity, held)
+
+            fill_price = self._apply_slippage(price, side)
+            order_id = self._next_order_id()
+            if client_order_id:
+                self.client_order_ids[order_id] = client_order_id
+            self._apply_fill(Fill(order_id, int(conid), side, quantity, fill_price, reason))
+
+        return create_success_response(initial_response=[{
+            "order_id": order_id,
+            "order_status": ORDER_STATUS_FILLED,
+            "avg_price": fill_price
+        }])
+
+    def _apply_slippage(self, price: float, side: str) -> float:
+        adjustment = price * self.config.slippage_bps / 10000
+        return round(price + adjustment if side == ACTION_BUY else price - adjustment, 4)
+
+    def _apply_fill(self, fill: Fill) -> None:
+        position = self.positions.setdefault(fill.conid, PaperPosition(fill.conid, self._tickers.get(fill.conid)))
+        signed_quantity = fill.quantity if fill.side == ACTION_BUY else -fill.quantity
+
+        if fill.side == ACTION_BUY:
+            total_cost = position.average_price * position.quantity + fill.price * fill.quantity
+            position.quantity += fill.quantity
+            position.average_price = total_cost / position.quantity if position.quantity else 0.0
+        else:
+            closed_quantity = min(fill.quantity, position.quantity)
+            position.realized_pnl += (fill.price - position.average_price) * closed_quantity
+            position.quantity += signed_quantity
+            if position.quantity <= 0:
+                position.average_price = 0.0
+
+        fill.commission = round(fill.quantity * self.config.commission_per_share, 4)
+        fill.executed_at = get_clock().now_utc()
+        self.fills.append(fill)
+
+    def _trigger_child_orders(self, conid: int, price: float) -> None:
+        for child in list(self.child_orders.values()):
+            if child.conid != conid or child.order_id not in self.child_orders:
+                continue
+
+            stop_hit = child.order_type == CHILD_STOP and price <= child.trigger_price
+            target_hit = child.order_type == CHILD_TAKE_PROFIT and price >= child.trigger_price
+            if not (stop_hit or target_hit):
+                continue
+
+            fill_price = self._apply_slippage(price, ACTION_SELL) if stop_hit else child.trigger_price
+            quantity = min(child.quantity, self.positions[conid].quantity)
+            self._cancel_oca_group(child.oca_group)
+            if quantity > 0:
+                self._apply_fill(Fill(child.order_id, conid, ACTION_SELL, quantity, fill_price, "stop" if stop_hit else "target"))
+
+    def _cancel_oca_group(self, oca_group: str) -> None:
+        for order_id in [order_id for order_id, child in self.child_orders.items() if child.oca_group == oca_group]:
+            self.child_orders.pop(order_id, None)
+
+    def _cancel_children_if_flat(self, conid: int) -> None:
+        position = self.positions.get(conid)
+        if position is not None and position.quantity > 0:
+            return
+        for order_id in [order_id for order_id, child in self.child_orders.items() if child.conid == conid]:
+            self.child_orders.pop(order_id, None)
+
+    def _format_position(self, position: PaperPosition) -> Dict[str, Any]:
+        market_price = self._prices.get(position.conid, position.average_price)
+        return {
+            "acctId": self.config.account_id,
+            "assetClass": "STK",
+            "avgCost": position.average_price,
+            "avgPrice": position.average_price,
+            "conid": position.conid,
+            "contractDesc": position.ticker,
+            "currency": self.config.currency,
+            "mktPrice": market_price,
+            "mktValue": market_price * position.quantity,
+            "position": position.quantity,
+            "realizedPnl": position.realized_pnl,
+            "ticker": position.ticker,
+            "unrealizedPnl": (market_price - position.average_price) * position.quantity
+        }
+
+    def _next_order_id(self) -> str:
+        return f"paper-{next(self._order_ids)}"
@@ -0,0 +1,149 @@
+from argparse import ArgumentParser
+from dataclasses import replace
+from datetime import date, datetime, timedelta, timezone
+from logging import INFO, Logger, basicConfig, getLogger
+from os import path
+from sys import path as sys_path
+from time import perf_counter
+from typing import Dict, List, Optional, Tuple
+
+sys_path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+import app
+from backtest.engine import FILES_ROOT, TICKS_FILE_NAME, read_ticks_file
+from config.settings_store import TradingSettings
+from ibkr.market_data_parser import is_during_market_hours
+from ibkr.order_manager import OrderManager
+from runtime.clock import SimulatedClock, get_clock, set_clock
+from simulation.paper_broker import PaperBroker, PaperBrokerConfig
+
+EOD_SWEEP_INTERVAL_SECONDS = 60
+
+Tick = Tuple[datetime, str, float, Optional[float]]
+
+
+def load_day_ticks(day: date, files_root: str = FILES_ROOT) -> List[Tick]:
+    file_path = f"{files_root}/{day.year}/{day.month}/{day.day}/{TICKS_FILE_NAME}"
+    ticks = []
+
+    for ticker, (epochs, prices, close) in read_ticks_file(file_path).items():
+        for epoch_seconds, price in zip(epochs, prices):
+            ticks.append((datetime.fromtimestamp(epoch_seconds, timezone.utc), ticker, price, close))
+
+    return sorted(ticks, key=lambda tick: tick[0])
+
+
+def build_parsed_data(conid: int, price: float, tick_time: datetime) -> Dict:
+    return {
+        'conid': conid,
+        'last_price': str(price),
+        'is_market_closed': not is_during_market_hours(),
+        'timestamp': tick_time,
+        'received_at': get_clock().monotonic()
+    }
+
+
+def reset_app_state(broker: PaperBroker) -> None:
+    app.broker = broker
+    app.order_manager = OrderManager(broker.get_live_orders, workers=0)
+    app.storage_client = None
+    app.bought_shares_today.clear()
+    app.closed_positions_today.clear()
+    app.portfolio_ledger.reset()
+    app.poll_scheduler.reset()
+    app.order_traces_today.clear()
+    app.last_parsed_data_by_ticker.clear()
+    app.closing_prices_by_ticker.clear()
+
+
+def sync_broker_exits(broker: PaperBroker, logger: Logger, required_syncs: int = app.BROKER_FLAT_SYNCS_BEFORE_CLOSE) -> None:
+    """Stand-in for the live position sync, so bracket exits are not sold again by the EOD sweep."""
+    app.close_positions_flat_at_broker(broker.get_all_positions()["positions"], logger, required_syncs)
+
+
+def replay_day(day: date, parameters: Dict, logger: Logger, paper_config: Optional[PaperBrokerConfig] = None) -> Dict:
+    """
+    Drive the unmodified decision code in app.py through a recorded session on a
+    simulated clock: every recorded tick is evaluated at its own timestamp and the
+    end-of-day sweep runs once per simulated minute.
+    """
+    ticks = load_day_ticks(day)
+    if not ticks:
+        return {"day": day.isoformat(), "ticks": 0}
+
+    clock = SimulatedClock(ticks[0][0])
+    set_clock(clock)
+
+    broker = PaperBroker(replace(paper_config or PaperBrokerConfig(), sleep=clock.sleep))
+    reset_app_state(broker)
+    app.settings_store.swap(TradingSettings(**parameters))
+    app.create_directories(day.year, day.month, day.day)
+
+    conids = {ticker: index for index, ticker in enumerate(sorted({tick[1] for tick in ticks}), start=1)}
+
+    def on_tick(tick_time: datetime, ticker: str, price: float, close: Optional[float]) -> None:
+        parsed_data = build_parsed_data(conids[ticker], price, tick_time)
+        app.last_parsed_data_by_ticker[ticker] = parsed_data
+        broker.update_price(conids[ticker], price, ticker)
+        app.mark_ledger_price(ticker, parsed_data)
+        app.evaluate_and_log_trading_opportunity(ticker, parsed_data, str(close) if close else None, logger)
+
+    def on_eod_sweep() -> None:
+        sync_broker_exits(broker, logger)
+        app.handle_end_of_day_sales(logger)
+        if clock.now_utc() < ticks[-1][0]:
+            clock.call_later(EOD_SWEEP_INTERVAL_SECONDS, on_eod_sweep)
+
+    for tick_time, ticker, price, close in ticks:
+        clock.call_at(tick_time, lambda t=tick_time, s=ticker, p=price, c=close: on_tick(t, s, p, c))
+    clock.call_later(EOD_SWEEP_INTERVAL_SECONDS, on_eod_sweep)
+
+    while clock.step() is not None:
+        pass
+    sync_broker_exits(broker, logger, required_syncs=1)
+
+    return {
+        "day": day.isoformat(),
+        "ticks": len(ticks),
+        "fills": len(broker.fills),
+        "closed_positions": len(app.closed_positions_today),
+        "open_positions": len(app.bought_shares_today),
+        "realized_pnl": round(sum(position.realized_pnl for position in broker.positions.values()), 2)
+    }
+
+
+def parse_arguments():
+    parser = ArgumentParser(description="Replay recorded ticks through the live decision code on a simulated clock")
+    parser.add_argument("--start", required=True, type=date.fromisoformat)
+    parser.add_argument("--end", required=True, type=date.fromisoformat)
+    parser.add_argument("--stop-loss", type=float, default=2.0)
+    parser.add_argument("--take-profit", type=float, default=5.0)
+    parser.add_argument("--next-investment", type=float, default=1000.0)
+    parser.add_argument("--ops-per-day", type=int, default=5)
+    parser.add_argument("--slippage-bps", type=float, default=5.0)
+    return parser.parse_args()
+
+
+def main() -> None:
+    arguments = parse_arguments()
+    basicConfig(level=INFO, format='%(message)s')
+    logger = getLogger("replay")
+
+    parameters = {
+        "stop_loss_pct": arguments.stop_loss,
+        "take_profit_pct": arguments.take_profit,
+        "next_investment": arguments.next_investment,
+        "ops_per_day": arguments.ops_per_day,
+        "version": "replay"
+    }
+
+    day = arguments.start
+    while day <= arguments.end:
+        start = perf_counter()
+        result = replay_day(day, parameters, logger, PaperBrokerConfig(slippage_bps=arguments.slippage_bps))
+        print(f"{result} in {perf_counter() - start:.2f}s")
+        day += timedelta(days=1)
+
+
+if __name__ == "__main__":
+    main()
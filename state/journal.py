@@ -0,0 +1,181 @@
+from dataclasses import dataclass, field
+from json import JSONDecodeError, dumps, loads
+from os import fsync, makedirs, path, replace
+from threading import Lock
+from typing import Any, Dict, List
+
+CHECKPOINT_FILE_NAME = 'checkpoint.json'
+CLOSED_POSITIONS_RECONCILED = 'closed_positions_reconciled'
+DEFAULT_CHECKPOINT_EVERY = 200
+JOURNAL_FILE_NAME = 'journal.jsonl'
+
+ORDER_REJECTED = 'order_rejected'
+ORDER_SUBMITTED = 'order_submitted'
+POSITION_CLOSED = 'position_closed'
+POSITION_DROPPED = 'position_dropped'
+POSITION_OPENED = 'position_opened'
+POSITION_UPDATED = 'position_updated'
+
+
+@dataclass
+class JournalState:
+    positions: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    closed_positions: List[Dict[str, Any]] = field(default_factory=list)
+    pending_orders: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    client_order_ids: Dict[str, str] = field(default_factory=dict)
+    sequence: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "sequence": self.sequence,
+            "positions": self.positions,
+            "closed_positions": self.closed_positions,
+            "pending_orders": self.pending_orders,
+            "client_order_ids": self.client_order_ids
+        }
+
+
+def parse_state(data: Dict[str, Any]) -> JournalState:
+    return JournalState(
+        positions=data.get("positions", {}),
+        closed_positions=data.get("closed_positions", []),
+        pending_orders=data.get("pending_orders", {}),
+        client_order_ids=data.get("client_order_ids", {}),
+        sequence=data.get("sequence", 0)
+    )
+
+
+def build_pending_order_key(ticker: str, side: str) -> str:
+    return f"{ticker}:{side}"
+
+
+def apply_entry(state: JournalState, entry: Dict[str, Any]) -> None:
+    entry_type = entry.get("type")
+    ticker = entry.get("ticker")
+    data = entry.get("data") or {}
+
+    if entry_type == ORDER_SUBMITTED:
+        state.pending_orders[build_pending_order_key(ticker, data.get("side"))] = data
+        if data.get("client_order_id"):
+            state.client_order_ids[build_pending_order_key(ticker, data.get("side"))] = data["client_order_id"]
+    elif entry_type == ORDER_REJECTED:
+        state.pending_orders.pop(build_pending_order_key(ticker, data.get("side")), None)
+    elif entry_type == POSITION_OPENED:
+        state.pending_orders.pop(build_pending_order_key(ticker, "BUY"), None)
+        state.positions[ticker] = data
+    elif entry_type == POSITION_UPDATED:
+        state.positions.setdefault(ticker, {}).update(data)
+    elif entry_type == POSITION_CLOSED:
+        state.pending_orders.pop(build_pending_order_key(ticker, "SELL"), None)
+        state.positions.pop(ticker, None)
+        state.closed_positions.append(data)
+    elif entry_type == POSITION_DROPPED:
+        state.positions.pop(ticker, None)
+    elif entry_type == CLOSED_POSITIONS_RECONCILED:
+        state.closed_positions = data.get("positions", [])
+
+    state.sequence = max(state.sequence, entry.get("sequence", 0))
+
+
+def read_journal_entries(file_path: str) -> List[Dict[str, Any]]:
+    """Read journal lines; a torn final line from a crash mid-write is ignored."""
+    if not path.exists(file_path):
+        return []
+
+    entries = []
+    with open(file_path, 'r') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                entries.append(loads(line))
+            except JSONDecodeError:
+                break
+    return entries
+
+
+class StateJournal:
+    """
+    Append-only write-ahead log of position and order transitions for one trading day.
+    Every transition is fsynced before the caller acts on it. Every checkpoint_every
+    entries the full state is written atomically to a checkpoint and the log is truncated;
+    recovery loads the checkpoint, replays only entries with a higher sequence number
+    and compacts the result into a fresh checkpoint.
+    """
+
+    def __init__(self, directory: str, checkpoint_every: int = DEFAULT_CHECKPOINT_EVERY):
+        self.directory = directory
+        self.checkpoint_every = checkpoint_every
+        self.journal_path = path.join(directory, JOURNAL_FILE_NAME)
+        self.checkpoint_path = path.join(directory, CHECKPOINT_FILE_NAME)
+        self.state = JournalState()
+        self.entries_since_checkpoint = 0
+        self._lock = Lock()
+        self._file = None
+
+    def recover(self) -> JournalState:
+        state = JournalState()
+        if path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path, 'r') as f:
+                state = parse_state(loads(f.read()))
+
+        checkpoint_sequence = state.sequence
+        for entry in read_journal_entries(self.journal_path):
+            if entry.get("sequence", 0) > checkpoint_sequence:
+                apply_entry(state, entry)
+
+        with self._lock:
+            self.state = state
+            self._write_checkpoint()
+        return state
+
+    def append(self, entry_type: str, ticker: str, data: Dict[str, Any]) -> None:
+        with self._lock:
+            entry = {
+                "sequence": self.state.sequence + 1,
+                "type": entry_type,
+                "ticker": ticker,
+                "data": data
+            }
+            line = dumps(entry, default=str)
+            file = self._open()
+            file.write(line + "\n")
+            file.flush()
+            fsync(file.fileno())
+
+            apply_entry(self.state, loads(line))
+            self.entries_since_checkpoint += 1
+
+            if self.entries_since_checkpoint >= self.checkpoint_every:
+                self._write_checkpoint()
+
+    def checkpoint(self) -> None:
+        with self._lock:
+            self._write_checkpoint()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+    def _open(self):
+        if self._file is None:
+            makedirs(self.directory, exist_ok=True)
+            self._file = open(self.journal_path, 'a')
+        return self._file
+
+    def _write_checkpoint(self) -> None:
+        makedirs(self.directory, exist_ok=True)
+        temp_path = f"{self.checkpoint_path}.tmp"
+        with open(temp_path, 'w') as f:
+            f.write(dumps(self.state.to_dict(), default=str))
+            f.flush()
+            fsync(f.fileno())
+        replace(temp_path, self.checkpoint_path)
+
+        if self._file:
+            self._file.close()
+            self._file = None
+        open(self.journal_path, 'w').close()
+        self.entries_since_checkpoint = 0
@@ -0,0 +1,68 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from strategy.signals import BUY_RANGE_LOWER_PCT, BUY_RANGE_UPPER_PCT
+
+OPERATOR_AT_OR_ABOVE = ">="
+OPERATOR_AT_OR_BELOW = "<="
+
+
+def choose_alert_bound(price_change_pct: float, lower_price: float, upper_price: float) -> Optional[Tuple[str, float]]:
+    """
+    The buy band bound the price has to cross next: the lower bound from below, the
+    upper bound from above. Inside the band there is nothing to offload.
+    """
+    if price_change_pct < BUY_RANGE_LOWER_PCT:
+        return OPERATOR_AT_OR_ABOVE, round(lower_price, 2)
+    if price_change_pct > BUY_RANGE_UPPER_PCT:
+        return OPERATOR_AT_OR_BELOW, round(upper_price, 2)
+    return None
+
+
+class PriceAlertBook:
+    """
+    Which tickers the gateway is watching for us. Tickers are queued with the bound
+    to watch, marked armed once the gateway accepted the alert, and handed back by
+    consume_triggered() when their alert fired. Alerts are one-shot, so a triggered
+    ticker is unarmed until it is queued again.
+    """
+
+    def __init__(self):
+        self._armed: Dict[str, Tuple[int, str, float]] = {}
+        self._tickers_by_alert: Dict[int, str] = {}
+        self._pending: Dict[str, Tuple[str, float]] = {}
+
+    @property
+    def armed_count(self) -> int:
+        return len(self._armed)
+
+    def is_armed(self, ticker: str) -> bool:
+        return ticker in self._armed
+
+    def is_tracked(self, ticker: str) -> bool:
+        return ticker in self._armed or ticker in self._pending
+
+    def request(self, ticker: str, operator: str, price: float) -> None:
+        if ticker not in self._armed:
+            self._pending[ticker] = (operator, price)
+
+    def take_pending(self, limit: Optional[int] = None) -> List[Tuple[str, str, float]]:
+        tickers = list(self._pending)[:limit]
+        return [(ticker, *self._pending.pop(ticker)) for ticker in tickers]
+
+    def mark_armed(self, ticker: str, alert_id: int, operator: str, price: float) -> None:
+        self._armed[ticker] = (alert_id, operator, price)
+        self._tickers_by_alert[alert_id] = ticker
+
+    def consume_triggered(self, alert_ids: Iterable[int]) -> List[Tuple[str, int]]:
+        triggered = []
+        for alert_id in alert_ids:
+            ticker = self._tickers_by_alert.pop(alert_id, None)
+            if ticker is not None:
+                del self._armed[ticker]
+                triggered.append((ticker, alert_id))
+        return triggered
+
+    def clear(self) -> None:
+        self._armed.clear()
+        self._tickers_by_alert.clear()
+        self._pending.clear()
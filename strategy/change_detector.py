@@ -0,0 +1,78 @@
+from typing import Any, Dict, Optional, Tuple
+
+from runtime.clock import get_clock
+
+CONID_KEY = 'conid'
+LAST_PRICE_FIELD = '31'
+UPDATED_KEY = '_updated'
+
+
+def build_snapshot_key(market_data: Dict[str, Any]) -> Tuple[Any, Any]:
+    return market_data.get(UPDATED_KEY), market_data.get(LAST_PRICE_FIELD)
+
+
+class SnapshotChangeDetector:
+    """
+    Remembers the (_updated, last price) pair last processed for each conid so
+    unchanged snapshots can skip parsing, evaluation, logging and persistence.
+    With heartbeat_seconds set, an unchanged snapshot is still processed once per
+    heartbeat so staleness checks keep running.
+    """
+
+    def __init__(self, heartbeat_seconds: Optional[float] = None):
+        self.heartbeat_seconds = heartbeat_seconds
+        self._last_keys: Dict[Any, Tuple[Any, Any]] = {}
+        self._last_processed_at: Dict[Any, float] = {}
+        self.processed = 0
+        self.skipped = 0
+        self.heartbeats = 0
+
+    def start_cycle(self) -> None:
+        self.processed = 0
+        self.skipped = 0
+        self.heartbeats = 0
+
+    def should_process(self, market_data: Dict[str, Any]) -> bool:
+        conid = market_data.get(CONID_KEY)
+        key = build_snapshot_key(market_data)
+        now = get_clock().monotonic()
+
+        if conid is None or self._last_keys.get(conid) != key:
+            self._mark_processed(conid, key, now)
+            return True
+
+        if self._is_heartbeat_due(conid, now):
+            self.heartbeats += 1
+            self._mark_processed(conid, key, now)
+            return True
+
+        self.skipped += 1
+        return False
+
+    def skip_ratio(self) -> float:
+        total = self.processed + self.skipped
+        return self.skipped / total if total > 0 else 0.0
+
+    def format_cycle_summary(self) -> str:
+        return (f"Snapshots: {self.processed} processed ({self.heartbeats} heartbeat), "
+                f"{self.skipped} unchanged skipped ({self.skip_ratio() * 100:.1f}% skipped)")
+
+    def forget(self, conid: Any) -> None:
+        self._last_keys.pop(conid, None)
+        self._last_processed_at.pop(conid, None)
+
+    def reset(self) -> None:
+        self._last_keys.clear()
+        self._last_processed_at.clear()
+        self.start_cycle()
+
+    def _is_heartbeat_due(self, conid: Any, now: float) -> bool:
+        if self.heartbeat_seconds is None:
+            return False
+        return now - self._last_processed_at.get(conid, now) >= self.heartbeat_seconds
+
+    def _mark_processed(self, conid: Any, key: Tuple[Any, Any], now: float) -> None:
+        self.processed += 1
+        if conid is not None:
+            self._last_keys[conid] = key
+            self._last_processed_at[conid] = now
@@ -0,0 +1,180 @@
+from heapq import heappop, heappush
+from itertools import count
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from runtime.clock import get_clock
+from strategy.signals import BUY_RANGE_LOWER_PCT, BUY_RANGE_UPPER_PCT
+
+DEFAULT_REQUESTS_PER_SECOND = 10.0
+MIN_POLL_INTERVAL_SECONDS = 1.0
+MAX_POLL_INTERVAL_SECONDS = 60.0
+UNKNOWN_POLL_INTERVAL_SECONDS = 10.0
+# Roughly a 2% daily move spread over a 6.5 hour session, in pct^2 per second
+DEFAULT_VARIANCE_PER_SECOND = 4.0 / 23400
+MIN_VARIANCE_PER_SECOND = DEFAULT_VARIANCE_PER_SECOND / 4
+VARIANCE_SMOOTHING = 0.2
+# Poll again after this fraction of the expected time to drift into the buy band
+INTERVAL_SAFETY_FACTOR = 0.25
+# Absorbs float drift in the token bucket so a refill of exactly one request counts
+TOKEN_EPSILON = 1e-6
+
+
+def distance_to_buy_band(price_change_pct: float) -> float:
+    if price_change_pct < BUY_RANGE_LOWER_PCT:
+        return BUY_RANGE_LOWER_PCT - price_change_pct
+    if price_change_pct > BUY_RANGE_UPPER_PCT:
+        return price_change_pct - BUY_RANGE_UPPER_PCT
+    return 0.0
+
+
+def calculate_poll_interval(price_change_pct: Optional[float], variance_per_second: float, held: bool,
+                            min_interval: float = MIN_POLL_INTERVAL_SECONDS,
+                            max_interval: float = MAX_POLL_INTERVAL_SECONDS) -> float:
+    """
+    Held tickers and tickers inside the buy band poll at min_interval. Otherwise the
+    interval is a fraction of the time a random walk with this variance needs to cover
+    the distance to the band, clamped to [min_interval, max_interval].
+    """
+    if held:
+        return min_interval
+    if price_change_pct is None:
+        return min(max(UNKNOWN_POLL_INTERVAL_SECONDS, min_interval), max_interval)
+
+    distance = distance_to_buy_band(price_change_pct)
+    expected_seconds = distance * distance / max(variance_per_second, MIN_VARIANCE_PER_SECOND)
+    return min(max(INTERVAL_SAFETY_FACTOR * expected_seconds, min_interval), max_interval)
+
+
+class PollScheduler:
+    """
+    Earliest-deadline-first polling over the watchlist. Each ticker is rescheduled
+    after every poll with an interval from calculate_poll_interval. When the summed
+    poll rate exceeds requests_per_second, every interval is stretched by the same
+    load factor, so the budget is shared in proportion to urgency rather than
+    round-robin; take_due() enforces the budget with a token bucket.
+    """
+
+    def __init__(self, requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+                 min_interval: float = MIN_POLL_INTERVAL_SECONDS,
+                 max_interval: float = MAX_POLL_INTERVAL_SECONDS):
+        self.requests_per_second = requests_per_second
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.tokens = requests_per_second
+        self._refilled_at = get_clock().monotonic()
+        self._heap: List[Tuple[float, int, str]] = []
+        self._due: Dict[str, float] = {}
+        self._sequence = count()
+        self._last_pct: Dict[str, float] = {}
+        self._last_observed_at: Dict[str, float] = {}
+        self._variance: Dict[str, float] = {}
+        self._rates: Dict[str, float] = {}
+        self.demand = 0.0
+
+    @property
+    def load_factor(self) -> float:
+        return max(1.0, self.demand / self.requests_per_second)
+
+    def sync(self, tickers: Iterable[str]) -> None:
+        """Match the schedule to the watchlist; new tickers are due immediately."""
+        wanted = set(tickers)
+        now = get_clock().monotonic()
+
+        for ticker in [ticker for ticker in self._due if ticker not in wanted]:
+            self._forget(ticker)
+        for ticker in wanted:
+            if ticker not in self._due:
+                self._set_rate(ticker, 1 / UNKNOWN_POLL_INTERVAL_SECONDS)
+                self._schedule(ticker, now)
+
+    def take_due(self) -> List[str]:
+        now = get_clock().monotonic()
+        self._refill(now)
+
+        due = []
+        while self._heap and self.tokens >= 1 - TOKEN_EPSILON and self._heap[0][0] <= now:
+            due_at, _, ticker = heappop(self._heap)
+            if self._due.get(ticker) != due_at:
+                continue
+            del self._due[ticker]
+            self.tokens -= 1
+            due.append(ticker)
+        return due
+
+    def observe(self, ticker: str, price_change_pct: float) -> None:
+        now = get_clock().monotonic()
+        previous_pct = self._last_pct.get(ticker)
+        previous_at = self._last_observed_at.get(ticker)
+
+        if previous_pct is not None and now > previous_at:
+            sample = (price_change_pct - previous_pct) ** 2 / (now - previous_at)
+            variance = self._variance.get(ticker, DEFAULT_VARIANCE_PER_SECOND)
+            self._variance[ticker] = variance + VARIANCE_SMOOTHING * (sample - variance)
+
+        self._last_pct[ticker] = price_change_pct
+        self._last_observed_at[ticker] = now
+
+    def reschedule(self, ticker: str, held: bool, interval: Optional[float] = None) -> float:
+        """Schedule the next poll; an explicit interval (e.g. the alert fallback) replaces the computed one."""
+        if interval is None:
+            interval = calculate_poll_interval(self._last_pct.get(ticker),
+                                               self._variance.get(ticker, DEFAULT_VARIANCE_PER_SECOND),
+                                               held, self.min_interval, self.max_interval)
+        self._set_rate(ticker, 1 / interval)
+        interval *= self.load_factor
+        self._schedule(ticker, get_clock().monotonic() + interval)
+        return interval
+
+    def expedite(self, ticker: str) -> None:
+        """Make a known ticker due now, e.g. when its price alert fired."""
+        if ticker in self._rates:
+            self._schedule(ticker, get_clock().monotonic())
+
+    def seconds_until_next_due(self) -> Optional[float]:
+        while self._heap and self._due.get(self._heap[0][2]) != self._heap[0][0]:
+            heappop(self._heap)
+        if not self._heap:
+            return None
+
+        now = get_clock().monotonic()
+        wait = self._heap[0][0] - now
+        if self.tokens < 1 - TOKEN_EPSILON:
+            wait = max(wait, (1 - self.tokens) / self.requests_per_second)
+        return max(wait, 0.0)
+
+    def overdue_seconds(self) -> float:
+        """How far behind schedule the most overdue ticker is; grows when the budget is too small."""
+        if self.seconds_until_next_due() is None:
+            return 0.0
+        return max(get_clock().monotonic() - self._heap[0][0], 0.0)
+
+    def reset(self) -> None:
+        self._heap.clear()
+        self._due.clear()
+        self._last_pct.clear()
+        self._last_observed_at.clear()
+        self._variance.clear()
+        self._rates.clear()
+        self.demand = 0.0
+        self.tokens = self.requests_per_second
+        self._refilled_at = get_clock().monotonic()
+
+    def _schedule(self, ticker: str, due_at: float) -> None:
+        self._due[ticker] = due_at
+        heappush(self._heap, (due_at, next(self._sequence), ticker))
+
+    def _forget(self, ticker: str) -> None:
+        self._due.pop(ticker, None)
+        self._last_pct.pop(ticker, None)
+        self._last_observed_at.pop(ticker, None)
+        self._variance.pop(ticker, None)
+        self.demand -= self._rates.pop(ticker, 0.0)
+
+    def _set_rate(self, ticker: str, rate: float) -> None:
+        self.demand += rate - self._rates.get(ticker, 0.0)
+        self._rates[ticker] = rate
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(now - self._refilled_at, 0.0)
+        self._refilled_at = now
+        self.tokens = min(self.requests_per_second, self.tokens + elapsed * self.requests_per_second)
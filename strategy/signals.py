@@ -0,0 +1,74 @@
+from typing import Sequence
+
+import numpy as np
+
+ABOVE_THRESHOLD_PCT = 1.0
+BUY_RANGE_LOWER_PCT = 0.8
+BUY_RANGE_UPPER_PCT = 0.95
+BUY_RANGE_LOWER_RATIO = 1 + BUY_RANGE_LOWER_PCT / 100
+BUY_RANGE_UPPER_RATIO = 1 + BUY_RANGE_UPPER_PCT / 100
+
+ACTION_NO_DATA = -1
+ACTION_BELOW_CLOSE = 0
+ACTION_NEUTRAL = 1
+ACTION_BUY = 2
+ACTION_TOO_HIGH = 3
+
+ACTION_NAMES = {
+    ACTION_NO_DATA: "NO DATA",
+    ACTION_BELOW_CLOSE: "BELOW CLOSE",
+    ACTION_NEUTRAL: "NEUTRAL",
+    ACTION_BUY: "BUY OPPORTUNITY",
+    ACTION_TOO_HIGH: "ABOVE THRESHOLD"
+}
+
+
+def is_price_below_close(price_change_pct: float) -> bool:
+    return price_change_pct < 0
+
+
+def is_price_above_threshold(price_change_pct: float) -> bool:
+    return price_change_pct >= ABOVE_THRESHOLD_PCT
+
+
+def is_within_buy_range(price_change_pct: float) -> bool:
+    return BUY_RANGE_LOWER_PCT <= price_change_pct <= BUY_RANGE_UPPER_PCT
+
+
+def classify_price_change(price_change_pct: float) -> int:
+    """Scalar classifier used by app.evaluate_trading_opportunity; evaluate_watchlist is its vectorized twin."""
+    if is_price_below_close(price_change_pct):
+        return ACTION_BELOW_CLOSE
+    if is_price_above_threshold(price_change_pct):
+        return ACTION_TOO_HIGH
+    if is_within_buy_range(price_change_pct):
+        return ACTION_BUY
+    return ACTION_NEUTRAL
+
+
+def format_buy_range_label(lower: float, upper: float) -> str:
+    return f"[Buy Range: ${lower:.2f} - ${upper:.2f}]"
+
+
+def calculate_price_change_percentages(last_prices: np.ndarray, closing_prices: np.ndarray) -> np.ndarray:
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return ((last_prices - closing_prices) / closing_prices) * 100
+
+
+def evaluate_watchlist(last_prices: Sequence[float], closing_prices: Sequence[float]) -> np.ndarray:
+    """
+    Classify the whole watchlist in one pass.
+    Returns an int8 vector of ACTION_* codes; tickers with a NaN or non-positive
+    price or close get ACTION_NO_DATA.
+    """
+    last = np.asarray(last_prices, dtype=np.float64)
+    close = np.asarray(closing_prices, dtype=np.float64)
+    pct = calculate_price_change_percentages(last, close)
+
+    actions = np.full(pct.shape, ACTION_NEUTRAL, dtype=np.int8)
+    actions[(pct >= BUY_RANGE_LOWER_PCT) & (pct <= BUY_RANGE_UPPER_PCT)] = ACTION_BUY
+    actions[pct >= ABOVE_THRESHOLD_PCT] = ACTION_TOO_HIGH
+    actions[pct < 0] = ACTION_BELOW_CLOSE
+    actions[~np.isfinite(pct) | ~(last > 0) | ~(close > 0)] = ACTION_NO_DATA
+
+    return actions